@@ -1,5 +1,5 @@
 import os
-from openai import OpenAI
+from typing import Optional
 
 from app.mcp_tools import (
     add_task,
@@ -9,7 +9,9 @@ from app.mcp_tools import (
     update_task,
 )
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# lazy: OpenAI client import pe nahi, pehli get_agent() call pe banta hai
+_client: Optional[object] = None
+
 
 def get_agent():
     """
@@ -17,4 +19,9 @@ def get_agent():
     Next step me is agent ko chat router se connect karenge
     aur MCP tools bind karenge.
     """
-    return client
+    global _client
+    if _client is None:
+        from openai import OpenAI
+
+        _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
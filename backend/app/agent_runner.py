@@ -1,14 +1,54 @@
 # backend/app/agent_runner.py
+import asyncio
 import os
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+import time
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, AsyncIterator, Tuple
 
-from agents import Agent, Runner, set_default_openai_api
-from agents.mcp import MCPServerStdio
+from sqlmodel import select
+from app import fast_path, metrics, model_router, response_cache, tracing
+from app.chat_store import HISTORY_LIMIT, aload_history
+from app.database import async_session
+from app.mcp_pool import mcp_pool
+from app.message_writer import TurnWrite, write_turn
+from app.model_router import TIER_LARGE, Route
+from app.models import Conversation
+from app.prompt_builder import PromptPlan, build_prompt
 
-from sqlmodel import Session, select
-from app.database import engine
-from app.models import Conversation, Message
+if TYPE_CHECKING:  # heavy SDKs (agents / openai) are imported lazily on first chat turn
+    from agents import Agent, RunConfig
+    from agents.models.interface import ModelProvider
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+# "stdio"     -> pooled MCP child processes (default)
+# "inprocess" -> same FastMCP tools, direct function dispatch in this process
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "stdio").strip().lower()
+
+# optional: "responses" | "chat_completions" (unset = SDK default)
+OPENAI_API = os.getenv("OPENAI_API", "").strip().lower()
+
+# model ek step me kai independent tool calls bheje (SDK + tool executor unhe saath chalate hain)
+TOOL_PARALLEL_CALLS = os.getenv("TOOL_PARALLEL_CALLS", "1") != "0"
+
+
+# optional model provider override (benchmarks / offline runs plug a stub model here)
+_model_provider: Optional["ModelProvider"] = None
+
+
+def set_model_provider(provider: Optional["ModelProvider"]) -> None:
+    global _model_provider
+    _model_provider = provider
+
+
+def _run_config() -> Optional["RunConfig"]:
+    if _model_provider is None:
+        return None
+    from agents import RunConfig
+
+    return RunConfig(model_provider=_model_provider)
 
 
 SYSTEM_INSTRUCTIONS = """
@@ -20,129 +60,501 @@ CRITICAL:
 
 MCP tools:
 - add_task(user_id, title, description?)
-- list_tasks(user_id, status?)
+- list_tasks(user_id, status?, after_id?, limit?, sort?)  (use next_after_id for the next page)
+- find_tasks(user_id, query, limit?)  (title search, best match first)
 - complete_task(user_id, task_id)
 - delete_task(user_id, task_id)
 - update_task(user_id, task_id, title?, description?)
+- add_tasks(user_id, titles[])
+- complete_tasks(user_id, task_ids[])
+- delete_tasks(user_id, task_ids[])
+- update_tasks(user_id, updates[{task_id, title?, description?}])
 
 IMPORTANT RULES:
 - When you list tasks, ALWAYS show task IDs in your response.
 - For complete/delete/update, ALWAYS use the numeric task_id (never guess by title).
-- If the user gives a title/name instead of an ID, first call list_tasks and ask which ID to use.
+- If the user gives a title/name instead of an ID, call find_tasks with that name (NOT list_tasks).
+  One clear best match -> use its id; several close matches -> ask which ID to use; none -> say so.
+- For 2+ items in one request, use ONE batch tool call (add_tasks / complete_tasks / ...) instead of many single calls.
+- Task lists come back columnar: "cols" + "rows" (done: 1 = completed, 0 = pending). If "omitted" is present, more tasks exist: call list_tasks with after_id = next_after_id.
 
 Return short helpful confirmations.
 """.strip()
 
 
-def _get_or_create_conversation(user_id: str, conversation_id: Optional[int] = None) -> int:
-    with Session(engine) as session:
-        if conversation_id is not None:
-            convo = session.get(Conversation, conversation_id)
-            if convo and convo.user_id == user_id:
-                return convo.id
+class ConversationNotFound(LookupError):
+    """Explicit conversation_id does not exist / belongs to another user."""
+
 
-        convo = session.exec(
+async def _resolve_conversation(session: "AsyncSession", user_id: str, conversation_id: Optional[int]) -> Conversation:
+    if conversation_id is not None:
+        convo = await session.get(Conversation, conversation_id)
+        if not convo or convo.user_id != user_id:
+            raise ConversationNotFound(conversation_id)
+        return convo
+
+    convo = (
+        await session.exec(
             select(Conversation)
             .where(Conversation.user_id == user_id)
             .order_by(Conversation.id.desc())
-        ).first()
+            .limit(1)
+        )
+    ).first()
+
+    if convo:
+        return convo
 
-        if convo:
-            return convo.id
+    convo = Conversation(user_id=user_id)
+    session.add(convo)
+    await session.commit()
+    await session.refresh(convo)
+    return convo
 
-        convo = Conversation(user_id=user_id)
-        session.add(convo)
-        session.commit()
-        session.refresh(convo)
-        return convo.id
 
+@metrics.timed(metrics.CHAT_STAGE_SECONDS, stage="conversation")
+async def _get_or_create_conversation(user_id: str, conversation_id: Optional[int] = None) -> Conversation:
+    async with async_session() as session:
+        return await _resolve_conversation(session, user_id, conversation_id)
 
-def _load_history(conversation_id: int, limit: int = 30) -> List[Dict[str, str]]:
+
+@metrics.timed(metrics.CHAT_STAGE_SECONDS, stage="history")
+async def _load_history(conversation_id: int, limit: int = HISTORY_LIMIT) -> List[Dict[str, Any]]:
     """
     Return last N messages in chronological order.
     Ensures roles are normalized for the agent prompt.
     """
-    with Session(engine) as session:
-        # load all ids asc then slice; simple + safe
-        msgs = session.exec(
-            select(Message)
-            .where(Message.conversation_id == conversation_id)
-            .order_by(Message.id.asc())
-        ).all()
-
-    msgs = msgs[-limit:]
-
-    out: List[Dict[str, str]] = []
-    for m in msgs:
-        role = (m.role or "").lower().strip()
-        if role not in ("user", "assistant"):
-            # fallback: treat unknown as assistant to avoid breaking context
-            role = "assistant"
-        out.append({"role": role, "content": m.content})
-    return out
-
-
-def _store_message(*, conversation_id: int, user_id: str, role: str, content: str) -> None:
-    with Session(engine) as session:
-        session.add(
-            Message(
-                conversation_id=conversation_id,
-                user_id=user_id,
-                role=role,
-                content=content,
-            )
+    async with async_session() as session:
+        return await aload_history(session, conversation_id, limit)
+
+
+@metrics.timed(metrics.CHAT_STAGE_SECONDS, stage="persist")
+async def _persist_turn(
+    *,
+    conversation_id: int,
+    user_id: str,
+    message: str,
+    reply_text: Optional[str],
+    plan: Optional[PromptPlan] = None,
+) -> None:
+    """
+    User + assistant message + conversation updated_at/summary: ONE transaction
+    (message_writer; MESSAGE_WRITE_MODE=batched -> group commit across requests).
+    reply_text None = agent failed, sirf user message save hota hai.
+    """
+    messages = [("user", message)]
+    if reply_text is not None:
+        messages.append(("assistant", reply_text))
+    await write_turn(
+        TurnWrite(
+            conversation_id=conversation_id,
+            user_id=user_id,
+            messages=messages,
+            summary=plan.summary if plan else None,
+            summary_upto_id=plan.summary_upto_id if plan else None,
+            summary_changed=bool(plan and plan.summary_changed),
         )
-        convo = session.get(Conversation, conversation_id)
-        if convo:
-            convo.updated_at = datetime.utcnow()
-        session.commit()
+    )
 
 
-def _build_prompt(user_id: str, history: List[Dict[str, str]], user_message: str) -> str:
-    lines: List[str] = [f"USER_ID: {user_id}"]
+# =========================
+# AGENT (built once per process, per model tier)
+# =========================
+# Same instructions + same tool list (same order) har request me -> request prefix
+# byte-identical rehta hai aur provider ka prompt cache hit hota hai.
+_base_agents: Dict[str, "Agent"] = {}
+_inprocess_agents: Dict[str, "Agent"] = {}
+# pooled MCP session -> {model: Agent} (session recycle hone pe entry khud hat jati hai)
+_pooled_agents: "weakref.WeakKeyDictionary[Any, Dict[str, Agent]]" = weakref.WeakKeyDictionary()
+_openai_configured = False
 
-    for h in history:
-        r = h["role"]
-        if r == "user":
-            lines.append(f"USER: {h['content']}")
-        else:
-            lines.append(f"ASSISTANT: {h['content']}")
 
-    lines.append(f"USER: {user_message}")
-    return "\n".join(lines)
+def _agent_template(model: str) -> "Agent":
+    agent = _base_agents.get(model)
+    if agent is None:
+        from agents import Agent, ModelSettings
 
-
-async def run_chat(user_id: str, message: str, conversation_id: Optional[int] = None) -> Dict[str, Any]:
+        agent = Agent(
+            name="TodoAgent",
+            instructions=SYSTEM_INSTRUCTIONS,
+            model=model,
+            model_settings=ModelSettings(parallel_tool_calls=TOOL_PARALLEL_CALLS),
+        )
+        _base_agents[model] = agent
+    return agent
+
+
+@asynccontextmanager
+async def _todo_agent(model: str) -> AsyncIterator["Agent"]:
+    if MCP_TRANSPORT == "inprocess":
+        agent = _inprocess_agents.get(model)
+        if agent is None:
+            from app.mcp_tools.inprocess import get_function_tools
+
+            agent = _agent_template(model).clone(tools=await get_function_tools())
+            _inprocess_agents[model] = agent
+        yield agent
+        return
+
+    # ✅ warm pooled MCP session (no subprocess spawn per turn); tools list session pe cached
+    async with mcp_pool.acquire() as todo_mcp:
+        per_model = _pooled_agents.get(todo_mcp)
+        if per_model is None:
+            per_model = {}
+            _pooled_agents[todo_mcp] = per_model
+        agent = per_model.get(model)
+        if agent is None:
+            agent = _agent_template(model).clone(mcp_servers=[todo_mcp])
+            per_model[model] = agent
+        yield agent
+
+
+def _configure_openai() -> None:
+    """API key (+ optional API flavour) SDK me ek hi baar set karo, har turn nahi."""
+    global _openai_configured
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY missing in env")
+    if _openai_configured:
+        return
+
+    from agents import set_default_openai_api, set_default_openai_key
+
+    set_default_openai_key(api_key)
+    if OPENAI_API in ("responses", "chat_completions"):
+        set_default_openai_api(OPENAI_API)
+    _openai_configured = True
+
+
+def _usage(result: Any) -> Dict[str, Any]:
+    """Run usage (all model calls of the turn) incl. provider-cached input tokens."""
+    usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+    if usage is None:
+        return {}
+    input_tokens = getattr(usage, "input_tokens", 0) or 0
+    cached = getattr(getattr(usage, "input_tokens_details", None), "cached_tokens", 0) or 0
+    return {
+        "requests": getattr(usage, "requests", 0) or 0,
+        "input_tokens": input_tokens,
+        "cached_tokens": cached,
+        "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+        "cached_ratio": round(cached / input_tokens, 4) if input_tokens else 0.0,
+    }
+
+
+def _record_usage(usage: Dict[str, Any], sp: Any, tier: str) -> None:
+    if not usage:
+        return
+    metrics.LLM_TOKENS.inc(usage["input_tokens"], kind="input", tier=tier)
+    metrics.LLM_TOKENS.inc(usage["cached_tokens"], kind="cached_input", tier=tier)
+    metrics.LLM_TOKENS.inc(usage["output_tokens"], kind="output", tier=tier)
+    if usage["input_tokens"]:
+        metrics.LLM_PROMPT_CACHED_RATIO.observe(usage["cached_ratio"], tier=tier)
+    if sp is not None:
+        sp.set(**{f"llm.{k}": v for k, v in usage.items()})
+
+
+def _merge_usage(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    parts = [p for p in parts if p]
+    if len(parts) <= 1:
+        return parts[0] if parts else {}
+    total = {k: sum(p.get(k, 0) for p in parts) for k in ("requests", "input_tokens", "cached_tokens", "output_tokens")}
+    total["cached_ratio"] = round(total["cached_tokens"] / total["input_tokens"], 4) if total["input_tokens"] else 0.0
+    return total
+
+
+# =========================
+# AGENT RUN + TIER ESCALATION
+# =========================
+@dataclass
+class _Attempt:
+    route: Route
+    reply: Optional[str] = None
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    usage: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[BaseException] = None
+    streamed_text: bool = False
+
+
+async def _run_attempt(plan: PromptPlan, route: Route) -> _Attempt:
+    attempt = _Attempt(route)
+    t0 = time.perf_counter()
+    try:
+        async with _todo_agent(route.model) as agent:
+            from agents import Runner
+
+            with tracing.span(
+                "agent.run", model=agent.model, tier=route.tier, route=route.reason
+            ) as sp, tracing.record_tool_calls() as calls:
+                attempt.tool_calls = calls
+                result = await Runner.run(agent, plan.prompt, run_config=_run_config())
+                attempt.usage = _usage(result)
+                _record_usage(attempt.usage, sp, route.tier)
+            attempt.reply = result.final_output or ""
+    except Exception as e:
+        attempt.error = e
+    finally:
+        metrics.CHAT_MODEL_RUN_SECONDS.observe(time.perf_counter() - t0, tier=route.tier)
+    return attempt
+
+
+def _judge(message: str, attempt: _Attempt, may_escalate: bool = True) -> Optional[Route]:
+    """Attempt ka outcome metrics me; small tier fail (aur kuch likha nahi) -> large route."""
+    problem = model_router.validate(message, attempt.reply, attempt.tool_calls, attempt.error)
+    outcome = "error" if attempt.error is not None else ("rejected" if problem else "ok")
+    metrics.CHAT_MODEL_RUNS.inc(tier=attempt.route.tier, outcome=outcome)
+    if not may_escalate or not model_router.should_escalate(attempt.route, problem, attempt.tool_calls):
+        return None
+    metrics.CHAT_MODEL_ESCALATIONS.inc(reason=problem)
+    return Route(TIER_LARGE, model_router.model_for(TIER_LARGE), f"escalated:{problem}")
+
+
+async def _begin_turn(user_id: str, message: str, conversation_id: Optional[int]) -> Tuple[int, PromptPlan]:
+    """
+    Shared prep for run_chat / run_chat_stream:
+    conversation resolve + history load (one session, no commit) -> prompt build.
+    User message is persisted together with the reply (_persist_turn).
+    """
+    _configure_openai()
 
-    set_default_openai_api(api_key)
+    with tracing.span("chat.begin_turn") as sp:
+        async with async_session() as session:
+            with metrics.CHAT_STAGE_SECONDS.time(stage="conversation"):
+                convo = await _resolve_conversation(session, user_id, conversation_id)
+            with metrics.CHAT_STAGE_SECONDS.time(stage="history"):
+                history = await aload_history(session, convo.id, HISTORY_LIMIT)
 
-    conversation_id = _get_or_create_conversation(user_id, conversation_id)
+        # token budget: old turns -> rolling summary, recent tail verbatim
+        plan = build_prompt(user_id, history, message, convo.summary, convo.summary_upto_id)
 
-    # history BEFORE storing new message
-    history = _load_history(conversation_id)
+        if sp is not None:
+            sp.set(conversation_id=convo.id, history_messages=len(history), summary_changed=plan.summary_changed)
 
-    _store_message(conversation_id=conversation_id, user_id=user_id, role="user", content=message)
+    return convo.id, plan
 
-    prompt = _build_prompt(user_id, history, message)
 
-    async with MCPServerStdio(
-        name="todo-mcp",
-        params={"command": "python", "args": ["-m", "app.mcp_tools.server"]},
-        client_session_timeout_seconds=60,
-    ) as todo_mcp:
-        agent = Agent(
-            name="TodoAgent",
-            instructions=SYSTEM_INSTRUCTIONS,
-            model=os.getenv("OPENAI_MODEL", "gpt-5"),
-            mcp_servers=[todo_mcp],
-        )
+async def _try_fast_path(user_id: str, message: str, conversation_id: Optional[int]) -> Optional[Dict[str, Any]]:
+    """
+    CHAT_FAST_PATH=1: exact commands -> same MCP tool function, no LLM.
+    Messages are persisted exactly like a normal turn.
+    """
+    if not fast_path.CHAT_FAST_PATH:
+        return None
+
+    intent = fast_path.parse_intent(message, user_id)
+    if intent is None:
+        fast_path.record(hit=False)
+        return None
+
+    from app.mcp_tools.inprocess import call_tool
+
+    # conversation pehle validate (invalid id -> tool run hi nahi hota)
+    convo = await _get_or_create_conversation(user_id, conversation_id)
 
-        result = await Runner.run(agent, prompt)
-        reply_text = result.final_output or "OK"
+    with tracing.tool_call(intent.tool, "fast_path") as entry:
+        result = await call_tool(intent.tool, intent.args)
+        entry["ok"] = bool(result.get("ok"))
+    fast_path.record(hit=True, error=not result.get("ok"))
+    reply_text = fast_path.format_reply(intent, result)
 
-    _store_message(conversation_id=conversation_id, user_id=user_id, role="assistant", content=reply_text)
+    await _persist_turn(conversation_id=convo.id, user_id=user_id, message=message, reply_text=reply_text)
 
-    return {"reply": reply_text, "conversation_id": conversation_id, "tool_calls": []}
+    return {
+        "reply": reply_text,
+        "conversation_id": convo.id,
+        "tool_calls": [{**entry, "arguments": intent.args}],
+        "fast_path": True,
+    }
+
+
+async def _store_shortcut_turn(user_id: str, conversation_id: Optional[int], message: str, reply_text: str) -> int:
+    """Turn answered without the agent (response cache): persist both messages."""
+    convo = await _get_or_create_conversation(user_id, conversation_id)
+    await _persist_turn(conversation_id=convo.id, user_id=user_id, message=message, reply_text=reply_text)
+    return convo.id
+
+
+async def run_chat(user_id: str, message: str, conversation_id: Optional[int] = None) -> Dict[str, Any]:
+    fast = await _try_fast_path(user_id, message, conversation_id)
+    if fast is not None:
+        return fast
+
+    # read-only query + unchanged task state -> cached reply, no agent run
+    cache_version: Optional[int] = None
+    if response_cache.RESPONSE_CACHE_ENABLED and response_cache.is_read_only(message):
+        cache_version = await response_cache.task_version(user_id)
+        cached = response_cache.lookup(user_id, message, cache_version)
+        if cached is not None:
+            convo_id = await _store_shortcut_turn(user_id, conversation_id, message, cached["reply"])
+            # no tools ran for this turn
+            return {"reply": cached["reply"], "conversation_id": convo_id, "tool_calls": [], "cached": True}
+
+    conversation_id, plan = await _begin_turn(user_id, message, conversation_id)
+
+    # simple turn -> small model; fail hua (aur kuch likha nahi) -> large model
+    try:
+        with metrics.CHAT_STAGE_SECONDS.time(stage="agent_run"):
+            attempts = [await _run_attempt(plan, model_router.classify(message))]
+            escalate_to = _judge(message, attempts[0])
+            if escalate_to is not None:
+                attempts.append(await _run_attempt(plan, escalate_to))
+                _judge(message, attempts[-1], may_escalate=False)
+    except asyncio.CancelledError:
+        # /chat timeout (wait_for) turn cancel karta hai: user message phir bhi save ho
+        await asyncio.shield(
+            _persist_turn(conversation_id=conversation_id, user_id=user_id, message=message, reply_text=None, plan=plan)
+        )
+        raise
+
+    final = attempts[-1]
+    tool_calls = [call for a in attempts for call in a.tool_calls]
+    usage = _merge_usage([a.usage for a in attempts])
+
+    if final.error is not None:
+        metrics.CHAT_ERRORS.inc(stage="agent_run")
+        # user message phir bhi save ho (pehle jaisa), reply ke bina
+        await _persist_turn(conversation_id=conversation_id, user_id=user_id, message=message, reply_text=None, plan=plan)
+        raise final.error
+
+    reply_text = final.reply or "OK"
+    _record_tool_calls(tool_calls)
+
+    await _persist_turn(
+        conversation_id=conversation_id, user_id=user_id, message=message, reply_text=reply_text, plan=plan
+    )
+
+    # sirf tab cache karo jab run ke dauran kuch likha na gaya ho
+    if cache_version is not None and await response_cache.task_version(user_id) == cache_version:
+        response_cache.store(user_id, message, cache_version, {"reply": reply_text})
+
+    return {"reply": reply_text, "conversation_id": conversation_id, "tool_calls": tool_calls, "usage": usage}
+
+
+def _record_tool_calls(tool_calls: List[Dict[str, Any]]) -> None:
+    metrics.CHAT_TOOL_CALLS_PER_TURN.observe(len(tool_calls))
+    for call in tool_calls:
+        metrics.CHAT_TOOL_CALLS.inc(tool=call["name"])
+
+
+def _call_id(raw: Any) -> Optional[str]:
+    if isinstance(raw, dict):
+        return raw.get("call_id")
+    return getattr(raw, "call_id", None)
+
+
+async def _stream_attempt(
+    plan: PromptPlan, route: Route, attempt: _Attempt, tool_names: Dict[str, str]
+) -> AsyncIterator[Dict[str, Any]]:
+    """One streamed agent run; result / error `attempt` me (exception bahar nahi aati)."""
+    t0 = time.perf_counter()
+    try:
+        async with _todo_agent(route.model) as agent:
+            from agents import Runner
+
+            with tracing.span(
+                "agent.run", model=agent.model, tier=route.tier, route=route.reason, streamed=True
+            ) as sp, tracing.record_tool_calls() as calls:
+                attempt.tool_calls = calls
+                result = Runner.run_streamed(agent, plan.prompt, run_config=_run_config())
+
+                async for ev in result.stream_events():
+                    if ev.type == "raw_response_event":
+                        if getattr(ev.data, "type", "") == "response.output_text.delta":
+                            attempt.streamed_text = True
+                            yield {"event": "delta", "data": {"text": ev.data.delta}}
+
+                    elif ev.type == "run_item_stream_event":
+                        raw = getattr(ev.item, "raw_item", None)
+                        if ev.name == "tool_called":
+                            call_id = _call_id(raw)
+                            name = getattr(raw, "name", None) or "tool"
+                            if call_id:
+                                tool_names[call_id] = name
+                            yield {"event": "tool_call_started", "data": {"call_id": call_id, "name": name}}
+                        elif ev.name == "tool_output":
+                            call_id = _call_id(raw)
+                            yield {
+                                "event": "tool_call_finished",
+                                "data": {"call_id": call_id, "name": tool_names.get(call_id or "", "tool")},
+                            }
+
+                # stream khatam -> usage final
+                attempt.usage = _usage(result)
+                _record_usage(attempt.usage, sp, route.tier)
+
+            attempt.reply = result.final_output or ""
+    except Exception as e:
+        attempt.error = e
+    finally:
+        metrics.CHAT_MODEL_RUN_SECONDS.observe(time.perf_counter() - t0, tier=route.tier)
+
+
+async def run_chat_stream(
+    user_id: str, message: str, conversation_id: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming variant of run_chat. Yields events as they happen:
+      start -> delta* / tool_call_started / tool_call_finished -> done
+
+    Tier escalation sirf tab jab small model ne abhi tak koi text stream na kiya ho
+    (client ko bheja gaya text wapas nahi liya ja sakta).
+
+    User + assistant messages are stored (one transaction) once the agent run completes (before "done");
+    timeout / client disconnect during the run -> sirf user message save hota hai.
+    """
+    fast = await _try_fast_path(user_id, message, conversation_id)
+    if fast is not None:
+        yield {"event": "start", "data": {"conversation_id": fast["conversation_id"]}}
+        yield {"event": "done", "data": fast}
+        return
+
+    conversation_id, plan = await _begin_turn(user_id, message, conversation_id)
+    yield {"event": "start", "data": {"conversation_id": conversation_id}}
+
+    tool_names: Dict[str, str] = {}
+
+    try:
+        with metrics.CHAT_STAGE_SECONDS.time(stage="agent_run"):
+            attempts = [_Attempt(model_router.classify(message))]
+            async for event in _stream_attempt(plan, attempts[0].route, attempts[0], tool_names):
+                yield event
+            escalate_to = _judge(message, attempts[0], may_escalate=not attempts[0].streamed_text)
+            if escalate_to is not None:
+                attempts.append(_Attempt(escalate_to))
+                async for event in _stream_attempt(plan, escalate_to, attempts[-1], tool_names):
+                    yield event
+                _judge(message, attempts[-1], may_escalate=False)
+    except (asyncio.CancelledError, GeneratorExit):
+        # CHAT_RUN_TIMEOUT (wait_for on __anext__) ya client disconnect (aclose):
+        # user message phir bhi save ho
+        await asyncio.shield(
+            _persist_turn(conversation_id=conversation_id, user_id=user_id, message=message, reply_text=None, plan=plan)
+        )
+        raise
+
+    final = attempts[-1]
+    tool_calls = [call for a in attempts for call in a.tool_calls]
+    usage = _merge_usage([a.usage for a in attempts])
+
+    if final.error is not None:
+        metrics.CHAT_ERRORS.inc(stage="agent_run")
+        # user message phir bhi save ho (pehle jaisa), reply ke bina
+        await _persist_turn(conversation_id=conversation_id, user_id=user_id, message=message, reply_text=None, plan=plan)
+        raise final.error
+
+    reply_text = final.reply or "OK"
+    _record_tool_calls(tool_calls)
+
+    await _persist_turn(
+        conversation_id=conversation_id, user_id=user_id, message=message, reply_text=reply_text, plan=plan
+    )
+
+    yield {
+        "event": "done",
+        "data": {
+            "reply": reply_text,
+            "conversation_id": conversation_id,
+            "tool_calls": tool_calls,
+            "usage": usage,
+        },
+    }
@@ -0,0 +1,289 @@
+# backend/app/chat_scheduler.py
+"""
+Admission control in front of run_chat / run_chat_stream.
+
+- per-user serialization: ek user ke turns ek-ek karke (FIFO asyncio.Lock), is liye
+  double-click "send" do parallel agent runs nahi banata aur conversation order same rehta hai
+- multiple workers (gunicorn): Postgres pe per-user advisory lock bhi liya jata hai, is liye
+  do workers pe aaye clicks bhi serialize hote hain. SQLite (ya CHAT_USER_LOCK=local) pe
+  guarantee sirf ek worker ke andar hai
+- global cap: CHAT_MAX_CONCURRENCY agent runs per worker (model calls + MCP sessions + DB conns)
+- bounded wait: CHAT_QUEUE_MAX tak requests wait kar sakti hain; us ke baad 503,
+  aur ek user ke CHAT_PER_USER_PENDING se zyada pending turns -> 429 (dono Retry-After ke saath)
+- CHAT_QUEUE_TIMEOUT: slot ke liye max wait (-> 503); CHAT_RUN_TIMEOUT: router ka turn timeout
+"""
+import asyncio
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Set
+
+from app import metrics
+from app.database import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+CHAT_MAX_CONCURRENCY = int(os.getenv("CHAT_MAX_CONCURRENCY", "16"))
+CHAT_QUEUE_MAX = int(os.getenv("CHAT_QUEUE_MAX", "64"))
+CHAT_PER_USER_PENDING = int(os.getenv("CHAT_PER_USER_PENDING", "3"))
+CHAT_QUEUE_TIMEOUT = float(os.getenv("CHAT_QUEUE_TIMEOUT", "30"))
+CHAT_RUN_TIMEOUT = float(os.getenv("CHAT_RUN_TIMEOUT", "120"))
+# auto: Postgres -> cross-worker advisory lock, warna local; local: sirf is worker me
+CHAT_USER_LOCK = os.getenv("CHAT_USER_LOCK", "auto").strip().lower()
+CHAT_USER_LOCK_POLL = float(os.getenv("CHAT_USER_LOCK_POLL", "0.05"))
+
+# advisory lock namespace (pg_advisory_lock(int4, int4)): doosre advisory lock users se alag
+_LOCK_NAMESPACE = 0x43484154  # "CHAT"
+
+
+class ChatOverloaded(Exception):
+    """Turn not admitted. status_code: 429 (this user) | 503 (server busy)."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: int) -> None:
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass
+class _UserSlot:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    pending: int = 0  # waiting + running turns of this user
+
+
+@dataclass
+class Ticket:
+    user_id: str
+    started: float
+    released: bool = False
+    cross_worker: bool = False  # advisory lock held (release pe unlock)
+
+
+class _AdvisoryUserLocks:
+    """
+    Per-user Postgres session-level advisory locks, ek dedicated autocommit connection
+    per worker pe. Same worker ke turns pehle hi local lock se serialize hain (aur advisory
+    locks per session re-entrant hain), is liye ek connection kaafi hai.
+    DB issue -> warning + local lock only (chat fail nahi hota).
+    """
+
+    def __init__(self) -> None:
+        self._engine: Any = None
+        self._conn: Any = None
+        self._io: Optional[asyncio.Lock] = None
+        self._background: Set["asyncio.Task[Any]"] = set()
+        self.stats = {"acquired": 0, "contended": 0, "errors": 0}
+
+    async def _execute(self, fn: str, user_id: str) -> bool:
+        from sqlalchemy import text
+
+        if self._io is None:
+            self._io = asyncio.Lock()
+        async with self._io:
+            try:
+                if self._conn is None:
+                    if self._engine is None:
+                        from sqlalchemy.ext.asyncio import create_async_engine
+                        from sqlalchemy.pool import NullPool
+
+                        from app.database import _to_async_url
+
+                        url, connect_args = _to_async_url(DATABASE_URL)
+                        self._engine = create_async_engine(url, poolclass=NullPool, connect_args=connect_args)
+                    conn = await self._engine.connect()
+                    # no open transaction between turns (session locks transaction se independent hain)
+                    self._conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                result = await self._conn.execute(
+                    text(f"SELECT {fn}(:ns, hashtext(:user_id))"), {"ns": _LOCK_NAMESPACE, "user_id": user_id}
+                )
+                return bool(result.scalar())
+            except Exception:
+                # connection gaya -> us pe held locks bhi server ne chhod diye
+                conn, self._conn = self._conn, None
+                if conn is not None:
+                    try:
+                        await conn.close()
+                    except Exception:
+                        pass
+                raise
+
+    async def acquire(self, user_id: str) -> bool:
+        """True = lock held (release() zaroori); False = backend unavailable, local lock only."""
+        contended = False
+        while True:
+            attempt = asyncio.ensure_future(self._execute("pg_try_advisory_lock", user_id))
+            try:
+                got = await asyncio.shield(attempt)
+            except asyncio.CancelledError:
+                # queue timeout beech me: lock mil gaya ho to chhod do (warna user doosre workers pe atak jata)
+                attempt.add_done_callback(lambda t: self._unlock_if_held(t, user_id))
+                raise
+            except Exception:
+                self.stats["errors"] += 1
+                logger.warning("chat user lock unavailable; serializing within this worker only", exc_info=True)
+                return False
+            if got:
+                self.stats["acquired"] += 1
+                return True
+            if not contended:
+                contended = True
+                self.stats["contended"] += 1
+            await asyncio.sleep(CHAT_USER_LOCK_POLL)
+
+    def _unlock_if_held(self, attempt: "asyncio.Task[Any]", user_id: str) -> None:
+        if not attempt.cancelled() and attempt.exception() is None and attempt.result():
+            self.release(user_id)
+
+    def release(self, user_id: str) -> None:
+        task = asyncio.ensure_future(self._unlock(user_id))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _unlock(self, user_id: str) -> None:
+        try:
+            await self._execute("pg_advisory_unlock", user_id)
+        except Exception:
+            self.stats["errors"] += 1
+            logger.warning("chat user lock release failed (connection reset releases it)", exc_info=True)
+
+    async def close(self) -> None:
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+
+def _cross_worker_locks() -> Optional[_AdvisoryUserLocks]:
+    if CHAT_USER_LOCK == "local" or not DATABASE_URL.startswith(("postgres", "postgresql")):
+        return None
+    return _AdvisoryUserLocks()
+
+
+class ChatScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = CHAT_MAX_CONCURRENCY,
+        queue_max: int = CHAT_QUEUE_MAX,
+        per_user_pending: int = CHAT_PER_USER_PENDING,
+        queue_timeout: float = CHAT_QUEUE_TIMEOUT,
+        user_locks: Optional[_AdvisoryUserLocks] = None,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.queue_max = max(0, queue_max)
+        self.per_user_pending = max(1, per_user_pending)
+        self.queue_timeout = queue_timeout
+        self._sem = asyncio.Semaphore(self.max_concurrency)
+        self._users: Dict[str, _UserSlot] = {}
+        self._user_locks = user_locks
+        self.waiting = 0
+        self.active = 0
+        # EWMA of turn duration -> Retry-After estimate
+        self._avg_run = 5.0
+        self.stats = {"admitted": 0, "rejected": 0, "timeouts": 0}
+
+    def _retry_after(self, per_user: bool = False) -> int:
+        if per_user:
+            estimate = self._avg_run
+        else:
+            estimate = self._avg_run * (self.waiting + 1) / self.max_concurrency
+        return max(1, min(60, math.ceil(estimate)))
+
+    def _reject(self, status_code: int, reason: str, per_user: bool = False) -> ChatOverloaded:
+        self.stats["rejected"] += 1
+        metrics.CHAT_REJECTED.inc(reason=reason)
+        return ChatOverloaded(status_code, reason, self._retry_after(per_user))
+
+    def _drop_user(self, user_id: str, user: _UserSlot) -> None:
+        user.pending -= 1
+        if user.pending <= 0 and self._users.get(user_id) is user:
+            del self._users[user_id]
+
+    async def _acquire_all(self, user_id: str, user: _UserSlot) -> bool:
+        """local user lock -> cross-worker user lock -> global slot. Returns cross_worker."""
+        await user.lock.acquire()
+        cross_worker = False
+        try:
+            if self._user_locks is not None:
+                cross_worker = await self._user_locks.acquire(user_id)
+            await self._sem.acquire()
+        except BaseException:
+            if cross_worker:
+                self._user_locks.release(user_id)
+            user.lock.release()
+            raise
+        return cross_worker
+
+    async def acquire(self, user_id: str) -> Ticket:
+        user = self._users.get(user_id)
+        if user is None:
+            user = self._users[user_id] = _UserSlot()
+
+        if user.pending >= self.per_user_pending:
+            raise self._reject(429, "user_busy", per_user=True)
+        if self.waiting >= self.queue_max and (user.lock.locked() or self._sem.locked()):
+            raise self._reject(503, "queue_full")
+
+        user.pending += 1
+        self.waiting += 1
+        t0 = time.perf_counter()
+        try:
+            cross_worker = await asyncio.wait_for(self._acquire_all(user_id, user), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            self._drop_user(user_id, user)
+            raise self._reject(503, "queue_timeout")
+        except BaseException:
+            self._drop_user(user_id, user)
+            raise
+        finally:
+            self.waiting -= 1
+            metrics.CHAT_QUEUE_WAIT_SECONDS.observe(time.perf_counter() - t0)
+
+        self.active += 1
+        self.stats["admitted"] += 1
+        return Ticket(user_id=user_id, started=time.perf_counter(), cross_worker=cross_worker)
+
+    def release(self, ticket: Ticket) -> None:
+        if ticket.released:
+            return
+        ticket.released = True
+        user = self._users.get(ticket.user_id)
+        self.active -= 1
+        self._sem.release()
+        self._avg_run = 0.8 * self._avg_run + 0.2 * (time.perf_counter() - ticket.started)
+        if ticket.cross_worker and self._user_locks is not None:
+            self._user_locks.release(ticket.user_id)
+        if user is not None:
+            user.lock.release()
+            self._drop_user(ticket.user_id, user)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "active": self.active,
+            "waiting": self.waiting,
+            "users": len(self._users),
+            "max_concurrency": self.max_concurrency,
+            "queue_max": self.queue_max,
+            "avg_run_seconds": round(self._avg_run, 3),
+            "cross_worker_locks": self._user_locks is not None,
+            **({f"user_lock_{k}": v for k, v in self._user_locks.stats.items()} if self._user_locks else {}),
+        }
+
+    async def close(self) -> None:
+        if self._user_locks is not None:
+            await self._user_locks.close()
+
+
+chat_scheduler = ChatScheduler(user_locks=_cross_worker_locks())
+
+
+def chat_scheduler_stats() -> Dict[str, Any]:
+    return chat_scheduler.snapshot()
@@ -1,8 +1,15 @@
-from typing import Optional, List, Dict
+from typing import TYPE_CHECKING, Any, Optional, List, Dict
 from sqlmodel import Session, select
 
+if TYPE_CHECKING:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
 from app.models import Conversation, Message
 
+# default prompt history window (messages)
+HISTORY_LIMIT = 30
+
+
 def get_or_create_conversation(session: Session, user_id: str) -> Conversation:
     convo = session.exec(
         select(Conversation).where(Conversation.user_id == user_id).order_by(Conversation.id.desc())
@@ -17,15 +24,55 @@ def get_or_create_conversation(session: Session, user_id: str) -> Conversation:
     session.refresh(convo)
     return convo
 
-def load_history(session: Session, conversation_id: int, limit: int = 50) -> List[Dict[str, str]]:
-    msgs = session.exec(
+
+# =========================
+# HISTORY (single path)
+# =========================
+# Bounded DESC window on (conversation_id, id) index, reversed in memory.
+# Cost per turn = O(limit), conversation length se independent.
+
+def _history_window(conversation_id: int, limit: int):
+    return (
         select(Message)
         .where(Message.conversation_id == conversation_id)
-        .order_by(Message.id.asc())
+        .order_by(Message.id.desc())
         .limit(limit)
-    ).all()
+    )
+
+
+def _to_history(msgs: List[Message]) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for m in msgs:
+        role = (m.role or "").lower().strip()
+        if role not in ("user", "assistant"):
+            # fallback: treat unknown as assistant to avoid breaking context
+            role = "assistant"
+        out.append({"id": m.id, "role": role, "content": m.content})
+    return out
+
+
+def load_history_messages(session: Session, conversation_id: int, limit: int = HISTORY_LIMIT) -> List[Message]:
+    """Last N messages, oldest -> newest."""
+    rows = session.exec(_history_window(conversation_id, limit)).all()
+    return list(reversed(rows))
+
+
+async def aload_history_messages(
+    session: "AsyncSession", conversation_id: int, limit: int = HISTORY_LIMIT
+) -> List[Message]:
+    rows = (await session.exec(_history_window(conversation_id, limit))).all()
+    return list(reversed(rows))
+
+
+def load_history(session: Session, conversation_id: int, limit: int = HISTORY_LIMIT) -> List[Dict[str, Any]]:
+    return _to_history(load_history_messages(session, conversation_id, limit))
+
+
+async def aload_history(
+    session: "AsyncSession", conversation_id: int, limit: int = HISTORY_LIMIT
+) -> List[Dict[str, Any]]:
+    return _to_history(await aload_history_messages(session, conversation_id, limit))
 
-    return [{"role": m.role, "content": m.content} for m in msgs]
 
 def save_message(session: Session, conversation_id: int, role: str, content: str) -> Message:
     msg = Message(conversation_id=conversation_id, role=role, content=content)
@@ -4,7 +4,10 @@ import os
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 
 from dotenv import load_dotenv
-from sqlmodel import create_engine
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel, Session, create_engine
+
+from app import metrics, tracing
 
 load_dotenv()
 
@@ -33,16 +36,177 @@ def _ensure_pg_sslmode_require(db_url: str) -> str:
     )
 
 
-DATABASE_URL = _ensure_pg_sslmode_require(os.getenv("DATABASE_URL", ""))
+DEFAULT_DATABASE_URL = "sqlite:///./dev.db"
+
+# ✅ ONE engine config for the whole app (routers, agent_runner, MCP tools).
+# Pehle app/db.py (SQLite default) aur app/database.py (DATABASE_URL required)
+# do alag pools/DBs bana sakte the.
+DATABASE_URL = _ensure_pg_sslmode_require(os.getenv("DATABASE_URL", "") or DEFAULT_DATABASE_URL)
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+
+def _pool_kwargs(db_url: str) -> dict:
+    # SQLite pe pool sizing ka koi faida nahi (file lock), sirf server DBs ke liye
+    if db_url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+
+
+def _to_async_url(db_url: str) -> tuple:
+    """
+    Sync URL -> async driver URL (+ connect_args).
+    - postgres  -> postgresql+asyncpg  (asyncpg `ssl` arg instead of libpq `sslmode`)
+    - sqlite    -> sqlite+aiosqlite
+    """
+    connect_args: dict = {}
+    parsed = urlparse(db_url)
+    scheme = parsed.scheme.split("+", 1)[0]
+
+    if scheme in ("postgresql", "postgres"):
+        q = parse_qs(parsed.query)
+        sslmode = (q.pop("sslmode", [None])[0] or "").lower()
+        q.pop("channel_binding", None)  # libpq-only option
+        if sslmode and sslmode != "disable":
+            connect_args["ssl"] = "require" if sslmode in ("require", "prefer", "allow") else True
+        return (
+            urlunparse(
+                ("postgresql+asyncpg", parsed.netloc, parsed.path, parsed.params,
+                 urlencode(q, doseq=True), parsed.fragment)
+            ),
+            connect_args,
+        )
+
+    if scheme == "sqlite":
+        return db_url.replace(parsed.scheme, "sqlite+aiosqlite", 1), connect_args
+
+    return db_url, connect_args
+
+
+# =========================
+# LAZY ENGINES
+# =========================
+# Engines / drivers pehli baar use hone pe bante hain (import pe nahi), is liye
+# cold start aur MCP child start me sirf wahi load hota hai jo chahiye.
+_engine = None
+_async_engine = None
+_async_session_factory = None
+
+# Session.commit() timing -> /metrics (no-op when METRICS_ENABLED=0)
+metrics.instrument_db_commits()
+# SQL statement spans (no-op unless TRACE_EXPORTER is set)
+tracing.instrument_sql()
+
+
+def get_engine():
+    """Sync engine: /tasks router + MCP tools."""
+    global _engine
+    if _engine is None:
+        connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+        # ✅ pool_pre_ping avoids stale connections ("SSL connection closed unexpectedly")
+        # ✅ pool_recycle prevents long-idle SSL connections
+        _engine = create_engine(
+            DATABASE_URL,
+            echo=False,
+            pool_pre_ping=True,
+            pool_recycle=1800,
+            connect_args=connect_args,
+            **_pool_kwargs(DATABASE_URL),
+        )
+    return _engine
+
+
+def get_async_engine():
+    """Async engine: chat path (agent_runner + /chat router), event loop block nahi hota."""
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        url, connect_args = _to_async_url(DATABASE_URL)
+        _async_engine = create_async_engine(
+            url,
+            echo=False,
+            pool_pre_ping=True,
+            pool_recycle=1800,
+            connect_args=connect_args,
+            **_pool_kwargs(DATABASE_URL),
+        )
+    return _async_engine
+
+
+def async_session():
+    """New AsyncSession (use as `async with async_session() as session`)."""
+    global _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        from sqlmodel.ext.asyncio.session import AsyncSession
+
+        _async_session_factory = async_sessionmaker(
+            get_async_engine(), class_=AsyncSession, expire_on_commit=False
+        )
+    return _async_session_factory()
+
+
+async def dispose_engines() -> None:
+    global _engine, _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
+    _engine = _async_engine = _async_session_factory = None
+
+
+def get_session():
+    with Session(get_engine()) as session:
+        yield session
+
+
+async def get_async_session():
+    async with async_session() as session:
+        yield session
+
+
+def __getattr__(name: str):
+    # backward compat: `from app.database import engine` (engine then built on first access)
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def init_db() -> None:
+    """
+    create_all sirf missing TABLES banata hai; existing tables pe naye nullable
+    columns (e.g. conversations.summary) aur naye indexes
+    (e.g. messages(conversation_id, id)) bhi yahan add ho jate hain.
+    """
+    import app.models  # noqa: F401  (register tables)
+
+    engine = get_engine()
+    SQLModel.metadata.create_all(engine)
+
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            existing = {c["name"] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name in existing or not col.nullable:
+                    continue
+                col_type = col.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{col.name}" {col_type}'))
+
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
 
-if not DATABASE_URL:
-    raise RuntimeError("DATABASE_URL is missing. Set it in .env or deployment env vars.")
+    # title search: pg_trgm GIN / SQLite FTS5 + triggers
+    from app.task_search import ensure_search_index
 
-# ✅ pool_pre_ping avoids stale connections ("SSL connection closed unexpectedly")
-# ✅ pool_recycle prevents long-idle SSL connections
-engine = create_engine(
-    DATABASE_URL,
-    echo=False,
-    pool_pre_ping=True,
-    pool_recycle=1800,
-)
+    ensure_search_index(engine)
@@ -1,17 +1,9 @@
-import os
-from sqlmodel import SQLModel, create_engine, Session
+# backend/app/db.py
+# Compat shim: single engine config lives in app/database.py
+from app.database import DATABASE_URL, get_engine, get_session, init_db  # noqa: F401
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./dev.db")
 
-connect_args = {}
-if DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
-
-engine = create_engine(DATABASE_URL, echo=False, connect_args=connect_args)
-
-def init_db():
-    SQLModel.metadata.create_all(engine)
-
-def get_session():
-    with Session(engine) as session:
-        yield session
+def __getattr__(name: str):
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,233 @@
+# backend/app/delta_sync.py
+"""
+Delta sync for clients (bohot saare tabs -> sirf jo badla wahi bhejo).
+
+- task cursor = user ka TaskVersion. Har task write same transaction me version bump
+  karta hai, changed rows pe change_version stamp hota hai aur deletes ke tombstones
+  bante hain (bump_task_version). Version row commit tak locked rehta hai, is liye
+  versions commit order me milte hain (updated_at timestamps pe ye guarantee nahi)
+- task_changes(since): {"tasks": [...], "deleted": [ids], "cursor": version}
+  since=0 / unknown cursor / SYNC_MAX_CHANGES se zyada -> "reset": true,
+  client full list GET /tasks se le (X-Task-Version header = naya cursor)
+- message cursor = last message id (messages append-only hain)
+- long-poll (wait=...): ek worker pe same user / conversation ke saare waiters ek hi
+  DB read share karte hain (SYNC_POLL_INTERVAL me max ek PK / index lookup)
+- weak ETags (version / last id + query params) -> If-None-Match pe 304
+"""
+import asyncio
+import hashlib
+import os
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlmodel import select
+from starlette.responses import Response
+
+from app.database import async_session
+from app.models import Conversation, Message, Task, TaskTombstone
+from app.task_cache import acurrent_task_version
+from app.task_queries import task_to_dict
+
+if TYPE_CHECKING:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+SYNC_MAX_WAIT = float(os.getenv("SYNC_MAX_WAIT", "25"))
+SYNC_POLL_INTERVAL = float(os.getenv("SYNC_POLL_INTERVAL", "1.0"))
+SYNC_MAX_CHANGES = int(os.getenv("SYNC_MAX_CHANGES", "500"))
+
+# browser har baar revalidate kare (If-None-Match), stale copy use na kare
+CACHE_CONTROL = "private, no-cache"
+
+_WATCH_MAX_KEYS = 10000
+
+
+# =========================
+# ETAG
+# =========================
+def make_etag(*parts: Any) -> str:
+    raw = ":".join("" if p is None else str(p) for p in parts)
+    return 'W/"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison (RFC 9110): W/ prefix ignore."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == bare:
+            return True
+    return False
+
+
+def not_modified(etag: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL, **(headers or {})})
+
+
+# =========================
+# LONG-POLL (shared reads)
+# =========================
+class _Watch:
+    """key -> (checked_at, value); concurrent waiters same key pe ek hi load share karte hain."""
+
+    def __init__(self) -> None:
+        self._seen: Dict[Hashable, Tuple[float, int]] = {}
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+        self.stats = {"loads": 0, "shared": 0}
+
+    def _fresh(self, key: Hashable) -> Optional[int]:
+        hit = self._seen.get(key)
+        if hit is not None and time.monotonic() - hit[0] < SYNC_POLL_INTERVAL:
+            return hit[1]
+        return None
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - SYNC_POLL_INTERVAL
+        for key in [k for k, (at, _) in self._seen.items() if at < cutoff]:
+            del self._seen[key]
+            lock = self._locks.get(key)
+            if lock is not None and not lock.locked():
+                del self._locks[key]
+
+    async def value(self, key: Hashable, load: Callable[[], Awaitable[int]]) -> int:
+        hit = self._fresh(key)
+        if hit is not None:
+            self.stats["shared"] += 1
+            return hit
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            hit = self._fresh(key)
+            if hit is not None:
+                self.stats["shared"] += 1
+                return hit
+            value = await load()
+            self.stats["loads"] += 1
+            self._seen[key] = (time.monotonic(), value)
+        if len(self._seen) > _WATCH_MAX_KEYS:
+            self._prune()
+        return value
+
+    async def wait_past(self, key: Hashable, load: Callable[[], Awaitable[int]], cursor: int, wait: float) -> int:
+        """value != cursor hone tak (ya `wait` seconds) poll karo; last seen value return."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max(0.0, min(wait, SYNC_MAX_WAIT))
+        while True:
+            value = await self.value(key, load)
+            remaining = deadline - loop.time()
+            if value != cursor or remaining <= 0:
+                return value
+            await asyncio.sleep(min(SYNC_POLL_INTERVAL, remaining))
+
+
+_watch = _Watch()
+
+
+async def _load_task_version(user_id: str) -> int:
+    async with async_session() as session:
+        return await acurrent_task_version(session, user_id)
+
+
+async def _load_last_message_id(conversation_id: int) -> int:
+    async with async_session() as session:
+        return await last_message_id(session, conversation_id)
+
+
+async def wait_for_task_change(user_id: str, since: int, wait: float) -> int:
+    return await _watch.wait_past(("tasks", user_id), lambda: _load_task_version(user_id), since, wait)
+
+
+async def wait_for_message(conversation_id: int, after_id: int, wait: float) -> int:
+    return await _watch.wait_past(
+        ("messages", conversation_id), lambda: _load_last_message_id(conversation_id), after_id, wait
+    )
+
+
+# =========================
+# TASKS
+# =========================
+def task_list_etag(user_id: str, version: int, *params: Any) -> str:
+    return make_etag("tasks", user_id, version, *params)
+
+
+async def task_changes(session: "AsyncSession", user_id: str, since: int) -> Dict[str, Any]:
+    """Tasks changed / deleted after version `since` (upto the current version)."""
+    version = await acurrent_task_version(session, user_id)
+    out: Dict[str, Any] = {"cursor": version, "reset": False, "tasks": [], "deleted": []}
+    if since <= 0 or since > version:
+        out["reset"] = True
+        return out
+    if since == version:
+        return out
+
+    # `<= version`: baad me commit hue writes agle cursor me aayenge
+    rows = (
+        await session.exec(
+            select(Task)
+            .where(Task.user_id == user_id, Task.change_version > since, Task.change_version <= version)
+            .order_by(Task.change_version, Task.id)
+            .limit(SYNC_MAX_CHANGES + 1)
+        )
+    ).all()
+    deleted = (
+        await session.exec(
+            select(TaskTombstone.task_id)
+            .where(TaskTombstone.user_id == user_id, TaskTombstone.version > since, TaskTombstone.version <= version)
+            .order_by(TaskTombstone.version, TaskTombstone.id)
+            .limit(SYNC_MAX_CHANGES + 1)
+        )
+    ).all()
+    if len(rows) + len(deleted) > SYNC_MAX_CHANGES:
+        out["reset"] = True
+        return out
+
+    out["tasks"] = [task_to_dict(t) for t in rows]
+    out["deleted"] = list(dict.fromkeys(deleted))
+    return out
+
+
+# =========================
+# MESSAGES
+# =========================
+async def owns_conversation(session: "AsyncSession", user_id: str, conversation_id: int) -> bool:
+    convo = await session.get(Conversation, conversation_id)
+    return convo is not None and convo.user_id == user_id
+
+
+async def last_message_id(session: "AsyncSession", conversation_id: int) -> int:
+    # (conversation_id, id) index -> max() index se hi
+    value = (
+        await session.exec(select(func.max(Message.id)).where(Message.conversation_id == conversation_id))
+    ).one()
+    return int(value or 0)
+
+
+async def message_changes(
+    session: "AsyncSession", conversation_id: int, after_id: int, limit: int
+) -> Dict[str, Any]:
+    rows = (
+        await session.exec(
+            select(Message)
+            .where(Message.conversation_id == conversation_id, Message.id > after_id)
+            .order_by(Message.id)
+            .limit(limit + 1)
+        )
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    messages: List[Dict[str, Any]] = [
+        {"id": m.id, "role": m.role, "content": m.content, "created_at": m.created_at} for m in rows
+    ]
+    return {
+        "conversation_id": conversation_id,
+        "messages": messages,
+        "cursor": rows[-1].id if rows else after_id,
+        "has_more": has_more,
+    }
+
+
+def delta_sync_stats() -> Dict[str, Any]:
+    return {**_watch.stats, "watched_keys": len(_watch._seen)}
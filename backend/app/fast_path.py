@@ -0,0 +1,108 @@
+# backend/app/fast_path.py
+"""
+Deterministic intent fast-path (opt-in: CHAT_FAST_PATH=1).
+
+Sirf bilkul unambiguous commands ("add buy milk", "list", "list pending",
+"complete 12", "delete 7") ko LLM ke bina directly same MCP tool functions se
+execute karta hai. Kuch bhi ambiguous ho (multiple items, extra words) -> None,
+aur normal agent flow chalta hai.
+"""
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+CHAT_FAST_PATH = os.getenv("CHAT_FAST_PATH", "0") == "1"
+
+_MAX_TITLE = 200
+
+_ADD = re.compile(r"^(?:add|create)\s+(?:task\s+)?(?P<title>.+)$", re.IGNORECASE)
+_LIST = re.compile(
+    r"^(?:list|show|tasks)(?:\s+(?:my|all))?(?:\s+(?P<status>pending|open|completed|done))?(?:\s+tasks)?$",
+    re.IGNORECASE,
+)
+_COMPLETE = re.compile(r"^(?:complete|finish|done)\s+(?:task\s+)?#?(?P<id>\d+)$", re.IGNORECASE)
+_DELETE = re.compile(r"^(?:delete|remove)\s+(?:task\s+)?#?(?P<id>\d+)$", re.IGNORECASE)
+
+# multi-item / conversational hints -> let the agent handle it
+_AMBIGUOUS = re.compile(r"(,|;|\band\b|\bthen\b|\?|\n)", re.IGNORECASE)
+
+# "add a task" jaise vague titles -> agent puchega kya add karna hai
+_VAGUE_TITLES = {"task", "a task", "new task", "a new task", "something", "tasks", "it", "this", "that"}
+
+_stats: Dict[str, int] = {"hits": 0, "misses": 0, "errors": 0}
+
+
+@dataclass
+class Intent:
+    tool: str
+    args: Dict[str, Any]
+
+
+def parse_intent(message: str, user_id: str) -> Optional[Intent]:
+    text = (message or "").strip().rstrip(".!")
+    if not text:
+        return None
+
+    m = _LIST.match(text)
+    if m:
+        args: Dict[str, Any] = {"user_id": user_id}
+        if m.group("status"):
+            args["status"] = m.group("status").lower()
+        return Intent("list_tasks", args)
+
+    m = _COMPLETE.match(text)
+    if m:
+        return Intent("complete_task", {"user_id": user_id, "task_id": int(m.group("id"))})
+
+    m = _DELETE.match(text)
+    if m:
+        return Intent("delete_task", {"user_id": user_id, "task_id": int(m.group("id"))})
+
+    m = _ADD.match(text)
+    if m:
+        title = m.group("title").strip().strip('"').strip("'").strip()
+        if (
+            title
+            and len(title) <= _MAX_TITLE
+            and title.lower() not in _VAGUE_TITLES
+            and not _AMBIGUOUS.search(title)
+        ):
+            return Intent("add_task", {"user_id": user_id, "title": title})
+
+    return None
+
+
+def format_reply(intent: Intent, result: Dict[str, Any]) -> str:
+    if not result.get("ok"):
+        return result.get("error") or "Something went wrong."
+
+    if intent.tool == "add_task":
+        t = result.get("task") or {}
+        return f"Task added: {t.get('title')} (id {t.get('id')})"
+    if intent.tool == "complete_task":
+        return f"Task {intent.args['task_id']} completed."
+    if intent.tool == "delete_task":
+        return f"Task {intent.args['task_id']} deleted."
+
+    tasks = result.get("tasks") or []
+    if not tasks:
+        return "No tasks found."
+    items = [f"#{t['id']} {t['title']}{' (done)' if t.get('completed') else ''}" for t in tasks]
+    more = " (more available)" if result.get("next_after_id") else ""
+    return f"{len(tasks)} task(s): " + "; ".join(items) + more
+
+
+def record(hit: bool, error: bool = False) -> None:
+    _stats["hits" if hit else "misses"] += 1
+    if error:
+        _stats["errors"] += 1
+
+
+def fast_path_stats() -> Dict[str, Any]:
+    total = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "enabled": CHAT_FAST_PATH,
+        "hit_rate": round(_stats["hits"] / total, 4) if total else 0.0,
+    }
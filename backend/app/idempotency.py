@@ -0,0 +1,134 @@
+# backend/app/idempotency.py
+"""
+Idempotency-Key support for POST /chat and the task POST routes.
+
+Pehli request key "claim" karti hai (idempotency_keys row, status pending),
+response store hota hai; same key ke saath retry pe stored response replay
+hota hai (header Idempotent-Replayed: true). DB-backed hai, is liye multiple
+workers / pods ke beech bhi kaam karta hai.
+
+- same key, different body      -> 422
+- same key, first still running -> 409
+- 5xx / 429 / exception         -> key release (client retry kar sakta hai)
+"""
+import hashlib
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy.exc import IntegrityError
+
+from app.database import async_session
+from app.models import IdempotencyKey
+
+IDEMPOTENCY_TTL = timedelta(hours=float(os.getenv("IDEMPOTENCY_TTL_HOURS", "24")))
+IDEMPOTENCY_PENDING_TIMEOUT = timedelta(seconds=float(os.getenv("IDEMPOTENCY_PENDING_TIMEOUT", "300")))
+
+HEADER = "Idempotency-Key"
+
+# POST /api/{user_id}/chat, /tasks, /tasks/bulk, /tasks/bulk/delete
+_PATHS = re.compile(r"^/api/[^/]+/(?:chat|tasks(?:/bulk(?:/delete)?)?)/?$")
+
+
+def _sha(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+async def _claim(record_id: str, request_hash: str) -> Tuple[str, Optional[IdempotencyKey]]:
+    """-> ("claimed" | "replay" | "in_progress" | "mismatch", row)"""
+    now = datetime.utcnow()
+    async with async_session() as session:
+        row = await session.get(IdempotencyKey, record_id)
+        if row is not None:
+            expired = row.created_at < now - IDEMPOTENCY_TTL
+            abandoned = row.status_code is None and row.created_at < now - IDEMPOTENCY_PENDING_TIMEOUT
+            if expired or abandoned:
+                await session.delete(row)
+                await session.commit()
+            elif row.request_hash != request_hash:
+                return "mismatch", row
+            elif row.status_code is None:
+                return "in_progress", row
+            else:
+                return "replay", row
+
+        session.add(IdempotencyKey(id=record_id, request_hash=request_hash, created_at=now))
+        try:
+            await session.commit()
+        except IntegrityError:
+            # parallel retry ne pehle claim kar liya
+            return "in_progress", None
+    return "claimed", None
+
+
+async def _complete(record_id: str, status_code: int, body: bytes, media_type: Optional[str]) -> None:
+    async with async_session() as session:
+        row = await session.get(IdempotencyKey, record_id)
+        if row is None:
+            return
+        row.status_code = status_code
+        row.response_body = body.decode("utf-8", errors="replace")
+        row.media_type = media_type
+        await session.commit()
+
+
+async def _release(record_id: str) -> None:
+    async with async_session() as session:
+        row = await session.get(IdempotencyKey, record_id)
+        if row is not None and row.status_code is None:
+            await session.delete(row)
+            await session.commit()
+
+
+async def idempotency_middleware(request: Request, call_next):
+    key = request.headers.get(HEADER)
+    if not key or request.method != "POST" or not _PATHS.match(request.url.path):
+        return await call_next(request)
+
+    if len(key) > 255:
+        return JSONResponse({"detail": f"{HEADER} too long"}, status_code=400)
+
+    body = await request.body()
+    record_id = _sha(f"{request.method} {request.url.path}\n{key}".encode())
+    state, row = await _claim(record_id, _sha(body))
+
+    if state == "replay":
+        return Response(
+            content=row.response_body or "",
+            status_code=row.status_code,
+            media_type=row.media_type,
+            headers={"Idempotent-Replayed": "true"},
+        )
+    if state == "mismatch":
+        return JSONResponse({"detail": f"{HEADER} reused with a different request body"}, status_code=422)
+    if state == "in_progress":
+        return JSONResponse(
+            {"detail": f"A request with this {HEADER} is still in progress"},
+            status_code=409,
+            headers={"Retry-After": "1"},
+        )
+
+    try:
+        response = await call_next(request)
+    except Exception:
+        await _release(record_id)
+        raise
+
+    # 429 (chat scheduler backpressure) bhi retryable hai, store mat karo
+    if response.status_code >= 500 or response.status_code == 429:
+        await _release(record_id)
+        return response
+
+    payload = b"".join([chunk async for chunk in response.body_iterator])
+    # call_next ka streaming response media_type set nahi karta; header hi asli source hai
+    await _complete(record_id, response.status_code, payload, response.headers.get("content-type"))
+
+    return Response(
+        content=payload,
+        status_code=response.status_code,
+        headers=dict(response.headers),
+        media_type=response.media_type,
+    )
@@ -1,10 +1,24 @@
 # backend/app/main.py
+import os
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import SQLModel
+from fastapi.responses import PlainTextResponse
 
-from app.database import engine
+from app import metrics, tracing
+
+from app.database import dispose_engines, init_db
+from app.mcp_pool import mcp_pool
+from app.agent_runner import MCP_TRANSPORT
+from app.task_cache import cache_stats
+from app.fast_path import fast_path_stats
+from app.idempotency import idempotency_middleware
+from app.message_writer import message_writer, message_writer_stats
+from app.chat_scheduler import chat_scheduler, chat_scheduler_stats
+from app.delta_sync import delta_sync_stats
+from app.mcp_tools.encoding import encoding_stats
+from app.mcp_tools.executor import executor_stats
+from app.response_cache import response_cache_stats
 
 # ✅ ensure all models are registered
 import app.models  # noqa
@@ -13,6 +27,9 @@ from app.router import tasks, chat
 
 app = FastAPI(title="Hackathon Todo API")
 
+# Idempotency-Key replay for POST /chat + task POSTs (registered before CORS so CORS wraps it)
+app.middleware("http")(idempotency_middleware)
+
 # ✅ Fixed CORS:
 # - allow localhost/127.0.0.1 on ANY port (minikube service opens random ports)
 # - keep vercel domain too
@@ -29,16 +46,88 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-After-Id", "Idempotent-Replayed", "X-Trace-Id", "Retry-After", "ETag", "X-Task-Version"],
 )
 
+# per-route latency histogram (outermost -> includes idempotency + CORS time)
+if metrics.METRICS_ENABLED:
+    app.middleware("http")(metrics.metrics_middleware)
+    metrics.register_gauges("task_cache", cache_stats)
+    metrics.register_gauges("response_cache", response_cache_stats)
+    metrics.register_gauges("fast_path", fast_path_stats)
+    metrics.register_gauges("message_writer", message_writer_stats)
+    metrics.register_gauges("chat_scheduler", chat_scheduler_stats)
+    metrics.register_gauges("tool_output_memo", encoding_stats)
+    metrics.register_gauges("delta_sync", delta_sync_stats)
+    metrics.register_gauges("tool_executor", executor_stats)
+
+# root span per request (honours incoming `traceparent`), X-Trace-Id response header
+if tracing.TRACING_ENABLED:
+    app.middleware("http")(tracing.tracing_middleware)
+
+# create_all / column+index migrations; gunicorn master already runs it once (on_starting)
+DB_INIT_ON_STARTUP = os.getenv("DB_INIT_ON_STARTUP", "1") == "1"
+
 @app.on_event("startup")
 def on_startup():
-    SQLModel.metadata.create_all(engine)
+    if DB_INIT_ON_STARTUP:
+        init_db()
+
+@app.on_event("startup")
+async def start_mcp_pool():
+    # warm MCP tool servers once per worker (not per chat turn)
+    if MCP_TRANSPORT == "stdio":
+        await mcp_pool.start()
+
+@app.on_event("shutdown")
+async def stop_mcp_pool():
+    await mcp_pool.close()
+
+@app.on_event("shutdown")
+async def flush_message_writer():
+    # batched mode: queued chat turns are committed before the engines go away
+    await message_writer.close()
+
+@app.on_event("shutdown")
+async def close_chat_user_locks():
+    await chat_scheduler.close()
+
+@app.on_event("shutdown")
+async def close_db_engines():
+    await dispose_engines()
+
+@app.on_event("shutdown")
+def flush_traces():
+    tracing.shutdown()
 
 @app.get("/health")
 def health():
     return {"status": "ok", "build": "PHASE4-CORS-DB-FIX"}
 
+@app.get("/cache/stats")
+def task_cache_stats():
+    # per-worker counters (hits / misses / invalidations)
+    return cache_stats()
+
+@app.get("/response-cache/stats")
+def chat_response_cache_stats():
+    return response_cache_stats()
+
+@app.get("/chat-scheduler/stats")
+def chat_queue_stats():
+    # per-worker admission state: active / waiting turns, rejections
+    return chat_scheduler_stats()
+
+@app.get("/fast-path/stats")
+def chat_fast_path_stats():
+    # per-worker hit rate of the LLM-bypass command parser
+    return fast_path_stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    # Prometheus text format, per worker (scrape each pod; gunicorn workers are sampled)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # ✅ ROUTERS
 app.include_router(tasks.router, prefix="/api")
 app.include_router(chat.router, prefix="/api")
@@ -0,0 +1,280 @@
+# backend/app/mcp_pool.py
+"""
+Pool of warm, long-lived MCP tool server sessions owned by the API process.
+
+Pehle har chat turn pe `python -m app.mcp_tools.server` naya spawn hota tha
+(interpreter start + imports + DB engine + MCP handshake). Ab FastAPI startup pe
+N servers ek baar start hote hain aur har turn ek session borrow karta hai.
+"""
+import asyncio
+import inspect
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, List, Optional, Set
+
+from app import metrics, tracing
+
+if TYPE_CHECKING:
+    from agents.mcp import MCPServerStdio
+
+logger = logging.getLogger(__name__)
+
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "2"))
+MCP_ACQUIRE_TIMEOUT = float(os.getenv("MCP_ACQUIRE_TIMEOUT", "30"))
+MCP_HEALTHCHECK_INTERVAL = float(os.getenv("MCP_HEALTHCHECK_INTERVAL", "30"))
+MCP_PING_TIMEOUT = float(os.getenv("MCP_PING_TIMEOUT", "5"))
+
+
+def _new_server() -> "MCPServerStdio":
+    # lazy import: agents SDK sirf tab load ho jab pool start ho
+    from agents.mcp import MCPServerStdio
+
+    server = MCPServerStdio(
+        name="todo-mcp",
+        # full env: DATABASE_URL / TRACE_* child tak pahunchen (mcp default sirf PATH/HOME deta hai)
+        params={"command": "python", "args": ["-m", "app.mcp_tools.server"], "env": dict(os.environ)},
+        client_session_timeout_seconds=60,
+        cache_tools_list=True,
+    )
+    _instrument_tool_calls(server)
+    return server
+
+
+_meta_supported: Optional[bool] = None
+
+
+def _supports_meta(session: Any) -> bool:
+    # mcp ClientSession.call_tool(meta=...) sirf newer mcp versions me hai
+    global _meta_supported
+    if _meta_supported is None:
+        try:
+            _meta_supported = "meta" in inspect.signature(session.call_tool).parameters
+        except (TypeError, ValueError):
+            _meta_supported = False
+    return _meta_supported
+
+
+def _instrument_tool_calls(server: "MCPServerStdio") -> None:
+    """
+    Agent-side round trip (JSON-RPC + child process): metrics, span, /chat tool_calls entry.
+    Sampled trace ho to traceparent `_meta` me child ko jata hai.
+    """
+    call_tool = server.call_tool
+
+    async def instrumented_call_tool(tool_name: str, arguments: Any, *args: Any, **kwargs: Any) -> Any:
+        with metrics.MCP_TOOL_CALL_SECONDS.time(tool=tool_name, transport="stdio"), tracing.tool_call(
+            tool_name, "stdio"
+        ) as entry:
+            traceparent = tracing.current_traceparent()
+            session = getattr(server, "session", None)
+            if traceparent and not args and not kwargs and session is not None and _supports_meta(session):
+                result = await session.call_tool(tool_name, arguments, meta={"traceparent": traceparent})
+            else:
+                result = await call_tool(tool_name, arguments, *args, **kwargs)
+            entry["ok"] = not getattr(result, "isError", False)
+            return result
+
+    server.call_tool = instrumented_call_tool  # type: ignore[method-assign]
+
+
+class _PooledServer:
+    """
+    One MCP child process + client session.
+
+    MCPServerStdio ka connect() aur cleanup() SAME asyncio task me chalna chahiye
+    (anyio cancel scopes), is liye har server apne dedicated keeper task me rehta hai.
+    """
+
+    def __init__(self) -> None:
+        self.server = _new_server()
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    async def _keep(self) -> None:
+        try:
+            await self.server.connect()
+        except BaseException as e:  # noqa: BLE001 - surfaced via start()
+            self._error = e
+            self._ready.set()
+            return
+
+        self._ready.set()
+        try:
+            await self._stop.wait()
+        finally:
+            try:
+                await self.server.cleanup()
+            except Exception:
+                logger.debug("MCP server cleanup failed", exc_info=True)
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._keep(), name="mcp-pool-server")
+        with metrics.MCP_SERVER_START_SECONDS.time():
+            await self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=10)
+            except Exception:
+                self._task.cancel()
+
+    async def is_healthy(self) -> bool:
+        if self._task is None or self._task.done():
+            return False
+        session = getattr(self.server, "session", None)
+        if session is None:
+            return False
+        try:
+            await asyncio.wait_for(session.send_ping(), timeout=MCP_PING_TIMEOUT)
+            return True
+        except Exception:
+            return False
+
+
+class MCPServerPool:
+    """
+    Fixed-size pool of MCP sessions.
+
+    - acquire(): ek turn ke liye session borrow karo (exclusive)
+    - background health check idle sessions ko ping karta hai
+    - crashed / unhealthy sessions replace ho jate hain
+    """
+
+    def __init__(self, size: int = MCP_POOL_SIZE) -> None:
+        self.size = max(1, size)
+        self._idle: "asyncio.Queue[_PooledServer]" = asyncio.Queue()
+        self._members: List[_PooledServer] = []
+        self._health_task: Optional[asyncio.Task] = None
+        # fire-and-forget recycles: strong ref rakho (warna GC beech me task kha sakta hai)
+        self._background: Set[asyncio.Task] = set()
+        self._start_lock = asyncio.Lock()
+        self._started = False
+        self._closing = False
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    async def start(self) -> None:
+        async with self._start_lock:
+            if self._started:
+                return
+            self._closing = False
+            await self._fill()
+            self._health_task = asyncio.create_task(self._health_loop(), name="mcp-pool-health")
+            self._started = True
+            logger.info("MCP pool started (%s/%s sessions)", len(self._members), self.size)
+
+    async def close(self) -> None:
+        self._closing = True
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for task in list(self._background):
+            task.cancel()
+
+        members, self._members = self._members, []
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        await asyncio.gather(*(m.stop() for m in members), return_exceptions=True)
+        self._started = False
+
+    async def _spawn(self) -> Optional[_PooledServer]:
+        member = _PooledServer()
+        try:
+            await member.start()
+        except Exception:
+            logger.warning("MCP server failed to start", exc_info=True)
+            await member.stop()
+            return None
+        self._members.append(member)
+        self._idle.put_nowait(member)
+        return member
+
+    async def _fill(self) -> None:
+        missing = self.size - len(self._members)
+        if missing > 0:
+            await asyncio.gather(*(self._spawn() for _ in range(missing)))
+
+    async def _retire(self, member: _PooledServer) -> None:
+        if member in self._members:
+            self._members.remove(member)
+        await member.stop()
+
+    def _in_background(self, coro: Any, name: str) -> None:
+        task = asyncio.create_task(coro, name=name)
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+
+    def _background_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("MCP pool %s failed", task.get_name(), exc_info=task.exception())
+
+    async def _recycle(self, member: _PooledServer) -> None:
+        """Session ne error diya: health check karo, zarurat ho to replace."""
+        if self._closing:
+            return
+        if await member.is_healthy():
+            self._idle.put_nowait(member)
+            return
+        logger.warning("MCP session unhealthy after error, restarting")
+        await self._retire(member)
+        await self._fill()
+
+    async def _health_loop(self) -> None:
+        while not self._closing:
+            await asyncio.sleep(MCP_HEALTHCHECK_INTERVAL)
+            try:
+                await self.check_health()
+            except Exception:
+                logger.exception("MCP pool health check failed")
+
+    async def check_health(self) -> None:
+        # only idle sessions are checked; borrowed ones are checked on release
+        for _ in range(self._idle.qsize()):
+            try:
+                member = self._idle.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if await member.is_healthy():
+                self._idle.put_nowait(member)
+            else:
+                logger.warning("MCP session failed health check, restarting")
+                await self._retire(member)
+        await self._fill()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator["MCPServerStdio"]:
+        if not self._started:
+            await self.start()
+        if not self._members:
+            # sab spawn fail hue the; ek aur try
+            await self._fill()
+            if not self._members:
+                raise RuntimeError("MCP tool server is unavailable")
+
+        try:
+            member = await asyncio.wait_for(self._idle.get(), timeout=MCP_ACQUIRE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise RuntimeError("Timed out waiting for a free MCP session")
+
+        ok = False
+        try:
+            yield member.server
+            ok = True
+        finally:
+            if ok and not self._closing:
+                self._idle.put_nowait(member)
+            else:
+                self._in_background(self._recycle(member), "mcp-pool-recycle")
+
+
+mcp_pool = MCPServerPool()
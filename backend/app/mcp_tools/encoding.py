@@ -0,0 +1,161 @@
+# backend/app/mcp_tools/encoding.py
+"""
+Agent-facing tool output encoding.
+
+Tool functions (registry / fast path / REST) full dicts hi return karte hain;
+sirf model ko jane wala JSON yahan compact hota hai (TOOL_OUTPUT_MODE=compact):
+
+- task lists columnar: {"cols": ["id", "title", "done"], "rows": [[3, "buy milk", 0], ...]}
+  (user_id / created_at / updated_at nahi; "desc" column sirf jab kisi task me ho)
+- TOOL_OUTPUT_MAX_ROWS se zyada rows -> truncate + "omitted": n (+ next_after_id)
+- single task / batch results: sirf id, title, done (+ error)
+- har task ka encoded row (id, updated_at) pe memoized (= ek task version)
+- compact separators, no indent
+
+TOOL_OUTPUT_MODE=full -> purana behaviour (poora dict JSON).
+"""
+import functools
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+TOOL_OUTPUT_MODE = os.getenv("TOOL_OUTPUT_MODE", "compact").strip().lower()
+TOOL_OUTPUT_MAX_ROWS = int(os.getenv("TOOL_OUTPUT_MAX_ROWS", "100"))
+TOOL_OUTPUT_DESC_CHARS = int(os.getenv("TOOL_OUTPUT_DESC_CHARS", "120"))
+_MEMO_MAX = int(os.getenv("TOOL_OUTPUT_MEMO_MAX", "10000"))
+
+LIST_COLS = ["id", "title", "done"]
+
+_memo: "OrderedDict[Tuple[Any, str], Tuple[List[Any], Optional[str]]]" = OrderedDict()
+_memo_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _short(text: Optional[str], limit: int) -> Optional[str]:
+    if not text:
+        return None
+    text = " ".join(text.split())
+    if limit and len(text) > limit:
+        return text[: limit - 3].rstrip() + "..."
+    return text
+
+
+def _row(task: Dict[str, Any]) -> Tuple[List[Any], Optional[str]]:
+    """(id, title, done) + short description, memoized per (id, updated_at)."""
+    key = (task.get("id"), str(task.get("updated_at")))
+    with _memo_lock:
+        hit = _memo.get(key)
+        if hit is not None:
+            _memo.move_to_end(key)
+            _stats["hits"] += 1
+            return hit
+        _stats["misses"] += 1
+
+    value = (
+        [task.get("id"), task.get("title"), 1 if task.get("completed") else 0],
+        _short(task.get("description"), TOOL_OUTPUT_DESC_CHARS),
+    )
+    if key[0] is not None:
+        with _memo_lock:
+            _memo[key] = value
+            if len(_memo) > _MEMO_MAX:
+                _memo.popitem(last=False)
+    return value
+
+
+def _task(task: Dict[str, Any]) -> Dict[str, Any]:
+    (tid, title, done), desc = _row(task)
+    out: Dict[str, Any] = {"id": tid, "title": title, "done": done}
+    if desc:
+        out["desc"] = desc
+    return out
+
+
+def _result_item(item: Any) -> Any:
+    """Batch per-item result: {"id", "ok", "title", "done"} ya {"id", "ok", "error"}."""
+    if not isinstance(item, dict):
+        return item
+    compact = {k: v for k, v in item.items() if k not in ("task", "task_id")}
+    if isinstance(item.get("task"), dict):
+        return {**_task(item["task"]), **compact}
+    if "task_id" in item:
+        return {"id": item["task_id"], **compact}
+    return compact
+
+
+def encode_task_list(tasks: List[Dict[str, Any]], next_after_id: Optional[int] = None) -> Dict[str, Any]:
+    shown = tasks
+    omitted = 0
+    if TOOL_OUTPUT_MAX_ROWS and len(tasks) > TOOL_OUTPUT_MAX_ROWS:
+        shown = tasks[:TOOL_OUTPUT_MAX_ROWS]
+        omitted = len(tasks) - len(shown)
+        # agent baaki rows next page se le sakta hai
+        next_after_id = shown[-1].get("id")
+
+    encoded = [_row(t) for t in shown]
+    with_desc = any(desc for _, desc in encoded)
+    cols = LIST_COLS + (["desc"] if with_desc else [])
+    rows = [row + [desc] if with_desc else row for row, desc in encoded]
+
+    out: Dict[str, Any] = {"ok": True, "cols": cols, "rows": rows}
+    if omitted:
+        out["omitted"] = omitted
+    if next_after_id is not None:
+        out["next_after_id"] = next_after_id
+    return out
+
+
+def encode_result(result: Any) -> Any:
+    """Tool result dict -> compact agent-facing dict (unknown shapes pass through)."""
+    if not isinstance(result, dict):
+        return result
+    if "tasks" in result and isinstance(result["tasks"], list):
+        out = encode_task_list(result["tasks"], result.get("next_after_id"))
+        for k, v in result.items():
+            if k not in ("tasks", "next_after_id", "ok"):
+                out[k] = v
+        return out
+
+    out = dict(result)
+    if isinstance(out.get("task"), dict):
+        out["task"] = _task(out["task"])
+    if isinstance(out.get("results"), list):
+        out["results"] = [_result_item(item) for item in out["results"]]
+    return out
+
+
+def dumps(result: Any) -> str:
+    """Agent-facing JSON text (mode ke hisaab se)."""
+    if TOOL_OUTPUT_MODE == "full":
+        return json.dumps(result, default=str)
+    return json.dumps(encode_result(result), default=str, separators=(",", ":"), ensure_ascii=False)
+
+
+def for_agent(fn: Any) -> Any:
+    """
+    MCP registration wrapper (stdio server): pre-serialized compact text return karo,
+    warna FastMCP dict ko indent=2 JSON bana deta hai. Signature params same rehte hain.
+    """
+    if TOOL_OUTPUT_MODE == "full":
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> str:
+        return dumps(fn(*args, **kwargs))
+
+    wrapper.__signature__ = inspect.signature(fn).replace(return_annotation=str)  # type: ignore[attr-defined]
+    wrapper.__annotations__ = {**getattr(fn, "__annotations__", {}), "return": str}
+    return wrapper
+
+
+def encoding_stats() -> Dict[str, Any]:
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "mode": TOOL_OUTPUT_MODE,
+        "entries": len(_memo),
+        "hit_ratio": round(_stats["hits"] / lookups, 4) if lookups else 0.0,
+    }
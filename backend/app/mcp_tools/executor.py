@@ -0,0 +1,143 @@
+# backend/app/mcp_tools/executor.py
+"""
+Concurrent tool execution (stdio MCP server + in-process transport).
+
+Model ek step me kai independent tool calls bhej sakta hai (SDK unhe saath me
+dispatch karta hai). Pehle sync tools event loop pe ek-ek karke chalte the:
+
+- tools bounded ThreadPoolExecutor (TOOL_WORKERS) pe chalte hain, is liye ek step ka
+  wall time ~ sabse slow call
+- same task pe conflicting writes serialize: per-(user_id, task_id) lock; batch tools
+  saare ids ke locks sorted order me lete hain (deadlock nahi)
+- contextvars (MCP request context, trace span) thread me copy hote hain
+- results order same rehta hai (har call ka apna response / future)
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+TOOL_WORKERS = int(os.getenv("TOOL_WORKERS", "8"))
+
+LockKey = Tuple[str, int]
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+_stats = {"calls": 0, "lock_waits": 0, "active": 0}
+_stats_lock = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=max(1, TOOL_WORKERS), thread_name_prefix="tool")
+    return _pool
+
+
+class _KeyedLocks:
+    """Refcounted lock per key (unused keys free ho jate hain)."""
+
+    def __init__(self) -> None:
+        self._guard = threading.Lock()
+        self._locks: Dict[LockKey, Tuple[threading.Lock, int]] = {}
+
+    def _get(self, key: LockKey) -> threading.Lock:
+        with self._guard:
+            lock, refs = self._locks.get(key, (None, 0))
+            if lock is None:
+                lock = threading.Lock()
+            self._locks[key] = (lock, refs + 1)
+            return lock
+
+    def _put(self, key: LockKey) -> None:
+        with self._guard:
+            lock, refs = self._locks[key]
+            if refs <= 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, refs - 1)
+
+    @contextmanager
+    def hold(self, keys: List[LockKey]) -> Iterator[None]:
+        refs: List[LockKey] = []
+        held: List[threading.Lock] = []
+        try:
+            for key in sorted(set(keys)):
+                lock = self._get(key)
+                refs.append(key)
+                if not lock.acquire(blocking=False):
+                    with _stats_lock:
+                        _stats["lock_waits"] += 1
+                    lock.acquire()
+                held.append(lock)
+            yield
+        finally:
+            for lock in reversed(held):
+                lock.release()
+            for key in refs:
+                self._put(key)
+
+    def size(self) -> int:
+        return len(self._locks)
+
+
+_task_locks = _KeyedLocks()
+
+
+def _as_id(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def lock_keys(arguments: Dict[str, Any]) -> List[LockKey]:
+    """Tool arguments -> (user_id, task_id) keys (task_id / task_ids / updates[].task_id)."""
+    user_id = str(arguments.get("user_id") or "")
+    ids: List[Any] = []
+    if "task_id" in arguments:
+        ids.append(arguments["task_id"])
+    ids.extend(arguments.get("task_ids") or [])
+    for update in arguments.get("updates") or []:
+        if isinstance(update, dict):
+            ids.append(update.get("task_id"))
+    return [(user_id, i) for i in map(_as_id, ids) if i is not None]
+
+
+def _call(fn: Callable[..., Any], arguments: Dict[str, Any]) -> Any:
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["active"] += 1
+    try:
+        with _task_locks.hold(lock_keys(arguments)):
+            return fn(**arguments)
+    finally:
+        with _stats_lock:
+            _stats["active"] -= 1
+
+
+async def run_tool(fn: Callable[..., Any], arguments: Dict[str, Any]) -> Any:
+    """Sync tool -> bounded pool (event loop free rehta hai); contextvars saath jate hain."""
+    ctx = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor(), ctx.run, _call, fn, arguments)
+
+
+def as_async(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """FastMCP registration: same signature / schema, lekin async (pool pe execute)."""
+
+    @functools.wraps(fn)
+    async def wrapper(**kwargs: Any) -> Any:
+        return await run_tool(fn, kwargs)
+
+    return wrapper
+
+
+def executor_stats() -> Dict[str, Any]:
+    return {**_stats, "workers": TOOL_WORKERS, "locked_keys": _task_locks.size()}
@@ -0,0 +1,74 @@
+# backend/app/mcp_tools/inprocess.py
+"""
+In-process MCP tool transport.
+
+Same FastMCP tools (register_tools) ko Agents SDK FunctionTool me wrap karta hai.
+Tool call = direct Python function call (thread me), no stdio pipe / JSON-RPC /
+child process. External MCP clients ke liye `python -m app.mcp_tools.server`
+(stdio) waisa hi available hai.
+"""
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+from agents import FunctionTool, RunContextWrapper
+
+from app import tracing
+from app.mcp_tools import encoding
+from app.mcp_tools.executor import run_tool
+from app.metrics import MCP_TOOL_CALL_SECONDS
+from app.mcp_tools.server import TOOLS, mcp
+
+_function_tools: Optional[List[FunctionTool]] = None
+_build_lock = asyncio.Lock()
+
+
+async def call_tool(name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    fn = TOOLS.get(name)
+    if fn is None:
+        return {"ok": False, "error": f"Unknown tool {name}"}
+    try:
+        # tools are sync (SQLModel Session) -> bounded pool, same-task writes serialized
+        return await run_tool(fn, arguments)
+    except TypeError as e:
+        return {"ok": False, "error": f"Invalid arguments: {e}"}
+
+
+def _make_invoker(name: str):
+    async def _invoke(ctx: RunContextWrapper[Any], args_json: str) -> str:
+        try:
+            arguments = json.loads(args_json) if args_json else {}
+        except json.JSONDecodeError as e:
+            return json.dumps({"ok": False, "error": f"Invalid JSON arguments: {e}"})
+        with MCP_TOOL_CALL_SECONDS.time(tool=name, transport="inprocess"), tracing.tool_call(name, "inprocess") as entry:
+            result = await call_tool(name, arguments)
+            entry["ok"] = bool(result.get("ok"))
+        return encoding.dumps(result)
+
+    return _invoke
+
+
+async def get_function_tools() -> List[FunctionTool]:
+    """
+    FastMCP ke registered tools -> FunctionTool list (schemas FastMCP se hi aate hain).
+    Built once per process.
+    """
+    global _function_tools
+    if _function_tools is not None:
+        return _function_tools
+
+    async with _build_lock:
+        if _function_tools is None:
+            listed = await mcp.list_tools()
+            _function_tools = [
+                FunctionTool(
+                    name=t.name,
+                    description=t.description or "",
+                    params_json_schema=t.inputSchema,
+                    on_invoke_tool=_make_invoker(t.name),
+                    strict_json_schema=False,
+                )
+                for t in listed
+                if t.name in TOOLS
+            ]
+    return _function_tools
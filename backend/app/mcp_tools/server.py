@@ -1,9 +1,13 @@
 from mcp.server.fastmcp import FastMCP
+from app import tracing
 from app.mcp_tools.tools import register_tools
 
 mcp = FastMCP("todo-mcp-server")
 
-register_tools(mcp)
+# name -> function (used by the in-process transport, see inprocess.py)
+TOOLS = register_tools(mcp)
 
 if __name__ == "__main__":
+    # stdio child: tool spans parent trace (`_meta.traceparent`) ke under export hote hain
+    tracing.set_service_name("todo-mcp")
     mcp.run()
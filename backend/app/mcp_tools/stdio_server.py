@@ -3,7 +3,7 @@
 from mcp.server.fastmcp import FastMCP
 from sqlmodel import Session, select
 
-from app.database import engine
+from app.database import get_engine
 from app.models import Task
 
 mcp = FastMCP("todo-mcp-server")
@@ -12,7 +12,7 @@ mcp = FastMCP("todo-mcp-server")
 @mcp.tool()
 def add_task(user_id: str, title: str) -> str:
     """Add a new task"""
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         task = Task(user_id=user_id, title=title, completed=False)
         session.add(task)
         session.commit()
@@ -22,7 +22,7 @@ def add_task(user_id: str, title: str) -> str:
 @mcp.tool()
 def list_tasks(user_id: str) -> str:
     """List all tasks"""
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         tasks = session.exec(select(Task).where(Task.user_id == user_id)).all()
         if not tasks:
             return "No tasks found."
@@ -32,7 +32,7 @@ def list_tasks(user_id: str) -> str:
 @mcp.tool()
 def complete_task(user_id: str, title: str) -> str:
     """Mark task as completed (by exact title)"""
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         task = session.exec(
             select(Task).where(Task.user_id == user_id).where(Task.title == title)
         ).first()
@@ -47,7 +47,7 @@ def complete_task(user_id: str, title: str) -> str:
 @mcp.tool()
 def delete_task(user_id: str, title: str) -> str:
     """Delete a task (by exact title)"""
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         task = session.exec(
             select(Task).where(Task.user_id == user_id).where(Task.title == title)
         ).first()
@@ -61,7 +61,7 @@ def delete_task(user_id: str, title: str) -> str:
 @mcp.tool()
 def update_task(user_id: str, old_title: str, new_title: str) -> str:
     """Update task title"""
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         task = session.exec(
             select(Task).where(Task.user_id == user_id).where(Task.title == old_title)
         ).first()
@@ -2,34 +2,49 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, get_type_hints
 
-from sqlmodel import Session, select
+from sqlmodel import Session
 
-from app.database import engine
+from app import metrics, tracing
+from app.database import get_engine
+from app.mcp_tools.encoding import for_agent
+from app.mcp_tools.executor import as_async
 from app.models import Task
+from app.services import task_service
+from app.task_cache import bump_task_version, cached_task_page
+from app.task_queries import task_to_dict
+from app.task_search import SEARCH_DEFAULT_LIMIT, search_tasks
 
 
-def _to_task_dict(t: Task) -> Dict[str, Any]:
-    return {
-        "id": t.id,
-        "user_id": t.user_id,
-        "title": t.title,
-        "description": getattr(t, "description", None),
-        "completed": t.completed,
-        "created_at": getattr(t, "created_at", None),
-        "updated_at": getattr(t, "updated_at", None),
-    }
+# shared with the REST/cache path (task_queries.task_to_dict)
+_to_task_dict = task_to_dict
 
 
-def register_tools(mcp) -> None:
+ToolFn = Callable[..., Dict[str, Any]]
+
+
+def register_tools(mcp) -> Dict[str, ToolFn]:
     """
     IMPORTANT:
     - Ye tools SAME DB (engine) + SAME Task model use karte hain jo /tasks router use karta hai.
     - list_tasks MUST ids return kare, warna agent wrong id pick karega.
-    """
 
-    @mcp.tool()
+    Returns name -> plain function map (in-process transport direct dispatch ke liye).
+    """
+    registry: Dict[str, ToolFn] = {}
+
+    def tool(fn: ToolFn) -> ToolFn:
+        # string annotations (__future__) resolve karo, warna wrapper ke saath FastMCP schema nahi bana payega
+        fn.__annotations__ = get_type_hints(fn)
+        wrapped = metrics.instrument_tool(fn.__name__, tracing.traced_tool(fn.__name__, fn, mcp))
+        registry[fn.__name__] = wrapped
+        # model ko compact JSON (TOOL_OUTPUT_MODE); registry callers full dicts lete hain.
+        # async + thread pool: ek step ke independent calls server me saath chalte hain
+        mcp.tool()(as_async(for_agent(wrapped)))
+        return wrapped
+
+    @tool
     def add_task(user_id: str, title: str, description: Optional[str] = None) -> Dict[str, Any]:
         title = (title or "").strip()
         if not title:
@@ -37,7 +52,7 @@ def register_tools(mcp) -> None:
 
         now = datetime.utcnow()
 
-        with Session(engine) as session:
+        with Session(get_engine()) as session:
             task = Task(
                 user_id=user_id,
                 title=title,
@@ -47,33 +62,40 @@ def register_tools(mcp) -> None:
                 updated_at=now,
             )
             session.add(task)
+            bump_task_version(session, user_id)
             session.commit()
             session.refresh(task)
 
             return {"ok": True, "task": _to_task_dict(task)}
 
-    @mcp.tool()
-    def list_tasks(user_id: str, status: Optional[str] = None) -> Dict[str, Any]:
+    @tool
+    def list_tasks(
+        user_id: str,
+        status: Optional[str] = None,
+        after_id: Optional[int] = None,
+        limit: int = 50,
+        sort: str = "id",
+    ) -> Dict[str, Any]:
         """
         status: optional -> "pending" | "completed" | None
+        after_id/limit: keyset pagination (next page: after_id = next_after_id)
+        sort: "id" | "created_at" | "updated_at" | "title", "-" prefix = descending
         """
-        with Session(engine) as session:
-            stmt = select(Task).where(Task.user_id == user_id).order_by(Task.id)
-
-            rows = session.exec(stmt).all()
-
-            if status:
-                s = status.lower().strip()
-                if s in ("pending", "incomplete", "open"):
-                    rows = [t for t in rows if not t.completed]
-                elif s in ("completed", "done", "closed"):
-                    rows = [t for t in rows if t.completed]
-
-            return {"ok": True, "tasks": [_to_task_dict(t) for t in rows]}
-
-    @mcp.tool()
+        with Session(get_engine()) as session:
+            try:
+                tasks, next_after_id = cached_task_page(session, user_id, status, after_id, limit, sort)
+            except ValueError as e:
+                return {"ok": False, "error": str(e)}
+
+            return {
+                "ok": True,
+                "tasks": tasks,
+                "next_after_id": next_after_id,
+            }
+
+    @tool
     def complete_task(user_id: str, task_id: int) -> Dict[str, Any]:
-        with Session(engine) as session:
+        with Session(get_engine()) as session:
             task = session.get(Task, task_id)
             if not task or task.user_id != user_id:
                 return {"ok": False, "error": f"Task id {task_id} not found"}
@@ -81,30 +103,32 @@ def register_tools(mcp) -> None:
             task.completed = True
             task.updated_at = datetime.utcnow()
             session.add(task)
+            bump_task_version(session, user_id)
             session.commit()
             session.refresh(task)
 
             return {"ok": True, "task": _to_task_dict(task)}
 
-    @mcp.tool()
+    @tool
     def delete_task(user_id: str, task_id: int) -> Dict[str, Any]:
-        with Session(engine) as session:
+        with Session(get_engine()) as session:
             task = session.get(Task, task_id)
             if not task or task.user_id != user_id:
                 return {"ok": False, "error": f"Task id {task_id} not found"}
 
             session.delete(task)
+            bump_task_version(session, user_id)
             session.commit()
             return {"ok": True}
 
-    @mcp.tool()
+    @tool
     def update_task(
         user_id: str,
         task_id: int,
         title: Optional[str] = None,
         description: Optional[str] = None,
     ) -> Dict[str, Any]:
-        with Session(engine) as session:
+        with Session(get_engine()) as session:
             task = session.get(Task, task_id)
             if not task or task.user_id != user_id:
                 return {"ok": False, "error": f"Task id {task_id} not found"}
@@ -116,7 +140,69 @@ def register_tools(mcp) -> None:
 
             task.updated_at = datetime.utcnow()
             session.add(task)
+            bump_task_version(session, user_id)
             session.commit()
             session.refresh(task)
 
             return {"ok": True, "task": _to_task_dict(task)}
+
+    @tool
+    def find_tasks(user_id: str, query: str, limit: int = SEARCH_DEFAULT_LIMIT) -> Dict[str, Any]:
+        """
+        Find tasks by (part of) their title, best match first.
+        Use this to turn a task name into its task_id instead of listing everything.
+        """
+        with Session(get_engine()) as session:
+            try:
+                tasks = search_tasks(session, user_id, query, limit)
+            except ValueError as e:
+                return {"ok": False, "error": str(e)}
+            return {"ok": True, "tasks": tasks}
+
+    # =========================
+    # BATCH TOOLS (one transaction, per-item results)
+    # =========================
+    @tool
+    def add_tasks(user_id: str, titles: List[str]) -> Dict[str, Any]:
+        """Add several tasks at once (max 100)."""
+        with Session(get_engine()) as session:
+            try:
+                results = task_service.add_tasks(session, user_id, [{"title": t} for t in titles])
+            except ValueError as e:
+                return {"ok": False, "error": str(e)}
+            return {"ok": True, "results": results}
+
+    @tool
+    def complete_tasks(user_id: str, task_ids: List[int]) -> Dict[str, Any]:
+        """Mark several tasks completed at once (max 100)."""
+        with Session(get_engine()) as session:
+            try:
+                results = task_service.complete_tasks(session, user_id, task_ids)
+            except ValueError as e:
+                return {"ok": False, "error": str(e)}
+            return {"ok": True, "results": results}
+
+    @tool
+    def delete_tasks(user_id: str, task_ids: List[int]) -> Dict[str, Any]:
+        """Delete several tasks at once (max 100)."""
+        with Session(get_engine()) as session:
+            try:
+                results = task_service.delete_tasks(session, user_id, task_ids)
+            except ValueError as e:
+                return {"ok": False, "error": str(e)}
+            return {"ok": True, "results": results}
+
+    @tool
+    def update_tasks(user_id: str, updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Update several tasks at once (max 100).
+        updates: [{"task_id": 3, "title": "...", "description": "..."}]
+        """
+        with Session(get_engine()) as session:
+            try:
+                results = task_service.update_tasks(session, user_id, updates)
+            except ValueError as e:
+                return {"ok": False, "error": str(e)}
+            return {"ok": True, "results": results}
+
+    return registry
@@ -3,6 +3,7 @@ from sqlmodel import Session, select
 from datetime import datetime
 
 from app.models import Task
+from app.task_cache import bump_task_version
 
 
 # MCP TOOL: add_task
@@ -21,6 +22,7 @@ def add_task(
         updated_at=datetime.utcnow(),
     )
     session.add(task)
+    bump_task_version(session, user_id)
     session.commit()
     session.refresh(task)
     return task
@@ -41,6 +43,7 @@ def complete_task(session: Session, user_id: str, task_id: int) -> Task:
     task.completed = True
     task.updated_at = datetime.utcnow()
     session.add(task)
+    bump_task_version(session, user_id)
     session.commit()
     session.refresh(task)
     return task
@@ -53,6 +56,7 @@ def delete_task(session: Session, user_id: str, task_id: int) -> None:
         raise ValueError("Task not found")
 
     session.delete(task)
+    bump_task_version(session, user_id)
     session.commit()
 
 
@@ -75,6 +79,7 @@ def update_task(
 
     task.updated_at = datetime.utcnow()
     session.add(task)
+    bump_task_version(session, user_id)
     session.commit()
     session.refresh(task)
     return task
@@ -0,0 +1,191 @@
+# backend/app/message_writer.py
+"""
+Chat turn persistence: ek turn = ek transaction.
+
+Pehle har turn me alag-alag commits the (user message, assistant message, har
+ek pe session.get(Conversation) + updated_at). Ab:
+
+- write_turn(TurnWrite): user + assistant messages + conversation updated_at /
+  summary ek hi INSERT..+UPDATE transaction me (get() nahi, seedha UPDATE)
+- MESSAGE_WRITE_MODE=batched: bounded asyncio queue + background writer jo
+  concurrent requests ke turns ko ek commit me group karta hai (group commit).
+  Caller apne turn ke commit hone tak wait karta hai, is liye response tabhi
+  jata hai jab data durable ho. Queue full -> caller wait (backpressure).
+  Shutdown pe queue drain + flush.
+"""
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+
+from app.database import async_session
+from app.models import Conversation, Message
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_WRITE_MODE = os.getenv("MESSAGE_WRITE_MODE", "direct").strip().lower()
+MESSAGE_BATCH_MAX = int(os.getenv("MESSAGE_BATCH_MAX", "64"))
+MESSAGE_BATCH_WAIT_MS = float(os.getenv("MESSAGE_BATCH_WAIT_MS", "5"))
+MESSAGE_QUEUE_MAX = int(os.getenv("MESSAGE_QUEUE_MAX", "1000"))
+
+
+@dataclass
+class TurnWrite:
+    conversation_id: int
+    user_id: str
+    # (role, content) in order
+    messages: List[Tuple[str, str]]
+    summary: Optional[str] = None
+    summary_upto_id: Optional[int] = None
+    summary_changed: bool = False
+    at: datetime = field(default_factory=datetime.utcnow)
+
+
+async def _commit(turns: List[TurnWrite]) -> None:
+    """All turns -> one transaction (messages in order, one UPDATE per conversation)."""
+    touched: Dict[int, datetime] = {}
+    async with async_session() as session:
+        for turn in turns:
+            for role, content in turn.messages:
+                session.add(
+                    Message(
+                        conversation_id=turn.conversation_id,
+                        user_id=turn.user_id,
+                        role=role,
+                        content=content,
+                        created_at=turn.at,
+                    )
+                )
+            touched[turn.conversation_id] = max(turn.at, touched.get(turn.conversation_id, turn.at))
+
+        for conversation_id, at in touched.items():
+            values = {"updated_at": at}
+            changed = [t for t in turns if t.conversation_id == conversation_id and t.summary_changed]
+            if changed:
+                values["summary"] = changed[-1].summary
+                values["summary_upto_id"] = changed[-1].summary_upto_id
+            await session.execute(update(Conversation).where(Conversation.id == conversation_id).values(**values))
+
+        await session.commit()
+
+
+class MessageWriter:
+    """Bounded queue + single background task; each batch = one commit."""
+
+    def __init__(
+        self,
+        batch_max: int = MESSAGE_BATCH_MAX,
+        wait_ms: float = MESSAGE_BATCH_WAIT_MS,
+        queue_max: int = MESSAGE_QUEUE_MAX,
+    ) -> None:
+        self.batch_max = max(1, batch_max)
+        self.wait = max(0.0, wait_ms) / 1000.0
+        self.queue_max = queue_max
+        # None = shutdown sentinel
+        self._queue: Optional["asyncio.Queue[Optional[Tuple[TurnWrite, asyncio.Future]]]"] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.stats = {"turns": 0, "batches": 0, "errors": 0}
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue(maxsize=self.queue_max)
+            self._task = asyncio.create_task(self._run(), name="message-writer")
+
+    async def submit(self, turn: TurnWrite) -> None:
+        if self._closing:
+            # shutdown ke dauran direct write (kuch drop nahi hota)
+            await _commit([turn])
+            return
+        self._ensure_started()
+        assert self._queue is not None
+        done: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._queue.put((turn, done))
+        await done
+
+    async def _collect(self) -> Tuple[List[Tuple[TurnWrite, asyncio.Future]], bool]:
+        """Pehla item aane tak wait, phir `wait` ms tak aur items (max batch_max). -> (batch, stop)."""
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        item = await self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = loop.time() + self.wait
+        while len(batch) < self.batch_max:
+            timeout = deadline - loop.time()
+            try:
+                if timeout <= 0:
+                    item = self._queue.get_nowait()
+                else:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self) -> None:
+        while True:
+            batch, stop = await self._collect()
+            if batch:
+                await self._flush(batch)
+            if stop:
+                return
+
+    async def _flush(self, batch: List[Tuple[TurnWrite, asyncio.Future]]) -> None:
+        try:
+            await _commit([turn for turn, _ in batch])
+            self.stats["batches"] += 1
+            self.stats["turns"] += len(batch)
+            for _, done in batch:
+                if not done.done():
+                    done.set_result(None)
+            return
+        except Exception:
+            if len(batch) == 1:
+                self.stats["errors"] += 1
+                _, done = batch[0]
+                if not done.done():
+                    done.set_exception(RuntimeError("Failed to store chat messages"))
+                logger.exception("message write failed")
+                return
+            logger.warning("batched message write failed, retrying turns one by one", exc_info=True)
+
+        # ek kharab turn (e.g. deleted conversation) baaki batch ko fail na kare
+        for item in batch:
+            await self._flush([item])
+
+    async def close(self, timeout: float = 30.0) -> None:
+        """Naye turns direct likhe jate hain; queued turns flush hone tak wait (FIFO sentinel)."""
+        self._closing = True
+        if self._task is None or self._queue is None:
+            return
+        await self._queue.put(None)
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            logger.error("message writer did not drain within %ss", timeout)
+            self._task.cancel()
+        self._task = None
+
+
+message_writer = MessageWriter()
+
+
+async def write_turn(turn: TurnWrite) -> None:
+    """Persist one chat turn; returns once it is committed."""
+    if MESSAGE_WRITE_MODE == "batched":
+        await message_writer.submit(turn)
+    else:
+        await _commit([turn])
+
+
+def message_writer_stats() -> Dict[str, object]:
+    depth = message_writer._queue.qsize() if message_writer._queue is not None else 0
+    return {**message_writer.stats, "mode": MESSAGE_WRITE_MODE, "queue_depth": depth}
@@ -0,0 +1,331 @@
+# backend/app/metrics.py
+"""
+Dependency-free Prometheus-style metrics (text exposition format on GET /metrics).
+
+- Histogram / Counter: thread-safe (MCP tools threads me chalte hain), labels kwargs se
+- timed(hist, **labels): decorator (sync + async) -> call duration observe karta hai
+- hist.time(**labels): same cheez `with` block ke liye
+- register_gauges(prefix, fn): purane *_stats() dicts bhi /metrics me aa jate hain
+
+METRICS_ENABLED=0 -> decorators function ko as-is return karte hain, middleware
+register nahi hota, observe()/inc() pehli line pe return: hot path pe ~zero cost.
+Values per process / per worker hain (jaise /cache/stats).
+"""
+import functools
+import inspect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+# seconds; DB commit (~ms) se Runner.run (~10s) tak cover
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_registry: List["_Metric"] = []
+_gauge_sources: List[Tuple[str, Callable[[], Dict[str, Any]]]] = []
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str) -> None:
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_fmt_labels(k)} {_fmt_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts..., +Inf count], sum
+        self._series: Dict[LabelKey, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[key] = series
+            counts, total = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            total[0] += value
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(_label_key(labels))
+        return sum(series[0]) if series is not None else 0
+
+    def total(self, **labels: Any) -> float:
+        series = self._series.get(_label_key(labels))
+        return series[1][0] if series is not None else 0.0
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        if not METRICS_ENABLED:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(c), t[0]) for k, (c, t) in self._series.items()]
+        lines: List[str] = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_fmt_labels(key, ('le', _fmt_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{_fmt_labels(key)} {_fmt_value(total)}")
+            lines.append(f"{self.name}_count{_fmt_labels(key)} {cumulative}")
+        return lines
+
+
+def timed(hist: Histogram, **labels: Any) -> Callable[[Callable], Callable]:
+    """Decorator: sync ya async function ka wall time `hist` me (labels ke saath)."""
+
+    def decorate(fn: Callable) -> Callable:
+        if not METRICS_ENABLED:
+            return fn
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                t0 = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    hist.observe(time.perf_counter() - t0, **labels)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                hist.observe(time.perf_counter() - t0, **labels)
+
+        return wrapper
+
+    return decorate
+
+
+def register_gauges(prefix: str, source: Callable[[], Dict[str, Any]]) -> None:
+    """Existing stats dict (numbers / bools) -> `<prefix>_<key>` gauges at scrape time."""
+    _gauge_sources.append((prefix, source))
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+
+    for prefix, source in _gauge_sources:
+        try:
+            stats = source()
+        except Exception:
+            continue
+        for key, value in stats.items():
+            if isinstance(value, bool):
+                value = int(value)
+            if not isinstance(value, (int, float)):
+                continue
+            name = f"{prefix}_{key}"
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_fmt_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# =========================
+# HOT-PATH METRICS
+# =========================
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency per route (streaming: time to headers)"
+)
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests per route and status code")
+
+CHAT_STAGE_SECONDS = Histogram(
+    "chat_stage_duration_seconds", "Time spent per chat turn stage (conversation, history, agent_run, ...)"
+)
+CHAT_TOOL_CALLS_PER_TURN = Histogram(
+    "chat_tool_calls_per_turn", "Tool calls made by the agent in one chat turn", buckets=(0, 1, 2, 3, 5, 8, 13, 21)
+)
+CHAT_TOOL_CALLS = Counter("chat_tool_calls_total", "Tool calls requested by the agent, per tool")
+CHAT_ERRORS = Counter("chat_errors_total", "Chat turns that failed, per stage")
+CHAT_QUEUE_WAIT_SECONDS = Histogram(
+    "chat_queue_wait_seconds", "Time a chat turn waited for its per-user turn + a global agent slot"
+)
+CHAT_REJECTED = Counter("chat_rejected_total", "Chat turns rejected by the scheduler (user_busy / queue_full / queue_timeout)")
+
+CHAT_MODEL_RUN_SECONDS = Histogram("chat_model_run_seconds", "Agent run duration per model tier (incl. tool calls)")
+CHAT_MODEL_RUNS = Counter("chat_model_runs_total", "Agent runs per model tier and outcome (ok / rejected / error)")
+CHAT_MODEL_ESCALATIONS = Counter("chat_model_escalations_total", "Small-tier runs retried on the large model, per reason")
+
+LLM_TOKENS = Counter("llm_tokens_total", "Model tokens per tier and kind (input / cached_input / output), from run usage")
+LLM_PROMPT_CACHED_RATIO = Histogram(
+    "llm_prompt_cached_ratio",
+    "Per chat turn: cached input tokens / input tokens (provider prompt-prefix cache)",
+    buckets=(0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0),
+)
+
+MCP_SERVER_START_SECONDS = Histogram(
+    "mcp_server_start_seconds", "MCP stdio server spawn + initialize handshake"
+)
+MCP_TOOL_CALL_SECONDS = Histogram(
+    "mcp_tool_call_seconds", "Tool call round trip as seen by the agent, per tool and transport"
+)
+TOOL_EXEC_SECONDS = Histogram("tool_exec_seconds", "Tool function execution time (register_tools)")
+TOOL_ERRORS = Counter("tool_errors_total", "Tool calls that raised or returned ok=false")
+
+DB_COMMIT_SECONDS = Histogram("db_commit_seconds", "Session.commit() duration (flush + COMMIT)")
+
+
+def instrument_tool(name: str, fn: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+    """register_tools ka wrapper: exec time + error count (exception ya ok=false)."""
+    if not METRICS_ENABLED:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            TOOL_ERRORS.inc(tool=name)
+            raise
+        finally:
+            TOOL_EXEC_SECONDS.observe(time.perf_counter() - t0, tool=name)
+        if isinstance(result, dict) and result.get("ok") is False:
+            TOOL_ERRORS.inc(tool=name)
+        return result
+
+    return wrapper
+
+
+def instrument_db_commits() -> None:
+    """SQLAlchemy session events -> DB_COMMIT_SECONDS (sync aur AsyncSession dono)."""
+    if not METRICS_ENABLED:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    if event.contains(Session, "before_commit", _before_commit):
+        return
+    event.listen(Session, "before_commit", _before_commit)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+
+
+def _before_commit(session: Any) -> None:
+    session.info["_metrics_commit_t0"] = time.perf_counter()
+
+
+def _after_commit(session: Any) -> None:
+    t0 = session.info.pop("_metrics_commit_t0", None)
+    if t0 is not None:
+        DB_COMMIT_SECONDS.observe(time.perf_counter() - t0)
+
+
+def _after_rollback(session: Any) -> None:
+    session.info.pop("_metrics_commit_t0", None)
+
+
+def route_template(request: Any) -> str:
+    route = request.scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return path
+    from starlette.routing import Match
+
+    for candidate in request.app.router.routes:
+        match, _ = candidate.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(candidate, "path", "unmatched")
+    # raw URL label nahi (user ids -> unbounded cardinality)
+    return "unmatched"
+
+
+async def metrics_middleware(request: Any, call_next: Callable) -> Any:
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = route_template(request)
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - t0, method=request.method, route=route)
+        HTTP_REQUESTS.inc(method=request.method, route=route, status=status)
@@ -0,0 +1,127 @@
+# backend/app/model_router.py
+"""
+Tiered model routing for chat turns.
+
+- classify(message): cheap regex heuristics (no extra model call)
+  - "small": short single command (add / list / complete / delete / find ...)
+  - "large": long, multi-step, planning / explaining, ya pichle turn ka reference ("it", "that one")
+- validate(...): small model ka run accept karne layak hai ya nahi
+  (error, empty reply, write command pe koi tool call nahi, failed tool calls,
+  user_id pucha)
+- escalation: small fail -> same prompt large model pe, LEKIN sirf tab jab small run
+  me koi write tool successful na hua ho (warna task double add / delete ho sakta hai)
+
+OPENAI_MODEL_SMALL unset -> routing off, har turn OPENAI_MODEL (pehle jaisa).
+"""
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+MODEL_LARGE = os.getenv("OPENAI_MODEL", "gpt-5")
+MODEL_SMALL = os.getenv("OPENAI_MODEL_SMALL", "").strip()
+MODEL_ROUTER_SIMPLE_MAX_CHARS = int(os.getenv("MODEL_ROUTER_SIMPLE_MAX_CHARS", "160"))
+MODEL_ROUTER_ESCALATE = os.getenv("MODEL_ROUTER_ESCALATE", "1") != "0"
+
+ROUTING_ENABLED = bool(MODEL_SMALL) and MODEL_SMALL != MODEL_LARGE
+
+TIER_SMALL = "small"
+TIER_LARGE = "large"
+
+WRITE_TOOLS = {
+    "add_task", "complete_task", "delete_task", "update_task",
+    "add_tasks", "complete_tasks", "delete_tasks", "update_tasks",
+}
+
+_SIMPLE = re.compile(
+    r"^\s*(?:please\s+)?(add|create|new|list|show|get|complete|finish|done|mark|check|delete|remove|"
+    r"update|rename|change|edit|find|search)\b",
+    re.IGNORECASE,
+)
+_WRITE_INTENT = re.compile(
+    r"^\s*(?:please\s+)?(add|create|new|complete|finish|done|mark|check|delete|remove|update|rename|change|edit)\b",
+    re.IGNORECASE,
+)
+_COMPLEX = re.compile(
+    r"\b(why|how|explain|plan|prioriti[sz]e|organi[sz]e|suggest|recommend|summari[sz]e|compare|"
+    r"schedule|except|unless|if|instead)\b",
+    re.IGNORECASE,
+)
+_MULTI_STEP = re.compile(r"\b(and then|then|also|after that|afterwards)\b|[;\n]", re.IGNORECASE)
+# pichle turns ka context chahiye
+_REFERENCE = re.compile(r"\b(it|that|those|them|this one|that one|the last one|previous|same)\b", re.IGNORECASE)
+_ASKS_USER_ID = re.compile(r"\buser[\s_-]?id\b", re.IGNORECASE)
+
+
+@dataclass
+class Route:
+    tier: str
+    model: str
+    reason: str
+
+
+def model_for(tier: str) -> str:
+    return MODEL_SMALL if tier == TIER_SMALL and ROUTING_ENABLED else MODEL_LARGE
+
+
+def classify(message: str) -> Route:
+    if not ROUTING_ENABLED:
+        return Route(TIER_LARGE, MODEL_LARGE, "routing_off")
+
+    text = " ".join((message or "").split())
+    if len(text) > MODEL_ROUTER_SIMPLE_MAX_CHARS:
+        reason = "long"
+    elif not _SIMPLE.search(text):
+        reason = "not_a_command"
+    elif _MULTI_STEP.search(text):
+        reason = "multi_step"
+    elif _COMPLEX.search(text):
+        reason = "complex"
+    elif _REFERENCE.search(text):
+        reason = "reference"
+    else:
+        return Route(TIER_SMALL, MODEL_SMALL, "simple")
+    return Route(TIER_LARGE, MODEL_LARGE, reason)
+
+
+def wrote_anything(tool_calls: List[Dict[str, Any]]) -> bool:
+    return any(c.get("name") in WRITE_TOOLS and c.get("ok") for c in tool_calls)
+
+
+def validate(
+    message: str,
+    reply: Optional[str],
+    tool_calls: List[Dict[str, Any]],
+    error: Optional[BaseException] = None,
+) -> Optional[str]:
+    """None = small model ka result theek hai; warna failure reason."""
+    if error is not None:
+        return "error"
+    if not (reply or "").strip():
+        return "empty_reply"
+    if _WRITE_INTENT.search(message or "") and not tool_calls:
+        return "no_tool_call"
+    if tool_calls and not any(c.get("ok") for c in tool_calls):
+        return "tool_error"
+    if _ASKS_USER_ID.search(reply or ""):
+        return "asked_user_id"
+    return None
+
+
+def should_escalate(route: Route, problem: Optional[str], tool_calls: List[Dict[str, Any]]) -> bool:
+    return (
+        problem is not None
+        and route.tier == TIER_SMALL
+        and MODEL_ROUTER_ESCALATE
+        and not wrote_anything(tool_calls)
+    )
+
+
+def model_router_config() -> Dict[str, Any]:
+    return {
+        "enabled": ROUTING_ENABLED,
+        "small": MODEL_SMALL or None,
+        "large": MODEL_LARGE,
+        "simple_max_chars": MODEL_ROUTER_SIMPLE_MAX_CHARS,
+        "escalate": MODEL_ROUTER_ESCALATE,
+    }
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 
 
@@ -8,15 +9,55 @@ from sqlmodel import SQLModel, Field
 # TASK MODEL (EXISTING)
 # =========================
 class Task(SQLModel, table=True):
+    # list_tasks: WHERE user_id = ? [AND completed = ?] ORDER BY id (keyset on id)
+    # task changes: WHERE user_id = ? AND change_version > ?
+    __table_args__ = (
+        Index("ix_task_user_id_completed_id", "user_id", "completed", "id"),
+        Index("ix_task_user_id_change_version", "user_id", "change_version"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: str = Field(index=True)
 
     title: str
+    # nullable -> existing DBs me init_db column add kar deta hai
+    description: Optional[str] = Field(default=None)
     completed: bool = Field(default=False)
 
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    # user ka TaskVersion jis write me ye row last change hui (delta sync cursor)
+    change_version: Optional[int] = Field(default=None)
+
+
+# =========================
+# TASK STATE VERSION
+# =========================
+# Har task write (REST ya MCP process) same transaction me version bump karta hai.
+# Caches is version ko key me use karte hain -> processes ke beech bhi correct.
+class TaskVersion(SQLModel, table=True):
+    __tablename__ = "task_versions"
+
+    user_id: str = Field(primary_key=True)
+    version: int = Field(default=0)
+
+
+# =========================
+# TASK TOMBSTONES
+# =========================
+# Deleted task ids for GET /tasks/changes (client ko pata chale kya hatana hai).
+class TaskTombstone(SQLModel, table=True):
+    __tablename__ = "task_tombstones"
+    __table_args__ = (Index("ix_task_tombstones_user_id_version", "user_id", "version"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: str
+    task_id: int
+    version: int
+
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
+
 
 # =========================
 # CONVERSATION MODEL
@@ -27,6 +68,10 @@ class Conversation(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: str = Field(index=True)
 
+    # rolling summary of turns older than the prompt tail (see prompt_builder)
+    summary: Optional[str] = Field(default=None)
+    summary_upto_id: Optional[int] = Field(default=None)
+
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -36,6 +81,8 @@ class Conversation(SQLModel, table=True):
 # =========================
 class Message(SQLModel, table=True):
     __tablename__ = "messages"
+    # history window: WHERE conversation_id = ? ORDER BY id DESC LIMIT n
+    __table_args__ = (Index("ix_messages_conversation_id_id", "conversation_id", "id"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     conversation_id: int = Field(
@@ -48,3 +95,20 @@ class Message(SQLModel, table=True):
     content: str
 
     created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# =========================
+# IDEMPOTENCY KEYS
+# =========================
+# Client retries (Idempotency-Key header) -> stored response replay,
+# agent dobara run nahi hota / duplicate task nahi banta.
+class IdempotencyKey(SQLModel, table=True):
+    __tablename__ = "idempotency_keys"
+
+    id: str = Field(primary_key=True)  # sha256(method + path + client key)
+    request_hash: str
+    status_code: Optional[int] = Field(default=None)  # None = in progress
+    response_body: Optional[str] = Field(default=None)
+    media_type: Optional[str] = Field(default=None)
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
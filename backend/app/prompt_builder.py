@@ -0,0 +1,105 @@
+# backend/app/prompt_builder.py
+"""
+Token-budgeted prompt assembly with a rolling per-conversation summary.
+
+Prompt = summary (older turns) + short recent tail + USER_ID + new user message.
+Stable parts pehle, volatile parts end me: provider-side prompt-prefix cache
+(instructions + tool schemas + summary + tail) turns ke beech reuse hota hai.
+Jo messages tail me fit nahi hote woh summary me fold ho jate hain (incrementally,
+sirf naye messages; poora summary har turn recompute nahi hota). Summary
+Conversation.summary / Conversation.summary_upto_id me persist hota hai.
+"""
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "1500"))
+PROMPT_RECENT_MESSAGES = int(os.getenv("PROMPT_RECENT_MESSAGES", "8"))
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "300"))
+SUMMARY_LINE_CHARS = int(os.getenv("SUMMARY_LINE_CHARS", "160"))
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 chars per token (good enough for budgeting, no tokenizer dependency)
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class PromptPlan:
+    prompt: str
+    summary: Optional[str]
+    summary_upto_id: Optional[int]
+    summary_changed: bool = False
+
+
+def _line(role: str, content: str) -> str:
+    return f"{'USER' if role == 'user' else 'ASSISTANT'}: {content}"
+
+
+def fold_into_summary(summary: Optional[str], messages: List[Dict]) -> str:
+    """
+    Append one compact line per message, then drop the OLDEST lines until the
+    summary fits SUMMARY_TOKEN_BUDGET.
+    """
+    lines = [ln for ln in (summary or "").splitlines() if ln.strip()]
+    for m in messages:
+        content = " ".join((m.get("content") or "").split())
+        if len(content) > SUMMARY_LINE_CHARS:
+            content = content[: SUMMARY_LINE_CHARS - 3].rstrip() + "..."
+        lines.append(f"- {m['role']}: {content}")
+
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > SUMMARY_TOKEN_BUDGET:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def build_prompt(
+    user_id: str,
+    history: List[Dict],
+    user_message: str,
+    summary: Optional[str] = None,
+    summary_upto_id: Optional[int] = None,
+) -> PromptPlan:
+    """
+    history: oldest -> newest dicts with id / role / content.
+    """
+    pending = [h for h in history if summary_upto_id is None or (h.get("id") or 0) > summary_upto_id]
+
+    head = f"USER_ID: {user_id}"
+    last = _line("user", user_message)
+    # summary ke liye budget hamesha reserve (fold ke baad bhi fit ho)
+    remaining = PROMPT_TOKEN_BUDGET - estimate_tokens(head) - estimate_tokens(last) - SUMMARY_TOKEN_BUDGET
+
+    tail: List[Dict] = []
+    for h in reversed(pending):
+        if len(tail) >= PROMPT_RECENT_MESSAGES:
+            break
+        cost = estimate_tokens(_line(h["role"], h["content"]))
+        if cost > remaining:
+            break
+        remaining -= cost
+        tail.append(h)
+    tail.reverse()
+
+    overflow = pending[: len(pending) - len(tail)]
+    changed = False
+    if overflow:
+        summary = fold_into_summary(summary, overflow)
+        summary_upto_id = overflow[-1].get("id") or summary_upto_id
+        changed = True
+
+    lines: List[str] = []
+    if summary:
+        lines.append("CONVERSATION SUMMARY (older turns):")
+        lines.append(summary)
+    for h in tail:
+        lines.append(_line(h["role"], h["content"]))
+    lines.append(head)
+    lines.append(last)
+
+    return PromptPlan(
+        prompt="\n".join(lines),
+        summary=summary,
+        summary_upto_id=summary_upto_id,
+        summary_changed=changed,
+    )
@@ -0,0 +1,95 @@
+# backend/app/response_cache.py
+"""
+Agent response cache for read-only chat queries ("show my tasks", "what's pending?").
+
+key = user_id + normalized message + per-user task state version (task_versions).
+Koi bhi write (REST ya MCP tool) version bump karta hai -> purana reply kabhi
+serve nahi hota. Sirf read-only messages cache hote hain, aur sirf tab jab agent
+run ke dauran version change na hua ho (matlab run ne kuch likha nahi).
+
+Key me conversation / history nahi hai, is liye sirf wahi sawaal cache hote hain
+jinka jawab sirf task list pe depend karta hai: task list ka zikr ho aur pichle
+turns ka reference ("it", "that one", "I just mentioned") na ho.
+"""
+import os
+import re
+from typing import Any, Dict, Optional
+
+from app.database import async_session
+from app.task_cache import TTLCache, acurrent_task_version
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") != "0"
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+
+_READ_ONLY = re.compile(
+    r"^(?:(?:please\s+)?(?:list|show|display|view|get)\b"
+    r"|what(?:'s| is| are)\b"
+    r"|which\b"
+    r"|how many\b"
+    r"|(?:my\s+)?(?:pending|completed|open|done)?\s*tasks?$)",
+    re.IGNORECASE,
+)
+# jawab task list se aana chahiye ...
+_ABOUT_TASKS = re.compile(r"\b(tasks?|todos?|to dos?|pending|completed|open|done|remaining|left)\b", re.IGNORECASE)
+# ... conversation se nahi
+_CONTEXT_WORDS = re.compile(
+    r"\b(it|its|that|this|these|those|them|one|ones|just|mention\w*|said|told|earlier|previous|"
+    r"above|last|same|again|else)\b",
+    re.IGNORECASE,
+)
+_WRITE_WORDS = re.compile(
+    r"\b(add|create|complete|finish|mark|delete|remove|update|rename|change|edit|clear)\b",
+    re.IGNORECASE,
+)
+
+_cache = TTLCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL)
+_stats: Dict[str, int] = {"hits": 0, "misses": 0, "stores": 0}
+
+
+def normalize(message: str) -> str:
+    text = (message or "").lower()
+    text = text.replace("’", "'")
+    text = re.sub(r"[^\w\s']", " ", text)
+    return " ".join(text.split())
+
+
+def is_read_only(message: str) -> bool:
+    text = normalize(message)
+    return (
+        bool(text)
+        and bool(_READ_ONLY.match(text))
+        and bool(_ABOUT_TASKS.search(text))
+        and not _WRITE_WORDS.search(text)
+        and not _CONTEXT_WORDS.search(text)
+    )
+
+
+async def task_version(user_id: str) -> int:
+    async with async_session() as session:
+        return await acurrent_task_version(session, user_id)
+
+
+def _key(user_id: str, message: str, version: int) -> str:
+    return f"reply:{user_id}:{version}:{normalize(message)}"
+
+
+def lookup(user_id: str, message: str, version: int) -> Optional[Dict[str, Any]]:
+    hit = _cache.get(_key(user_id, message, version))
+    _stats["hits" if hit is not None else "misses"] += 1
+    return hit
+
+
+def store(user_id: str, message: str, version: int, value: Dict[str, Any]) -> None:
+    _cache.set(_key(user_id, message, version), value)
+    _stats["stores"] += 1
+
+
+def response_cache_stats() -> Dict[str, Any]:
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "entries": len(_cache),
+        "enabled": RESPONSE_CACHE_ENABLED,
+        "hit_ratio": round(_stats["hits"] / lookups, 4) if lookups else 0.0,
+    }
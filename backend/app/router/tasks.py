@@ -1,20 +1,99 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import List, Optional
 from sqlmodel import Session, select
 from datetime import datetime
 
-from app.db import get_session
+from app import delta_sync
+from app.database import async_session, get_session
 from app.models import Task
-from app.schemas import TaskCreate, TaskRead
+from app.schemas import (
+    TaskCreate,
+    TaskRead,
+    TaskBulkCreate,
+    TaskIdsRequest,
+    TaskBulkUpdate,
+    BulkResult,
+)
+from app.services import task_service
+from app.task_cache import bump_task_version, cached_task_page, current_task_version
+from app.task_queries import DEFAULT_LIMIT, MAX_LIMIT
+from app.task_search import SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT, search_tasks
 
 router = APIRouter()
 
 
 @router.get("/{user_id}/tasks", response_model=List[TaskRead])
 @router.get("/{user_id}/tasks/", response_model=List[TaskRead])
-def list_tasks(user_id: str, session: Session = Depends(get_session)):
-    stmt = select(Task).where(Task.user_id == user_id).order_by(Task.id)
-    return session.exec(stmt).all()
+def list_tasks(
+    user_id: str,
+    request: Request,
+    response: Response,
+    status: Optional[str] = Query(None, description="pending | completed | all"),
+    after_id: Optional[int] = Query(None, description="keyset cursor: last id of previous page"),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    sort: str = Query("id", description="id | created_at | updated_at | title ('-' prefix = desc)"),
+    session: Session = Depends(get_session),
+):
+    # version pehle padho: page baad ke write ko include kare to bhi agla ETag mismatch hoga
+    version = current_task_version(session, user_id)
+    etag = delta_sync.task_list_etag(user_id, version, status, after_id, limit, sort)
+    if delta_sync.etag_matches(request.headers.get("if-none-match"), etag):
+        return delta_sync.not_modified(etag, {"X-Task-Version": str(version)})
+
+    try:
+        rows, next_after_id = cached_task_page(session, user_id, status, after_id, limit, sort)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    # body list hi rehta hai (frontend compatible); next page cursor header me
+    if next_after_id is not None:
+        response.headers["X-Next-After-Id"] = str(next_after_id)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = delta_sync.CACHE_CONTROL
+    # delta sync cursor (GET /tasks/changes?since=...)
+    response.headers["X-Task-Version"] = str(version)
+    return rows
+
+
+# =========================
+# SEARCH (title; ranked, bounded)
+# NOTE: must be registered BEFORE /tasks/{task_id}/... routes
+# =========================
+@router.get("/{user_id}/tasks/search", response_model=List[TaskRead])
+@router.get("/{user_id}/tasks/search/", response_model=List[TaskRead])
+def find_tasks(
+    user_id: str,
+    q: str = Query(..., min_length=1, description="title text; best match first"),
+    limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+    session: Session = Depends(get_session),
+):
+    try:
+        return search_tasks(session, user_id, q, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+# =========================
+# DELTA SYNC
+# NOTE: must be registered BEFORE /tasks/{task_id}/... routes
+# =========================
+@router.get("/{user_id}/tasks/changes")
+@router.get("/{user_id}/tasks/changes/")
+async def task_changes(
+    user_id: str,
+    response: Response,
+    since: int = Query(0, ge=0, description="cursor from X-Task-Version / previous response"),
+    wait: float = Query(0, ge=0, description="long-poll seconds (capped by SYNC_MAX_WAIT)"),
+):
+    if wait > 0:
+        # koi connection hold nahi hota; waiters ek shared version read use karte hain
+        await delta_sync.wait_for_task_change(user_id, since, wait)
+
+    async with async_session() as session:
+        changes = await delta_sync.task_changes(session, user_id, since)
+
+    response.headers["Cache-Control"] = "no-store"
+    return changes
 
 
 @router.post("/{user_id}/tasks", response_model=TaskRead)
@@ -33,11 +112,47 @@ def create_task(
         updated_at=datetime.utcnow(),
     )
     session.add(task)
+    bump_task_version(session, user_id)
     session.commit()
     session.refresh(task)
     return task
 
 
+# =========================
+# BULK (one transaction per batch, per-item results)
+# NOTE: must be registered BEFORE /tasks/{task_id}/... routes
+# =========================
+def _bulk(fn, *args) -> dict:
+    try:
+        return {"ok": True, "results": fn(*args)}
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.post("/{user_id}/tasks/bulk", response_model=BulkResult)
+@router.post("/{user_id}/tasks/bulk/", response_model=BulkResult)
+def bulk_create(user_id: str, payload: TaskBulkCreate, session: Session = Depends(get_session)):
+    return _bulk(task_service.add_tasks, session, user_id, [t.model_dump() for t in payload.tasks])
+
+
+@router.patch("/{user_id}/tasks/bulk/complete", response_model=BulkResult)
+@router.patch("/{user_id}/tasks/bulk/complete/", response_model=BulkResult)
+def bulk_complete(user_id: str, payload: TaskIdsRequest, session: Session = Depends(get_session)):
+    return _bulk(task_service.complete_tasks, session, user_id, payload.task_ids, payload.completed)
+
+
+@router.post("/{user_id}/tasks/bulk/delete", response_model=BulkResult)
+@router.post("/{user_id}/tasks/bulk/delete/", response_model=BulkResult)
+def bulk_delete(user_id: str, payload: TaskIdsRequest, session: Session = Depends(get_session)):
+    return _bulk(task_service.delete_tasks, session, user_id, payload.task_ids)
+
+
+@router.patch("/{user_id}/tasks/bulk", response_model=BulkResult)
+@router.patch("/{user_id}/tasks/bulk/", response_model=BulkResult)
+def bulk_update(user_id: str, payload: TaskBulkUpdate, session: Session = Depends(get_session)):
+    return _bulk(task_service.update_tasks, session, user_id, [u.model_dump() for u in payload.updates])
+
+
 # 🔥 IMPORTANT FIX: allow BOTH with and without trailing slash
 @router.patch("/{user_id}/tasks/{task_id}/complete", response_model=TaskRead)
 @router.patch("/{user_id}/tasks/{task_id}/complete/", response_model=TaskRead)
@@ -59,6 +174,7 @@ def toggle_complete(
     task.updated_at = datetime.utcnow()
 
     session.add(task)
+    bump_task_version(session, user_id)
     session.commit()
     session.refresh(task)
     return task
@@ -81,5 +197,6 @@ def delete_task(
         raise HTTPException(status_code=404, detail="Task not found")
 
     session.delete(task)
+    bump_task_version(session, user_id)
     session.commit()
     return {"ok": True}
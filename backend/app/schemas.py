@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 
 class TaskCreate(BaseModel):
@@ -13,3 +13,30 @@ class TaskRead(BaseModel):
     title: str
     description: Optional[str] = ""
     completed: bool
+
+
+# =========================
+# BULK
+# =========================
+class TaskBulkCreate(BaseModel):
+    tasks: List[TaskCreate]
+
+
+class TaskIdsRequest(BaseModel):
+    task_ids: List[int]
+    completed: bool = True  # only used by bulk complete
+
+
+class TaskBulkUpdateItem(BaseModel):
+    task_id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+
+
+class TaskBulkUpdate(BaseModel):
+    updates: List[TaskBulkUpdateItem]
+
+
+class BulkResult(BaseModel):
+    ok: bool = True
+    results: List[Dict[str, Any]]
@@ -0,0 +1,75 @@
+# backend/app/server_config.py
+"""
+Production server sizing (used by gunicorn.conf.py).
+
+- worker count: cgroup CPU quota se (container limit), host cpu_count se nahi
+- DB pool per engine: total connections Postgres max_connections ke andar rahe
+
+Total connections ~= replicas * workers * engines_per_worker * (pool_size + max_overflow)
+engines_per_worker = 2 (sync + async) + MCP stdio children (har child ka apna engine)
+"""
+import math
+import os
+from typing import Dict, Optional
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit() -> Optional[float]:
+    """CPUs allowed by the container's cgroup quota (None = unlimited / unknown)."""
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    raw = _read("/sys/fs/cgroup/cpu.max")
+    if raw:
+        parts = raw.split()
+        if len(parts) == 2 and parts[0] != "max":
+            return int(parts[0]) / int(parts[1])
+        return None
+
+    # cgroup v1
+    quota = _read("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+    period = _read("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+    return None
+
+
+def worker_count() -> int:
+    explicit = os.getenv("WEB_CONCURRENCY")
+    if explicit:
+        return max(1, int(explicit))
+
+    cpus = cgroup_cpu_limit() or float(os.cpu_count() or 1)
+    per_core = float(os.getenv("WORKERS_PER_CORE", "1"))
+    workers = max(1, math.ceil(cpus * per_core))
+    max_workers = int(os.getenv("MAX_WORKERS", "0"))
+    return min(workers, max_workers) if max_workers > 0 else workers
+
+
+def engines_per_worker() -> int:
+    mcp_children = 0
+    if os.getenv("MCP_TRANSPORT", "stdio").strip().lower() == "stdio":
+        mcp_children = int(os.getenv("MCP_POOL_SIZE", "2"))
+    return 2 + mcp_children
+
+
+def db_pool_sizing(workers: int) -> Dict[str, int]:
+    """
+    Per-engine pool_size / max_overflow so the whole deployment stays under
+    PG_MAX_CONNECTIONS - DB_RESERVED_CONNECTIONS.
+    """
+    max_conn = int(os.getenv("PG_MAX_CONNECTIONS", "100"))
+    reserved = int(os.getenv("DB_RESERVED_CONNECTIONS", "10"))
+    replicas = max(1, int(os.getenv("BACKEND_REPLICAS", "1")))
+
+    budget = max(1, max_conn - reserved)
+    per_engine = max(1, budget // (replicas * workers * engines_per_worker()))
+
+    # ~2/3 steady pool, rest as burst overflow
+    pool_size = max(1, math.ceil(per_engine * 2 / 3))
+    return {"pool_size": pool_size, "max_overflow": max(0, per_engine - pool_size)}
@@ -1,5 +1,6 @@
-from sqlmodel import Session, select
+from sqlmodel import Session
 
+from app.chat_store import load_history_messages
 from app.models import Conversation, Message
 
 
@@ -46,11 +47,5 @@ def load_history(
     conversation_id: int,
     limit: int = 12,
 ) -> list[Message]:
-    stmt = (
-        select(Message)
-        .where(Message.conversation_id == conversation_id)
-        .order_by(Message.created_at.desc())
-        .limit(limit)
-    )
-    rows = session.exec(stmt).all()
-    return list(reversed(rows))  # oldest → newest
+    # oldest → newest (shared windowed loader)
+    return load_history_messages(session, conversation_id, limit)
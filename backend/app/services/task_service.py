@@ -0,0 +1,173 @@
+# backend/app/services/task_service.py
+"""
+Batch task operations (REST bulk endpoints + MCP batch tools).
+
+Har batch = ek SELECT ... WHERE id IN (...) + ek transaction/commit.
+Results per item return hote hain (input order me), ek item fail ho to baaki chalte hain.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlmodel import Session, select
+
+from app.models import Task
+from app.task_cache import bump_task_version
+from app.task_queries import task_to_dict
+
+MAX_BATCH = 100
+
+
+def _check_size(n: int) -> None:
+    if n > MAX_BATCH:
+        raise ValueError(f"Too many items ({n}); max {MAX_BATCH} per batch")
+
+
+def _owned(session: Session, user_id: str, task_ids: List[int]) -> Dict[int, Task]:
+    if not task_ids:
+        return {}
+    rows = session.exec(
+        select(Task).where(Task.user_id == user_id, Task.id.in_(set(task_ids)))
+    ).all()
+    return {t.id: t for t in rows}
+
+
+def _not_found(task_id: Any) -> Dict[str, Any]:
+    return {"task_id": task_id, "ok": False, "error": f"Task id {task_id} not found"}
+
+
+def _invalid(item: Any) -> Optional[str]:
+    """MCP tools raw dicts bhejte hain (schema validation nahi): per-item error, crash nahi."""
+    if not isinstance(item, dict):
+        return "item must be an object"
+    if item.get("title") is not None and not isinstance(item["title"], str):
+        return "title must be a string"
+    if item.get("description") is not None and not isinstance(item["description"], str):
+        return "description must be a string"
+    return None
+
+
+def add_tasks(session: Session, user_id: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """items: [{"title": ..., "description": ...?}]"""
+    _check_size(len(items))
+    now = datetime.utcnow()
+    results: List[Dict[str, Any]] = []
+    created: List[Any] = []  # Task | error message
+
+    for item in items:
+        error = _invalid(item)
+        if error:
+            created.append(error)
+            continue
+        title = (item.get("title") or "").strip()
+        if not title:
+            created.append("title is required")
+            continue
+        task = Task(
+            user_id=user_id,
+            title=title,
+            description=item.get("description"),
+            completed=False,
+            created_at=now,
+            updated_at=now,
+        )
+        session.add(task)
+        created.append(task)
+
+    if any(isinstance(t, Task) for t in created):
+        # bump PEHLE: new rows abhi session.new me hain -> change_version stamp ho jata hai
+        bump_task_version(session, user_id)
+        # flush -> ids assigned (single INSERT round-trip), then one commit
+        session.flush()
+
+    for task in created:
+        if isinstance(task, Task):
+            results.append({"task_id": task.id, "ok": True, "task": task_to_dict(task)})
+        else:
+            results.append({"ok": False, "error": task})
+
+    session.commit()
+    return results
+
+
+def complete_tasks(
+    session: Session, user_id: str, task_ids: List[int], completed: bool = True
+) -> List[Dict[str, Any]]:
+    _check_size(len(task_ids))
+    found = _owned(session, user_id, task_ids)
+    now = datetime.utcnow()
+
+    results: List[Dict[str, Any]] = []
+    for task_id in task_ids:
+        task = found.get(task_id)
+        if task is None:
+            results.append(_not_found(task_id))
+            continue
+        task.completed = completed
+        task.updated_at = now
+        session.add(task)
+        results.append({"task_id": task_id, "ok": True, "task": task_to_dict(task)})
+
+    if found:
+        bump_task_version(session, user_id)
+        session.commit()
+    return results
+
+
+def delete_tasks(session: Session, user_id: str, task_ids: List[int]) -> List[Dict[str, Any]]:
+    _check_size(len(task_ids))
+    found = _owned(session, user_id, task_ids)
+
+    results: List[Dict[str, Any]] = []
+    deleted = set()
+    for task_id in task_ids:
+        task = found.get(task_id)
+        if task is None or task_id in deleted:
+            results.append(_not_found(task_id))
+            continue
+        session.delete(task)
+        deleted.add(task_id)
+        results.append({"task_id": task_id, "ok": True})
+
+    if deleted:
+        bump_task_version(session, user_id)
+        session.commit()
+    return results
+
+
+def update_tasks(session: Session, user_id: str, updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """updates: [{"task_id": ..., "title": ...?, "description": ...?}]"""
+    _check_size(len(updates))
+    ids = [u.get("task_id") for u in updates if isinstance(u, dict) and isinstance(u.get("task_id"), int)]
+    found = _owned(session, user_id, ids)
+    now = datetime.utcnow()
+
+    results: List[Dict[str, Any]] = []
+    changed = False
+    for u in updates:
+        error = _invalid(u)
+        if error:
+            task_id = u.get("task_id") if isinstance(u, dict) else None
+            results.append({"task_id": task_id, "ok": False, "error": error})
+            continue
+        task_id = u.get("task_id")
+        task = found.get(task_id) if isinstance(task_id, int) else None
+        if task is None:
+            results.append(_not_found(task_id))
+            continue
+        if u.get("title") is not None:
+            title = u["title"].strip()
+            if not title:
+                results.append({"task_id": task_id, "ok": False, "error": "title cannot be empty"})
+                continue
+            task.title = title
+        if u.get("description") is not None:
+            task.description = u["description"]
+        task.updated_at = now
+        session.add(task)
+        changed = True
+        results.append({"task_id": task_id, "ok": True, "task": task_to_dict(task)})
+
+    if changed:
+        bump_task_version(session, user_id)
+        session.commit()
+    return results
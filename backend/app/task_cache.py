@@ -0,0 +1,253 @@
+# backend/app/task_cache.py
+"""
+Read-through per-user task list cache.
+
+- key = user + task state version (task_versions table) + query params
+- har write same transaction me version bump karta hai (bump_task_version),
+  is liye REST API aur MCP server process dono ke writes ke baad stale page
+  kabhi serve nahi hota (version DB se padha jata hai, ek PK lookup)
+- in-process TTL + LRU; optional shared backend (Redis) via TASK_CACHE_REDIS_URL
+  ya set_shared_backend()
+- bump ke waqt session ke pending Task writes pe change_version stamp hota hai aur
+  deletes ke tombstones bante hain (delta sync, see delta_sync.py)
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Protocol, Tuple
+
+from sqlalchemy import select, update
+from sqlmodel import Session
+
+from app.models import Task, TaskTombstone, TaskVersion
+from app.task_queries import DEFAULT_LIMIT, list_task_page, task_to_dict
+
+if TYPE_CHECKING:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+TASK_CACHE_ENABLED = os.getenv("TASK_CACHE_ENABLED", "1") != "0"
+TASK_CACHE_TTL = float(os.getenv("TASK_CACHE_TTL", "60"))
+TASK_CACHE_MAX_ENTRIES = int(os.getenv("TASK_CACHE_MAX_ENTRIES", "1024"))
+TASK_CACHE_REDIS_URL = os.getenv("TASK_CACHE_REDIS_URL", "")
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Optional[str]: ...
+
+    def set(self, key: str, value: str, ttl: float) -> None: ...
+
+
+class RedisBackend:
+    """Shared backend (optional `redis` package)."""
+
+    def __init__(self, url: str) -> None:
+        import redis  # optional dependency
+
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[str]:
+        raw = self._client.get(key)
+        return raw.decode() if raw is not None else None
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self._client.set(key, value, ex=max(1, int(ttl)))
+
+
+class TTLCache:
+    """Thread-safe in-process LRU with per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def drop_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [k for k in self._data if k.startswith(prefix)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_local = TTLCache(TASK_CACHE_MAX_ENTRIES, TASK_CACHE_TTL)
+_shared: Optional[CacheBackend] = None
+_stats: Dict[str, int] = {"hits": 0, "shared_hits": 0, "misses": 0, "invalidations": 0}
+
+if TASK_CACHE_REDIS_URL:
+    try:
+        _shared = RedisBackend(TASK_CACHE_REDIS_URL)
+    except Exception:
+        logger.warning("TASK_CACHE_REDIS_URL set but redis backend unavailable; using in-process cache only")
+
+
+def set_shared_backend(backend: Optional[CacheBackend]) -> None:
+    global _shared
+    _shared = backend
+
+
+# =========================
+# VERSION
+# =========================
+def current_task_version(session: Session, user_id: str) -> int:
+    row = session.get(TaskVersion, user_id)
+    return row.version if row else 0
+
+
+async def acurrent_task_version(session: "AsyncSession", user_id: str) -> int:
+    row = await session.get(TaskVersion, user_id)
+    return row.version if row else 0
+
+
+def bump_task_version(session: Session, user_id: str) -> int:
+    """
+    Call inside the write transaction (before commit), after the task changes
+    but before any session.flush(): only pending (new / dirty) Task rows get stamped.
+    Postgres / SQLite: atomic upsert; others: update-then-insert.
+    Returns the new version; pending Task rows get it as change_version.
+    """
+    changed = [
+        obj for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, Task) and obj.user_id == user_id
+    ]
+    deleted_ids = [
+        obj.id for obj in session.deleted
+        if isinstance(obj, Task) and obj.user_id == user_id and obj.id is not None
+    ]
+
+    # no_autoflush: stamp pehle lag jaye, phir commit pe ek hi INSERT/UPDATE per task
+    with session.no_autoflush:
+        dialect = session.get_bind().dialect.name
+        version: Optional[int] = None
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+
+            stmt = insert(TaskVersion).values(user_id=user_id, version=1)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_id"], set_={"version": TaskVersion.version + 1}
+            )
+            session.execute(stmt)
+        else:
+            result = session.execute(
+                update(TaskVersion)
+                .where(TaskVersion.user_id == user_id)
+                .values(version=TaskVersion.version + 1)
+            )
+            if result.rowcount == 0:
+                session.add(TaskVersion(user_id=user_id, version=1))
+                version = 1
+
+        # version row ab commit tak locked hai -> commit order == version order
+        if version is None:
+            version = session.execute(
+                select(TaskVersion.version).where(TaskVersion.user_id == user_id)
+            ).scalar_one()
+
+    for task in changed:
+        task.change_version = version
+    for task_id in deleted_ids:
+        session.add(TaskTombstone(user_id=user_id, task_id=task_id, version=version))
+
+    invalidate(user_id)
+    return version
+
+
+def invalidate(user_id: str) -> None:
+    # correctness version-key se aati hai; ye sirf local memory free karta hai
+    _stats["invalidations"] += 1
+    _local.drop_prefix(f"tasks:{user_id}:")
+
+
+# =========================
+# READ-THROUGH
+# =========================
+def cached_task_page(
+    session: Session,
+    user_id: str,
+    status: Optional[str] = None,
+    after_id: Optional[int] = None,
+    limit: int = DEFAULT_LIMIT,
+    sort: str = "id",
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    Same contract as task_queries.list_task_page, but returns task dicts.
+    Raises ValueError for bad status / sort.
+    """
+    if not TASK_CACHE_ENABLED:
+        rows, next_after_id = list_task_page(session, user_id, status, after_id, limit, sort)
+        return [task_to_dict(t) for t in rows], next_after_id
+
+    version = current_task_version(session, user_id)
+    key = f"tasks:{user_id}:{version}:{status or ''}:{after_id or ''}:{limit}:{sort}"
+
+    hit = _local.get(key)
+    if hit is not None:
+        _stats["hits"] += 1
+        return hit
+
+    if _shared is not None:
+        try:
+            raw = _shared.get(key)
+        except Exception:
+            raw = None
+        if raw is not None:
+            data = json.loads(raw)
+            value = (data["tasks"], data["next_after_id"])
+            _local.set(key, value)
+            _stats["shared_hits"] += 1
+            return value
+
+    _stats["misses"] += 1
+    rows, next_after_id = list_task_page(session, user_id, status, after_id, limit, sort)
+    value = ([task_to_dict(t) for t in rows], next_after_id)
+    _local.set(key, value)
+
+    if _shared is not None:
+        try:
+            payload = json.dumps({"tasks": value[0], "next_after_id": next_after_id}, default=str)
+            _shared.set(key, payload, TASK_CACHE_TTL)
+        except Exception:
+            logger.debug("shared task cache set failed", exc_info=True)
+
+    return value
+
+
+def cache_stats() -> Dict[str, Any]:
+    lookups = _stats["hits"] + _stats["shared_hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "entries": len(_local),
+        "hit_ratio": round((_stats["hits"] + _stats["shared_hits"]) / lookups, 4) if lookups else 0.0,
+        "enabled": TASK_CACHE_ENABLED,
+        "shared_backend": type(_shared).__name__ if _shared is not None else None,
+    }
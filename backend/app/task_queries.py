@@ -0,0 +1,113 @@
+# backend/app/task_queries.py
+"""
+Shared task list query (REST GET /tasks + MCP list_tasks).
+
+- status filter SQL me (index: task(user_id, completed, id))
+- keyset pagination: after_id + limit (OFFSET nahi, har page O(limit))
+- sort: id | created_at | updated_at | title, "-" prefix = descending
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlmodel import Session, select
+
+from app.models import Task
+
+DEFAULT_LIMIT = 200
+MAX_LIMIT = 1000
+
+SORT_COLUMNS = {
+    "id": Task.id,
+    "created_at": Task.created_at,
+    "updated_at": Task.updated_at,
+    "title": Task.title,
+}
+
+
+def task_to_dict(t: Task) -> Dict[str, Any]:
+    return {
+        "id": t.id,
+        "user_id": t.user_id,
+        "title": t.title,
+        "description": getattr(t, "description", None),
+        "completed": t.completed,
+        "created_at": getattr(t, "created_at", None),
+        "updated_at": getattr(t, "updated_at", None),
+    }
+
+
+def parse_status(status: Optional[str]) -> Optional[bool]:
+    """'pending' -> False, 'completed' -> True, None / 'all' -> None."""
+    if not status:
+        return None
+    s = status.lower().strip()
+    if s in ("pending", "incomplete", "open"):
+        return False
+    if s in ("completed", "done", "closed"):
+        return True
+    if s in ("all", "any"):
+        return None
+    raise ValueError(f"Unknown status '{status}' (use pending | completed | all)")
+
+
+def task_list_query(
+    user_id: str,
+    status: Optional[str] = None,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    sort: str = "id",
+):
+    sort = (sort or "id").strip()
+    desc = sort.startswith("-")
+    key = sort.lstrip("-+")
+    if key not in SORT_COLUMNS:
+        raise ValueError(f"Unknown sort '{sort}' (use {', '.join(SORT_COLUMNS)}, '-' for desc)")
+    col = SORT_COLUMNS[key]
+
+    stmt = select(Task).where(Task.user_id == user_id)
+
+    completed = parse_status(status)
+    if completed is not None:
+        stmt = stmt.where(Task.completed == completed)
+
+    if after_id is not None:
+        if key == "id":
+            stmt = stmt.where(Task.id < after_id if desc else Task.id > after_id)
+        else:
+            # (sort_value, id) keyset; cursor row ki value subquery se
+            cursor = (
+                select(col).where(Task.id == after_id, Task.user_id == user_id).scalar_subquery()
+            )
+            if desc:
+                stmt = stmt.where(or_(col < cursor, and_(col == cursor, Task.id < after_id)))
+            else:
+                stmt = stmt.where(or_(col > cursor, and_(col == cursor, Task.id > after_id)))
+
+    if key == "id":
+        stmt = stmt.order_by(Task.id.desc() if desc else Task.id.asc())
+    else:
+        stmt = stmt.order_by(col.desc(), Task.id.desc()) if desc else stmt.order_by(col.asc(), Task.id.asc())
+
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def list_task_page(
+    session: Session,
+    user_id: str,
+    status: Optional[str] = None,
+    after_id: Optional[int] = None,
+    limit: int = DEFAULT_LIMIT,
+    sort: str = "id",
+) -> Tuple[List[Task], Optional[int]]:
+    """
+    Returns (tasks, next_after_id). next_after_id None = last page.
+    """
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    # one extra row tells us whether another page exists
+    rows = session.exec(task_list_query(user_id, status, after_id, limit + 1, sort)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1].id
+    return rows, None
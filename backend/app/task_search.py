@@ -0,0 +1,234 @@
+# backend/app/task_search.py
+"""
+Indexed task title search (MCP find_tasks + REST GET /tasks/search).
+
+Agent ko title -> id ke liye poori list dump nahi karni padti; ek chhota ranked query:
+
+- Postgres: pg_trgm GIN index on task.title, rank = similarity(title, q)
+  (typos bhi match: "groceris" -> "buy groceries")
+- SQLite: FTS5 external-content table task_fts (trigram tokenizer, SQLite >= 3.34;
+  warna unicode61 + prefix terms), triggers se task ke saath sync, rank = bm25
+- baaki / index missing / query too short: LIKE fallback, Python me difflib se rank
+- result hamesha user_id scoped + bounded (SEARCH_MAX_LIMIT)
+
+Index setup init_db() se hota hai (ensure_search_index); backend detection har
+process me pehli search pe ek baar.
+"""
+import difflib
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import or_, text
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.models import Task
+from app.task_queries import task_to_dict
+
+logger = logging.getLogger(__name__)
+
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", "50"))
+# pg_trgm similarity threshold (0..1); kam = zyada fuzzy
+SEARCH_MIN_SIMILARITY = float(os.getenv("SEARCH_MIN_SIMILARITY", "0.2"))
+# LIKE fallback: itne candidates tak Python ranking
+_FALLBACK_CANDIDATES = 200
+
+TASK_TABLE = Task.__tablename__
+
+_SQLITE_FTS = f"""
+CREATE VIRTUAL TABLE task_fts USING fts5(
+    title, content='{TASK_TABLE}', content_rowid='id', tokenize='{{tokenizer}}'
+)
+"""
+_SQLITE_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON "{TASK_TABLE}" BEGIN
+        INSERT INTO task_fts(rowid, title) VALUES (new.id, new.title);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON "{TASK_TABLE}" BEGIN
+        INSERT INTO task_fts(task_fts, rowid, title) VALUES ('delete', old.id, old.title);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF title ON "{TASK_TABLE}" BEGIN
+        INSERT INTO task_fts(task_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        INSERT INTO task_fts(rowid, title) VALUES (new.id, new.title);
+    END""",
+]
+
+# backend name per process: "pg_trgm" | "fts5_trigram" | "fts5" | "like"
+_backend: Optional[str] = None
+_backend_lock = threading.Lock()
+
+
+# =========================
+# INDEX SETUP (init_db)
+# =========================
+def ensure_search_index(engine: Engine) -> str:
+    """Create the text index for this dialect (idempotent). Returns the backend name."""
+    dialect = engine.dialect.name
+    try:
+        if dialect == "postgresql":
+            with engine.begin() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                conn.execute(
+                    text(
+                        f'CREATE INDEX IF NOT EXISTS ix_task_title_trgm ON "{TASK_TABLE}" '
+                        "USING gin (title gin_trgm_ops)"
+                    )
+                )
+        elif dialect == "sqlite":
+            with engine.begin() as conn:
+                exists = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_fts'")
+                ).first()
+                if not exists:
+                    try:
+                        conn.execute(text(_SQLITE_FTS.format(tokenizer="trigram")))
+                    except Exception:
+                        # SQLite < 3.34: trigram tokenizer nahi
+                        conn.execute(text(_SQLITE_FTS.format(tokenizer="unicode61")))
+                for trigger in _SQLITE_TRIGGERS:
+                    conn.execute(text(trigger))
+                if not exists:
+                    # purane tasks index me
+                    conn.execute(text("INSERT INTO task_fts(task_fts) VALUES ('rebuild')"))
+    except Exception:
+        # e.g. CREATE EXTENSION permission nahi -> LIKE fallback, startup fail nahi
+        logger.warning("task search index unavailable on %s; using LIKE fallback", dialect, exc_info=True)
+
+    global _backend
+    with _backend_lock:
+        _backend = None
+    return _detect(engine)
+
+
+def _detect(engine: Engine) -> str:
+    global _backend
+    if _backend is not None:
+        return _backend
+    with _backend_lock:
+        if _backend is not None:
+            return _backend
+        backend = "like"
+        try:
+            with engine.connect() as conn:
+                if engine.dialect.name == "postgresql":
+                    if conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first():
+                        backend = "pg_trgm"
+                elif engine.dialect.name == "sqlite":
+                    row = conn.execute(
+                        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'task_fts'")
+                    ).first()
+                    if row is not None:
+                        backend = "fts5_trigram" if "trigram" in (row[0] or "") else "fts5"
+        except Exception:
+            logger.warning("task search backend detection failed; using LIKE fallback", exc_info=True)
+        _backend = backend
+        return backend
+
+
+# =========================
+# QUERY
+# =========================
+def _terms(query: str) -> List[str]:
+    return [t for t in query.lower().split() if t]
+
+
+def _fts_match(terms: List[str], trigram: bool) -> Optional[str]:
+    """FTS5 MATCH expression: quoted terms OR-ed (bm25 zyada matching terms ko upar rakhta hai)."""
+    quoted = []
+    for term in terms:
+        if trigram and len(term) < 3:
+            # trigram tokenizer 3 chars se chhote terms match nahi karta
+            continue
+        term = term.replace('"', '""')
+        quoted.append(f'"{term}"' if trigram else f'"{term}"*')
+    return " OR ".join(quoted) or None
+
+
+def _rank(query: str, tasks: List[Task], limit: int) -> List[Task]:
+    q = query.lower()
+
+    def score(t: Task) -> float:
+        title = (t.title or "").lower()
+        return (1.0 if q in title else 0.0) + difflib.SequenceMatcher(None, q, title).ratio()
+
+    return sorted(tasks, key=lambda t: (-score(t), t.id or 0))[:limit]
+
+
+def _like(term: str) -> str:
+    """Substring pattern; user ke `%` / `_` literal (warna "%" har task match karta)."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _search_like(session: Session, user_id: str, query: str, terms: List[str], limit: int) -> List[Task]:
+    conds = [Task.title.ilike(_like(t), escape="\\") for t in terms]
+    rows = session.exec(
+        select(Task).where(Task.user_id == user_id, or_(*conds)).order_by(Task.id).limit(_FALLBACK_CANDIDATES)
+    ).all()
+    return _rank(query, list(rows), limit)
+
+
+def _search_pg(session: Session, user_id: str, query: str, limit: int) -> List[Task]:
+    # `%` operator -> GIN index; threshold per transaction set
+    session.execute(text("SELECT set_config('pg_trgm.similarity_threshold', :th, true)"), {"th": str(SEARCH_MIN_SIMILARITY)})
+    ids = session.execute(
+        text(
+            f'SELECT id FROM "{TASK_TABLE}" '
+            "WHERE user_id = :user_id AND (title % :q OR title ILIKE :like ESCAPE '\\') "
+            "ORDER BY similarity(title, :q) DESC, id LIMIT :limit"
+        ),
+        {"user_id": user_id, "q": query, "like": _like(query), "limit": limit},
+    ).scalars().all()
+    return _load_ordered(session, list(ids))
+
+
+def _search_fts(session: Session, user_id: str, match: str, limit: int) -> List[Task]:
+    ids = session.execute(
+        text(
+            f'SELECT t.id FROM task_fts JOIN "{TASK_TABLE}" t ON t.id = task_fts.rowid '
+            "WHERE task_fts MATCH :match AND t.user_id = :user_id "
+            "ORDER BY bm25(task_fts), t.id LIMIT :limit"
+        ),
+        {"match": match, "user_id": user_id, "limit": limit},
+    ).scalars().all()
+    return _load_ordered(session, list(ids))
+
+
+def _load_ordered(session: Session, ids: List[int]) -> List[Task]:
+    if not ids:
+        return []
+    rows = {t.id: t for t in session.exec(select(Task).where(Task.id.in_(ids))).all()}
+    return [rows[i] for i in ids if i in rows]
+
+
+def search_tasks(session: Session, user_id: str, query: str, limit: int = SEARCH_DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+    """
+    Ranked title matches for one user (best first, max `limit`).
+    Raises ValueError for an empty query.
+    """
+    query = " ".join((query or "").split())
+    if not query:
+        raise ValueError("query is required")
+    limit = max(1, min(int(limit), SEARCH_MAX_LIMIT))
+    terms = _terms(query)
+
+    backend = _detect(session.get_bind())
+    rows: Optional[List[Task]] = None
+    if backend == "pg_trgm":
+        rows = _search_pg(session, user_id, query, limit)
+    elif backend in ("fts5_trigram", "fts5"):
+        match = _fts_match(terms, trigram=backend == "fts5_trigram")
+        if match is not None:
+            rows = _search_fts(session, user_id, match, limit)
+
+    if rows is None or (not rows and backend != "pg_trgm"):
+        # short query (trigram) / no index / FTS exact-token miss -> LIKE (substring) fallback
+        rows = _search_like(session, user_id, query, terms, limit)
+    return [task_to_dict(t) for t in rows]
+
+
+def search_backend() -> Optional[str]:
+    return _backend
@@ -0,0 +1,433 @@
+# backend/app/tracing.py
+"""
+Lightweight per-request tracing: API -> run_chat -> MCP tool (stdio child bhi) -> SQL.
+
+- spans contextvar me chalte hain (asyncio tasks / to_thread / SQLAlchemy greenlets
+  context copy karte hain, is liye parent automatically milta hai)
+- W3C `traceparent` format: incoming HTTP header honour hota hai, aur stdio MCP
+  tool calls ke `_meta` me child process tak jata hai
+- export: TRACE_EXPORTER=file (JSONL, TRACE_FILE) | otlp (OTLP/HTTP JSON,
+  TRACE_OTLP_ENDPOINT) | khali = off. Background thread me batch write.
+- TRACE_SAMPLE_RATE: naye traces ka fraction (incoming sampled flag hamesha honour)
+
+Tool call recording (record_tool_calls / tool_call) tracing off ho tab bhi chalta hai:
+/chat response ka `tool_calls` list isi se banta hai.
+"""
+import atexit
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "").strip().lower()
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318").rstrip("/")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "todo-backend")
+
+TRACING_ENABLED = TRACE_EXPORTER in ("file", "otlp")
+
+_MAX_STATEMENT = 500
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]) -> None:
+        self.trace_id = trace_id
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def finish(self) -> None:
+        self.end_ns = time.time_ns()
+        _exporter.submit(self)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "service": TRACE_SERVICE_NAME,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+_tool_calls: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("trace_tool_calls", default=None)
+
+
+def set_service_name(name: str) -> None:
+    """MCP child process apna naam set karta hai (same exporter config, alag service)."""
+    global TRACE_SERVICE_NAME
+    if not os.getenv("TRACE_SERVICE_NAME"):
+        TRACE_SERVICE_NAME = name
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """'00-<trace 32 hex>-<span 16 hex>-<flags>' -> (trace_id, span_id, sampled)."""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def current_traceparent() -> Optional[str]:
+    s = _current.get()
+    return s.traceparent if s is not None else None
+
+
+def _activate(s: Span) -> Any:
+    return _current.set(s)
+
+
+def _deactivate(token: Any, parent: Optional[Span]) -> None:
+    try:
+        _current.reset(token)
+    except ValueError:
+        # async generator closed from another context; just restore the parent
+        _current.set(parent)
+
+
+@contextmanager
+def start_trace(
+    name: str, traceparent: Optional[str] = None, new_roots: bool = True, **attributes: Any
+) -> Iterator[Optional[Span]]:
+    """
+    Root span (ya remote parent ka child). Not sampled -> None yield hota hai aur
+    saare nested span() calls no-op rehte hain.
+    """
+    if not TRACING_ENABLED:
+        yield None
+        return
+
+    remote = parse_traceparent(traceparent)
+    if remote is not None:
+        trace_id, parent_id, sampled = remote
+    elif new_roots:
+        trace_id, parent_id = "%032x" % random.getrandbits(128), None
+        sampled = random.random() < TRACE_SAMPLE_RATE
+    else:
+        trace_id, parent_id, sampled = "", None, False
+
+    if not sampled:
+        yield None
+        return
+
+    s = Span(name, trace_id, parent_id, dict(attributes))
+    previous = _current.get()
+    token = _activate(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = repr(e)
+        raise
+    finally:
+        _deactivate(token, previous)
+        s.finish()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Child span of the current one (no active sampled trace -> no-op)."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+
+    s = Span(name, parent.trace_id, parent.span_id, dict(attributes))
+    token = _activate(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = repr(e)
+        raise
+    finally:
+        _deactivate(token, parent)
+        s.finish()
+
+
+# =========================
+# TOOL CALL RECORDING (/chat tool_calls)
+# =========================
+@contextmanager
+def record_tool_calls() -> Iterator[List[Dict[str, Any]]]:
+    """Is block ke andar hone wale saare tool calls (name, duration_ms, ok) collect karo."""
+    calls: List[Dict[str, Any]] = []
+    token = _tool_calls.set(calls)
+    try:
+        yield calls
+    finally:
+        try:
+            _tool_calls.reset(token)
+        except ValueError:
+            _tool_calls.set(None)
+
+
+@contextmanager
+def tool_call(name: str, transport: str) -> Iterator[Dict[str, Any]]:
+    """
+    Agent-side tool invocation: span + recorded entry. Caller `entry["ok"]` set kare.
+    """
+    entry: Dict[str, Any] = {"name": name, "transport": transport}
+    t0 = time.perf_counter()
+    with span(f"mcp.tool {name}", tool=name, transport=transport) as s:
+        try:
+            yield entry
+        except Exception:
+            entry["ok"] = False
+            raise
+        finally:
+            entry["duration_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+            calls = _tool_calls.get()
+            if calls is not None:
+                calls.append(entry)
+            if s is not None:
+                s.set(ok=entry.get("ok"))
+
+
+def traced_tool(name: str, fn: Any, mcp: Any) -> Any:
+    """
+    register_tools wrapper: tool execution span.
+    In-process: current span ka child. Stdio child process: parent `_meta.traceparent` se.
+    """
+    if not TRACING_ENABLED:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if _current.get() is not None:
+            with span(f"tool.exec {name}", tool=name):
+                return fn(*args, **kwargs)
+        with start_trace(f"tool.exec {name}", traceparent=_request_traceparent(mcp), new_roots=False, tool=name):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def _request_traceparent(mcp: Any) -> Optional[str]:
+    try:
+        meta = mcp.get_context().request_context.meta
+    except Exception:  # not inside an MCP request (direct call)
+        return None
+    if meta is None:
+        return None
+    value = getattr(meta, "traceparent", None)
+    if value is None:
+        value = (getattr(meta, "model_extra", None) or {}).get("traceparent")
+    return value
+
+
+# =========================
+# SQL SPANS
+# =========================
+def instrument_sql() -> None:
+    """Har SQL statement -> `db.query` span (sirf jab koi sampled trace active ho)."""
+    if not TRACING_ENABLED:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+def _before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    parent = _current.get()
+    if parent is None or context is None:
+        return
+    context._trace_span = Span(
+        "db.query",
+        parent.trace_id,
+        parent.span_id,
+        {"db.system": conn.dialect.name, "db.statement": statement[:_MAX_STATEMENT]},
+    )
+
+
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    s = getattr(context, "_trace_span", None)
+    if s is not None:
+        context._trace_span = None
+        s.set(rows=getattr(cursor, "rowcount", -1))
+        s.finish()
+
+
+def _handle_error(exception_context: Any) -> None:
+    context = exception_context.execution_context
+    s = getattr(context, "_trace_span", None) if context is not None else None
+    if s is not None:
+        context._trace_span = None
+        s.error = repr(exception_context.original_exception)
+        s.finish()
+
+
+# =========================
+# EXPORT
+# =========================
+class _Exporter:
+    """Finished spans -> queue -> background thread (request path kabhi I/O pe block nahi)."""
+
+    def __init__(self, batch_size: int = 256, interval: float = 1.0) -> None:
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=10000)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def submit(self, s: Span) -> None:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(s)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _drain(self, block: bool) -> List[Span]:
+        batch: List[Span] = []
+        try:
+            if block:
+                batch.append(self._queue.get(timeout=self.interval))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._drain(block=True)
+            if batch:
+                self._write(batch)
+
+    def flush(self) -> None:
+        while True:
+            batch = self._drain(block=False)
+            if not batch:
+                return
+            self._write(batch)
+
+    def _write(self, batch: List[Span]) -> None:
+        try:
+            with self._lock:
+                if TRACE_EXPORTER == "otlp":
+                    _post_otlp(batch)
+                else:
+                    with open(TRACE_FILE, "a") as f:
+                        for s in batch:
+                            f.write(json.dumps(s.to_dict(), default=str) + "\n")
+        except Exception:
+            logger.warning("trace export failed (%s spans dropped)", len(batch), exc_info=True)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _post_otlp(batch: List[Span]) -> None:
+    spans = [
+        {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "parentSpanId": s.parent_id or "",
+            "name": s.name,
+            "kind": 1,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items() if v is not None],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        for s in batch
+    ]
+    payload = {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": TRACE_SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": "app.tracing"}, "spans": spans}],
+            }
+        ]
+    }
+    req = urllib.request.Request(
+        f"{TRACE_OTLP_ENDPOINT}/v1/traces",
+        data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=5):
+        pass
+
+
+_exporter = _Exporter()
+
+
+def shutdown() -> None:
+    """FastAPI shutdown: pending spans flush karo."""
+    if _exporter._thread is not None:
+        _exporter.flush()
+
+
+# =========================
+# HTTP MIDDLEWARE
+# =========================
+async def tracing_middleware(request: Any, call_next: Any) -> Any:
+    from app.metrics import route_template
+
+    with start_trace(f"{request.method} {request.url.path}", traceparent=request.headers.get("traceparent")) as root:
+        response = await call_next(request)
+        if root is not None:
+            route = route_template(request)
+            root.name = f"{request.method} {route}"
+            root.set(**{"http.method": request.method, "http.route": route, "http.status_code": response.status_code})
+            response.headers["X-Trace-Id"] = root.trace_id
+        return response
@@ -0,0 +1,77 @@
+# backend/benchmarks/_common.py
+"""
+Shared helpers for the offline benchmarks.
+
+Run from the backend folder, e.g.:
+    python -m benchmarks.bench_mcp_transport
+"""
+import json
+import os
+import statistics
+import tempfile
+from typing import Any, Dict, List, Optional
+
+
+def use_temp_sqlite(name: str = "bench") -> str:
+    """
+    Point DATABASE_URL at a fresh SQLite file.
+    Must be called BEFORE importing anything from `app` (DATABASE_URL is read at import).
+    """
+    if not os.getenv("BENCH_KEEP_DATABASE_URL"):
+        fd, path = tempfile.mkstemp(prefix=f"{name}-", suffix=".db")
+        os.close(fd)
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return os.environ["DATABASE_URL"]
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    if not samples_ms:
+        return {"n": 0}
+    ordered = sorted(samples_ms)
+
+    def pct(p: float) -> float:
+        idx = min(len(ordered) - 1, max(0, int(round(p / 100.0 * len(ordered))) - 1))
+        return ordered[idx]
+
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(pct(50), 3),
+        "p95_ms": round(pct(95), 3),
+        "p99_ms": round(pct(99), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def print_table(rows: Dict[str, Dict[str, float]]) -> None:
+    cols = ["n", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    if any("throughput_rps" in r for r in rows.values()):
+        cols += ["throughput_rps", "errors"]
+    if any("db_commits_per_turn" in r for r in rows.values()):
+        cols += ["db_commits_per_turn"]
+    # lambe column names (db_commits_per_turn) header / values ko chipka na dein
+    widths = [max(15, len(c) + 1) for c in cols]
+    print(f"{'case':<28}" + "".join(f"{c:>{w}}" for c, w in zip(cols, widths)))
+    for name, stats in rows.items():
+        print(f"{name:<28}" + "".join(f"{stats.get(c, ''):>{w}}" for c, w in zip(cols, widths)))
+
+
+def write_results(path: str, meta: Dict[str, Any], rows: Dict[str, Dict[str, float]]) -> None:
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "results": rows}, f, indent=2, sort_keys=True)
+
+
+def compare_results(baseline_path: str, rows: Dict[str, Dict[str, float]], key: str = "p95_ms") -> None:
+    """Print current vs baseline for one metric (positive % = slower)."""
+    with open(baseline_path) as f:
+        base: Dict[str, Any] = json.load(f).get("results", {})
+
+    print(f"\n{'case':<28}{'baseline':>11}{'current':>11}{'delta %':>10}   ({key})")
+    for name, stats in rows.items():
+        old: Optional[float] = base.get(name, {}).get(key)
+        new = stats.get(key)
+        if old is None or new is None:
+            print(f"{name:<28}{'-':>11}{new if new is not None else '-':>11}{'-':>10}")
+            continue
+        delta = ((new - old) / old * 100.0) if old else 0.0
+        print(f"{name:<28}{old:>11}{new:>11}{delta:>+10.1f}")
@@ -0,0 +1,211 @@
+# backend/benchmarks/bench_api.py
+"""
+Load / latency benchmark for the task + chat APIs (fully offline).
+
+Drives `app.main:app` in-process through httpx.ASGITransport at a configurable
+concurrency. The OpenAI model is replaced by the deterministic StubModel, so no
+network / API key is needed. SQLite temp DB by default, or --database-url for a
+local Postgres.
+
+Scenarios:
+  tasks    REST create -> list -> complete -> delete
+  chat     POST /chat end to end (history, prompt, agent loop, MCP tools)
+  chat_stream  POST /chat/stream, full SSE body (+ time to first delta)
+  mcp      one list_tasks tool call (current MCP_TRANSPORT)
+  history  windowed history load
+
+    python -m benchmarks.bench_api --concurrency 8 --requests 200 --out results.json
+    python -m benchmarks.bench_api --compare results.json
+"""
+import argparse
+import asyncio
+import os
+import platform
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from benchmarks._common import compare_results, print_table, summarize, use_temp_sqlite, write_results
+
+
+async def _drive(
+    op: Callable[[int], Awaitable[None]], total: int, concurrency: int
+) -> Dict[str, float]:
+    samples: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            t0 = time.perf_counter()
+            try:
+                await op(i)
+            except Exception:
+                errors += 1
+                continue
+            samples.append((time.perf_counter() - t0) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    stats = summarize(samples)
+    stats["errors"] = errors
+    stats["throughput_rps"] = round(len(samples) / elapsed, 2) if elapsed else 0.0
+    return stats
+
+
+async def run(args) -> Dict[str, Dict[str, float]]:
+    import httpx
+    from agents import set_tracing_disabled
+    from sqlmodel import Session
+
+    from app import agent_runner
+    from app.chat_store import load_history
+    from app.database import get_engine, init_db
+    from app.main import app
+    from app.mcp_pool import mcp_pool
+    from benchmarks.stub_model import StubModelProvider
+
+    init_db()
+    # SDK trace export api.openai.com pe jata hai: offline run me network attempts nahi chahiye
+    set_tracing_disabled(True)
+    agent_runner.set_model_provider(StubModelProvider(latency_ms=args.model_latency_ms))
+
+    users = [f"bench-{i}" for i in range(args.users)]
+    rows: Dict[str, Dict[str, float]] = {}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+
+        def _ok(r: httpx.Response) -> httpx.Response:
+            r.raise_for_status()
+            return r
+
+        if "tasks" in args.scenarios:
+            async def task_crud(i: int) -> None:
+                u = users[i % len(users)]
+                created = _ok(await client.post(f"/api/{u}/tasks", json={"title": f"bench task {i}"})).json()
+                _ok(await client.get(f"/api/{u}/tasks", params={"limit": 50}))
+                _ok(await client.patch(f"/api/{u}/tasks/{created['id']}/complete"))
+                _ok(await client.delete(f"/api/{u}/tasks/{created['id']}"))
+
+            async def task_list(i: int) -> None:
+                _ok(await client.get(f"/api/{users[i % len(users)]}/tasks"))
+
+            rows["tasks.crud_cycle"] = await _drive(task_crud, args.requests, args.concurrency)
+            rows["tasks.list"] = await _drive(task_list, args.requests, args.concurrency)
+
+        if "chat" in args.scenarios:
+            messages = ["add buy milk {i}", "list", "hello there", "add call mom {i}"]
+
+            async def chat(i: int) -> None:
+                u = users[i % len(users)]
+                text = messages[i % len(messages)].format(i=i)
+                _ok(await client.post(f"/api/{u}/chat", json={"message": text}))
+
+            from app.metrics import DB_COMMIT_SECONDS
+
+            commits_before = DB_COMMIT_SECONDS.count()
+            rows["chat.turn"] = await _drive(chat, args.requests, args.concurrency)
+            # includes tool writes (add_task); message persistence itself is 1 commit per turn
+            rows["chat.turn"]["db_commits_per_turn"] = round(
+                (DB_COMMIT_SECONDS.count() - commits_before) / max(1, args.requests), 2
+            )
+
+        if "chat_stream" in args.scenarios:
+            stream_messages = ["add buy bread {i}", "list", "hello there"]
+            first_delta_ms: List[float] = []
+
+            async def chat_stream(i: int) -> None:
+                u = users[i % len(users)]
+                text = stream_messages[i % len(stream_messages)].format(i=i)
+                t0 = time.perf_counter()
+                seen_delta = False
+                async with client.stream("POST", f"/api/{u}/chat/stream", json={"message": text}) as r:
+                    r.raise_for_status()
+                    async for line in r.aiter_lines():
+                        if line == "event: delta" and not seen_delta:
+                            seen_delta = True
+                            first_delta_ms.append((time.perf_counter() - t0) * 1000)
+                        elif line == "event: error":
+                            raise RuntimeError("stream error event")
+
+            rows["chat_stream.turn"] = await _drive(chat_stream, args.requests, args.concurrency)
+            rows["chat_stream.first_delta"] = summarize(first_delta_ms)
+
+    if "mcp" in args.scenarios:
+        if agent_runner.MCP_TRANSPORT == "inprocess":
+            from app.mcp_tools.inprocess import call_tool
+
+            async def mcp_call(i: int) -> None:
+                await call_tool("list_tasks", {"user_id": users[i % len(users)]})
+        else:
+            async def mcp_call(i: int) -> None:
+                async with mcp_pool.acquire() as server:
+                    await server.call_tool("list_tasks", {"user_id": users[i % len(users)]})
+
+        rows[f"mcp.list_tasks.{agent_runner.MCP_TRANSPORT}"] = await _drive(
+            mcp_call, args.requests, args.concurrency
+        )
+
+    if "history" in args.scenarios:
+        from sqlmodel import select
+
+        from app.models import Conversation
+
+        with Session(get_engine()) as session:
+            convo = session.exec(select(Conversation).limit(1)).first()
+        if convo is not None:
+            async def history(i: int) -> None:
+                with Session(get_engine()) as session:
+                    load_history(session, convo.id)
+
+            rows["history.load"] = await _drive(history, args.requests, 1)
+
+    await mcp_pool.close()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="operations per scenario")
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--scenarios", nargs="+", default=["tasks", "chat", "chat_stream", "mcp", "history"])
+    parser.add_argument("--transport", choices=["inprocess", "stdio"], default="inprocess")
+    parser.add_argument("--model-latency-ms", type=float, default=0.0, help="simulated model latency per call")
+    parser.add_argument("--database-url", default=None, help="default: fresh temp SQLite file")
+    parser.add_argument("--out", default=None, help="write JSON results here")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare p95 against")
+    args = parser.parse_args()
+
+    # env BEFORE importing app (engines / transport are configured at import)
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        use_temp_sqlite("api")
+    os.environ["MCP_TRANSPORT"] = args.transport
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench-offline")
+
+    rows = asyncio.run(run(args))
+    print_table(rows)
+
+    if args.out:
+        meta = {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "transport": args.transport,
+            "model_latency_ms": args.model_latency_ms,
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        write_results(args.out, meta, rows)
+        print(f"\nresults written to {args.out}")
+    if args.compare:
+        compare_results(args.compare, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# backend/benchmarks/bench_history.py
+"""
+History loading cost vs conversation length.
+
+Seeds conversations with 1k / 10k / 100k messages and times the windowed
+loader (chat_store.load_history) against the old "load all + slice" approach.
+Windowed cost should stay flat as the conversation grows.
+
+    python -m benchmarks.bench_history --sizes 1000 10000 100000 --turns 50
+"""
+import argparse
+import time
+from datetime import datetime
+
+from benchmarks._common import print_table, summarize, use_temp_sqlite
+
+use_temp_sqlite("history")
+
+from sqlalchemy import insert  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+
+from app.chat_store import HISTORY_LIMIT, load_history  # noqa: E402
+from app.database import get_engine, init_db  # noqa: E402
+from app.models import Conversation, Message  # noqa: E402
+
+
+def _seed(n_messages: int) -> int:
+    with Session(get_engine()) as session:
+        convo = Conversation(user_id="bench-user")
+        session.add(convo)
+        session.commit()
+        session.refresh(convo)
+        convo_id = convo.id
+
+    now = datetime.utcnow()
+    batch = 5000
+    with get_engine().begin() as conn:
+        for start in range(0, n_messages, batch):
+            conn.execute(
+                insert(Message),
+                [
+                    {
+                        "conversation_id": convo_id,
+                        "user_id": "bench-user",
+                        "role": "user" if i % 2 == 0 else "assistant",
+                        "content": f"message {i} " + "x" * 80,
+                        "created_at": now,
+                    }
+                    for i in range(start, min(start + batch, n_messages))
+                ],
+            )
+    return convo_id
+
+
+def _legacy_load(session: Session, conversation_id: int, limit: int):
+    msgs = session.exec(
+        select(Message).where(Message.conversation_id == conversation_id).order_by(Message.id.asc())
+    ).all()
+    return msgs[-limit:]
+
+
+def _time(fn, turns: int):
+    samples = []
+    for _ in range(turns):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--skip-legacy", action="store_true", help="don't time the load-all baseline")
+    args = parser.parse_args()
+
+    init_db()
+    rows = {}
+    for size in args.sizes:
+        convo_id = _seed(size)
+        with Session(get_engine()) as session:
+            rows[f"windowed {size}"] = summarize(
+                _time(lambda: load_history(session, convo_id, HISTORY_LIMIT), args.turns)
+            )
+            if not args.skip_legacy:
+                rows[f"load-all {size}"] = summarize(
+                    _time(lambda: _legacy_load(session, convo_id, HISTORY_LIMIT), max(1, args.turns // 10))
+                )
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
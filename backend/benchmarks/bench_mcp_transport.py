@@ -0,0 +1,118 @@
+# backend/benchmarks/bench_mcp_transport.py
+"""
+Per-tool-call overhead: stdio MCP (pooled child process) vs in-process dispatch.
+"step xN" = N independent complete_task calls issued together (like one model step);
+tool executor ke saath ye ~ ek call jitna hona chahiye, N guna nahi.
+
+    python -m benchmarks.bench_mcp_transport --calls 200 --tasks 20 --parallel 3
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._common import print_table, summarize, use_temp_sqlite
+
+use_temp_sqlite("mcp-transport")
+
+from sqlmodel import Session, SQLModel  # noqa: E402
+
+from app.database import get_engine  # noqa: E402
+from app.models import Task  # noqa: E402
+
+USER_ID = "bench-user"
+
+
+def _seed(n_tasks: int) -> None:
+    SQLModel.metadata.create_all(get_engine())
+    with Session(get_engine()) as session:
+        for i in range(n_tasks):
+            session.add(Task(user_id=USER_ID, title=f"task {i}"))
+        session.commit()
+
+
+async def _bench_inprocess(calls: int):
+    from app.mcp_tools.inprocess import get_function_tools
+
+    tools = {t.name: t for t in await get_function_tools()}
+    list_tool = tools["list_tasks"]
+    args = f'{{"user_id": "{USER_ID}"}}'
+
+    await list_tool.on_invoke_tool(None, args)  # warm-up
+    samples = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        await list_tool.on_invoke_tool(None, args)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+async def _bench_stdio(calls: int, parallel: int):
+    from app.mcp_pool import MCPServerPool
+
+    pool = MCPServerPool(size=1)
+    samples = []
+    step_samples = []
+    try:
+        async with pool.acquire() as server:
+            await server.call_tool("list_tasks", {"user_id": USER_ID})  # warm-up
+            for _ in range(calls):
+                t0 = time.perf_counter()
+                await server.call_tool("list_tasks", {"user_id": USER_ID})
+                samples.append((time.perf_counter() - t0) * 1000)
+            for i in range(calls):
+                t0 = time.perf_counter()
+                await asyncio.gather(
+                    *[server.call_tool("complete_task", {"user_id": USER_ID, "task_id": _task_id(i, j, parallel)})
+                      for j in range(parallel)]
+                )
+                step_samples.append((time.perf_counter() - t0) * 1000)
+    finally:
+        await pool.close()
+    return samples, step_samples
+
+
+async def _bench_inprocess_step(calls: int, parallel: int):
+    from app.mcp_tools.inprocess import call_tool
+
+    samples = []
+    for i in range(calls):
+        t0 = time.perf_counter()
+        await asyncio.gather(
+            *[call_tool("complete_task", {"user_id": USER_ID, "task_id": _task_id(i, j, parallel)})
+              for j in range(parallel)]
+        )
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+_n_tasks = 0
+
+
+def _task_id(i: int, j: int, parallel: int) -> int:
+    # distinct ids within a step (no per-task lock contention)
+    return (i * parallel + j) % _n_tasks + 1
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--parallel", type=int, default=3, help="independent tool calls per step")
+    args = parser.parse_args()
+
+    global _n_tasks
+    _n_tasks = max(args.tasks, args.parallel)
+    _seed(_n_tasks)
+
+    stdio_calls, stdio_steps = await _bench_stdio(args.calls, args.parallel)
+    rows = {
+        "inprocess list_tasks": summarize(await _bench_inprocess(args.calls)),
+        "stdio list_tasks": summarize(stdio_calls),
+        f"inprocess step x{args.parallel}": summarize(await _bench_inprocess_step(args.calls, args.parallel)),
+        f"stdio step x{args.parallel}": summarize(stdio_steps),
+    }
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
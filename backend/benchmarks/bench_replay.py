@@ -0,0 +1,229 @@
+# backend/benchmarks/bench_replay.py
+"""
+Record / replay agent runs -> deterministic profiling of our own overhead
+(DB, MCP transport, prompt building, persistence), offline / CI me.
+
+record: real model (OPENAI_API_KEY), scripted conversation -> cassette
+    python -m benchmarks.bench_replay record --cassette run.jsonl "add buy milk" "list my tasks" "complete 1"
+    python -m benchmarks.bench_replay record --cassette run.jsonl --script conversation.txt
+
+replay: local stand-in model server (replay_server.py) cassette serve karta hai, baaki sab asli
+    python -m benchmarks.bench_replay replay --cassette run.jsonl --latency zero --passes 5 --out replay.json
+    python -m benchmarks.bench_replay replay --cassette run.jsonl --latency original
+    python -m benchmarks.bench_replay replay --cassette run.jsonl --compare replay.json   # p95 vs baseline
+
+Har pass se pehle DB rows clear hoti hain (ids phir 1 se, jaise recording ke waqt), is liye
+requests recorded requests se byte-identical rehti hain (exact match). Report: per-turn latency,
+per-stage time (conversation / history / agent_run / persist), tool call time, mismatches.
+"""
+import argparse
+import asyncio
+import os
+import platform
+import time
+from typing import Dict, List, Optional
+
+from benchmarks._common import compare_results, print_table, summarize, use_temp_sqlite, write_results
+
+use_temp_sqlite("replay")
+
+DEFAULT_USER = "replay-user"
+STAGES = ("conversation", "history", "agent_run", "persist")
+
+
+def _messages(args) -> List[str]:
+    messages = list(args.messages or [])
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            messages += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not messages:
+        raise SystemExit("no messages: pass them as arguments or via --script")
+    return messages
+
+
+async def _shutdown() -> None:
+    from app.database import dispose_engines
+    from app.mcp_pool import mcp_pool
+    from app.message_writer import message_writer
+
+    await mcp_pool.close()
+    await message_writer.close()
+    await dispose_engines()
+
+
+def _reset_db() -> None:
+    """Saari rows delete (task_versions chhod ke: versions badhte rehte hain -> caches stale nahi)."""
+    from sqlmodel import SQLModel
+
+    from app.database import get_engine
+
+    with get_engine().begin() as conn:
+        for table in reversed(SQLModel.metadata.sorted_tables):
+            if table.name != "task_versions":
+                conn.execute(table.delete())
+
+
+def _stage_totals() -> Dict[str, float]:
+    from app.metrics import CHAT_STAGE_SECONDS
+
+    return {stage: CHAT_STAGE_SECONDS.total(stage=stage) for stage in STAGES}
+
+
+async def record(args) -> None:
+    if not os.getenv("OPENAI_API_KEY"):
+        raise SystemExit("record needs OPENAI_API_KEY (real model)")
+    messages = _messages(args)
+
+    from agents import set_default_openai_client, set_tracing_disabled
+
+    from app import agent_runner
+    from app.database import init_db
+    from benchmarks.cassette import CassetteWriter, recording_openai_client
+
+    init_db()
+    # SDK trace export api.openai.com pe jata hai: cassette / replay me nahi chahiye
+    set_tracing_disabled(True)
+    writer = CassetteWriter(
+        args.cassette,
+        {
+            "user_id": args.user,
+            "messages": messages,
+            "model": os.getenv("OPENAI_MODEL", "gpt-5"),
+            "model_small": os.getenv("OPENAI_MODEL_SMALL") or None,
+            "transport": agent_runner.MCP_TRANSPORT,
+        },
+    )
+    set_default_openai_client(recording_openai_client(writer), use_for_tracing=False)
+
+    conversation_id: Optional[int] = None
+    try:
+        for i, text in enumerate(messages):
+            t0 = time.perf_counter()
+            result = await agent_runner.run_chat(args.user, text, conversation_id)
+            conversation_id = result["conversation_id"]
+            writer.write(
+                {
+                    "kind": "turn",
+                    "index": i,
+                    "message": text,
+                    "reply": result["reply"],
+                    "tool_calls": result.get("tool_calls", []),
+                    "latency_ms": round((time.perf_counter() - t0) * 1000, 2),
+                }
+            )
+            print(f"[{i}] {text!r} -> {len(result.get('tool_calls', []))} tool call(s)")
+    finally:
+        writer.close()
+        await _shutdown()
+    print(f"cassette written: {args.cassette}")
+
+
+async def replay(args) -> None:
+    from benchmarks.cassette import load, tool_calls_of
+    from benchmarks.replay_server import start_replay_server
+
+    data = load(args.cassette)
+    meta = data["meta"]
+    messages: List[str] = meta.get("messages") or [t["message"] for t in data["turns"]]
+    user_id = meta.get("user_id") or DEFAULT_USER
+    recorded_tools = tool_calls_of(data["turns"])
+
+    server, replayer, base_url = start_replay_server(args.cassette, args.latency, strict=args.strict)
+    # client lazily bante hain -> pehle agent run se pehle env set hona kaafi hai
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "replay")
+
+    from agents import set_tracing_disabled
+
+    from app import agent_runner
+    from app.database import init_db
+
+    init_db()
+    set_tracing_disabled(True)
+
+    turn_ms: List[float] = []
+    tool_ms: List[float] = []
+    stage_ms: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    tool_mismatches = 0
+    errors = 0
+    try:
+        for p in range(args.passes):
+            _reset_db()
+            replayer.reset()
+            conversation_id: Optional[int] = None
+            for i, text in enumerate(messages):
+                before = _stage_totals()
+                t0 = time.perf_counter()
+                try:
+                    result = await agent_runner.run_chat(user_id, text, conversation_id)
+                except Exception as e:
+                    errors += 1
+                    print(f"pass {p} turn {i}: {e!r}")
+                    continue
+                turn_ms.append((time.perf_counter() - t0) * 1000)
+                after = _stage_totals()
+                for stage in STAGES:
+                    stage_ms[stage].append((after[stage] - before[stage]) * 1000)
+                calls = result.get("tool_calls", [])
+                tool_ms.append(sum(c.get("duration_ms", 0) for c in calls))
+                conversation_id = result["conversation_id"]
+                if i < len(recorded_tools) and [c.get("name") for c in calls] != recorded_tools[i]:
+                    tool_mismatches += 1
+    finally:
+        server.shutdown()
+        await _shutdown()
+
+    rows: Dict[str, Dict[str, float]] = {"replay.turn": summarize(turn_ms)}
+    rows["replay.turn"]["errors"] = errors
+    for stage in STAGES:
+        rows[f"replay.stage.{stage}"] = summarize(stage_ms[stage])
+    rows["replay.tool_calls"] = summarize(tool_ms)
+    print_table(rows)
+    print(
+        f"\nmodel requests: {replayer.stats}  "
+        f"tool sequence mismatches: {tool_mismatches}/{len(messages) * args.passes}  latency={args.latency}"
+    )
+
+    if args.out:
+        write_results(
+            args.out,
+            {
+                "cassette": args.cassette,
+                "latency": args.latency,
+                "passes": args.passes,
+                "turns": len(messages),
+                "transport": agent_runner.MCP_TRANSPORT,
+                "python": platform.python_version(),
+                "replay": replayer.stats,
+                "tool_mismatches": tool_mismatches,
+            },
+            rows,
+        )
+    if args.compare:
+        compare_results(args.compare, rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    rec = sub.add_parser("record", help="run a conversation against the real model and write a cassette")
+    rec.add_argument("--cassette", required=True)
+    rec.add_argument("--user", default=DEFAULT_USER)
+    rec.add_argument("--script", help="file with one user message per line")
+    rec.add_argument("messages", nargs="*")
+
+    rep = sub.add_parser("replay", help="replay a cassette through the local stand-in model server")
+    rep.add_argument("--cassette", required=True)
+    rep.add_argument("--latency", default="zero", help="original | zero | scale factor (e.g. 0.5)")
+    rep.add_argument("--passes", type=int, default=3)
+    rep.add_argument("--strict", action="store_true", help="only exact request matches")
+    rep.add_argument("--out", help="write results JSON")
+    rep.add_argument("--compare", help="baseline results JSON (p95 delta)")
+
+    args = parser.parse_args()
+    asyncio.run(record(args) if args.mode == "record" else replay(args))
+
+
+if __name__ == "__main__":
+    main()
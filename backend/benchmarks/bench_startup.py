@@ -0,0 +1,92 @@
+# backend/benchmarks/bench_startup.py
+"""
+Cold-start cost: fresh interpreter import time of the API app and the MCP tool
+server (what every stdio MCP child pays), plus optional MCP handshake.
+
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --runs 5 --handshake --out startup.json
+    python -m benchmarks.bench_startup --baseline startup.json
+
+`-X importtime` breakdown ke liye:  python -X importtime -c "import app.main"
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from benchmarks._common import compare_results, print_table, summarize, use_temp_sqlite, write_results
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    "import app.main": "import app.main",
+    "import mcp server": "import app.mcp_tools.server",
+    # agents SDK ab lazy hai; yeh case dikhata hai pehli chat turn kitna pay karti hai
+    "import agents sdk": "import agents",
+}
+
+
+def _time_import(stmt: str, runs: int, env: Dict[str, str]) -> List[float]:
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-c", stmt],
+            cwd=BACKEND_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        elapsed = (time.perf_counter() - t0) * 1000
+        if proc.returncode != 0:
+            raise RuntimeError(f"`{stmt}` failed:\n{proc.stderr.strip()}")
+        samples.append(elapsed)
+    return samples
+
+
+async def _time_handshake(runs: int) -> List[float]:
+    from app.mcp_pool import MCPServerPool
+
+    samples = []
+    for _ in range(runs):
+        pool = MCPServerPool(size=1)
+        t0 = time.perf_counter()
+        await pool.start()
+        async with pool.acquire() as server:
+            await server.list_tools()
+        samples.append((time.perf_counter() - t0) * 1000)
+        await pool.close()
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--handshake", action="store_true", help="also time stdio MCP spawn + initialize")
+    parser.add_argument("--out", help="write JSON results")
+    parser.add_argument("--baseline", help="compare against a previous --out file")
+    args = parser.parse_args()
+
+    db_url = use_temp_sqlite("startup")
+    env = {**os.environ, "DATABASE_URL": db_url, "PYTHONDONTWRITEBYTECODE": "1"}
+
+    rows: Dict[str, Dict[str, float]] = {}
+    for name, stmt in CASES.items():
+        _time_import(stmt, 1, env)  # warm OS file cache / .pyc
+        rows[name] = summarize(_time_import(stmt, args.runs, env))
+
+    if args.handshake:
+        rows["mcp spawn+handshake"] = summarize(asyncio.run(_time_handshake(args.runs)))
+
+    print_table(rows)
+    if args.out:
+        write_results(args.out, {"runs": args.runs, "python": sys.version.split()[0]}, rows)
+    if args.baseline:
+        compare_results(args.baseline, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# backend/benchmarks/bench_tool_payload.py
+"""
+list_tasks tool output size as seen by the model: full dicts vs compact columnar.
+
+    python -m benchmarks.bench_tool_payload
+    python -m benchmarks.bench_tool_payload --sizes 10 100 1000 --desc-ratio 0.3 --out payload.json
+
+"full"  = purana output (json.dumps of task_to_dict rows)
+"stdio" = full dict jaisa FastMCP bhejta hai (indent=2)
+Compact rows are truncated at TOOL_OUTPUT_MAX_ROWS (default 100) -> "omitted".
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from app.mcp_tools import encoding
+from app.prompt_builder import estimate_tokens
+from benchmarks._common import write_results
+
+_WORDS = ["buy", "milk", "call", "mom", "finish", "report", "book", "flight", "pay", "rent", "gym", "review", "PR"]
+
+
+def _tasks(n: int, desc_ratio: float) -> List[Dict[str, Any]]:
+    now = datetime(2026, 1, 1, 9, 0, 0)
+    out = []
+    for i in range(1, n + 1):
+        title = " ".join(_WORDS[(i + k) % len(_WORDS)] for k in range(3))
+        out.append(
+            {
+                "id": i,
+                "user_id": "user-7f3c9a2e",
+                "title": f"{title} {i}",
+                "description": f"details for task {i}: remember the notes" if (i % 100) < desc_ratio * 100 else None,
+                "completed": i % 3 == 0,
+                "created_at": (now + timedelta(minutes=i)).isoformat(),
+                "updated_at": (now + timedelta(minutes=i, seconds=30)).isoformat(),
+            }
+        )
+    return out
+
+
+def _measure(payload: str) -> Dict[str, int]:
+    return {"bytes": len(payload.encode()), "est_tokens": estimate_tokens(payload)}
+
+
+def _encode_ms(result: Dict[str, Any], repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        json.dumps(encoding.encode_result(result), default=str, separators=(",", ":"), ensure_ascii=False)
+    return (time.perf_counter() - t0) * 1000 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--desc-ratio", type=float, default=0.2, help="fraction of tasks with a description")
+    parser.add_argument("--repeat", type=int, default=50, help="encode timing iterations (warm memo)")
+    parser.add_argument("--out", help="write JSON results")
+    args = parser.parse_args()
+
+    rows: Dict[str, Dict[str, Any]] = {}
+    print(f"{'tasks':>6}{'full B':>10}{'stdio B':>10}{'compact B':>11}{'saved':>8}{'full tok':>10}{'compact tok':>13}{'omitted':>9}{'enc ms':>9}")
+    for n in args.sizes:
+        result = {"ok": True, "tasks": _tasks(n, args.desc_ratio), "next_after_id": None}
+        full = _measure(json.dumps(result, default=str))
+        stdio = _measure(json.dumps(result, default=str, indent=2))
+        compact_obj = encoding.encode_result(result)
+        compact = _measure(json.dumps(compact_obj, default=str, separators=(",", ":"), ensure_ascii=False))
+        enc_ms = _encode_ms(result, args.repeat)
+        saved = 1 - compact["bytes"] / full["bytes"]
+        rows[f"list_tasks.{n}"] = {
+            "full_bytes": full["bytes"],
+            "stdio_bytes": stdio["bytes"],
+            "compact_bytes": compact["bytes"],
+            "full_est_tokens": full["est_tokens"],
+            "compact_est_tokens": compact["est_tokens"],
+            "omitted": compact_obj.get("omitted", 0),
+            "saved_pct": round(saved * 100, 1),
+            "encode_ms_warm": round(enc_ms, 3),
+        }
+        print(
+            f"{n:>6}{full['bytes']:>10}{stdio['bytes']:>10}{compact['bytes']:>11}{saved:>8.0%}"
+            f"{full['est_tokens']:>10}{compact['est_tokens']:>13}{compact_obj.get('omitted', 0):>9}{enc_ms:>9.3f}"
+        )
+
+    print(f"\nmemo: {encoding.encoding_stats()}")
+    if args.out:
+        write_results(args.out, {"desc_ratio": args.desc_ratio, "max_rows": encoding.TOOL_OUTPUT_MAX_ROWS}, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# backend/benchmarks/cassette.py
+"""
+Cassettes for record / replay of agent runs (see bench_replay.py, replay_server.py).
+
+Format: JSON lines
+  {"kind": "meta", "user_id": ..., "messages": [...], "model": ..., "recorded_at": ...}
+  {"kind": "model", "seq": n, "method", "path", "key", "request", "status",
+   "content_type", "body", "ttfb_ms", "latency_ms"}
+  {"kind": "turn", "index": n, "message", "reply", "tool_calls": [...], "latency_ms"}
+
+- "model": OpenAI API ka har request / response (streaming SSE body bhi, as text).
+  Tool traffic isi me hai: function_call items response me, function_call_output
+  agle request ke input me.
+- "turn": run_chat ka result (tool name / transport / ok / duration_ms per call)
+- key = canonical request JSON ka sha256 (replay pe matching ke liye)
+"""
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+# transport ne body decode kar di hai; ye headers replay / client ko confuse karte hain
+_HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+def request_key(body: Any) -> str:
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+def parse_body(raw: bytes) -> Any:
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw.decode("utf-8", errors="replace")
+
+
+class CassetteWriter:
+    """Append-only, thread-safe; har entry turant flush (crash pe bhi cassette usable)."""
+
+    def __init__(self, path: str, meta: Optional[Dict[str, Any]] = None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._f = open(path, "w", encoding="utf-8")
+        self.write({"kind": "meta", "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), **(meta or {})})
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            if entry.get("kind") == "model":
+                entry = {**entry, "seq": self._seq}
+                self._seq += 1
+            self._f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            self._f.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._f.close()
+
+
+def read_cassette(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def load(path: str) -> Dict[str, Any]:
+    """-> {"meta": {...}, "model": [...], "turns": [...]}"""
+    out: Dict[str, Any] = {"meta": {}, "model": [], "turns": []}
+    for entry in read_cassette(path):
+        kind = entry.get("kind")
+        if kind == "meta":
+            out["meta"] = entry
+        elif kind == "model":
+            out["model"].append(entry)
+        elif kind == "turn":
+            out["turns"].append(entry)
+    return out
+
+
+# =========================
+# RECORDING (httpx transport under the OpenAI client)
+# =========================
+def recording_transport(writer: CassetteWriter, inner: Any = None) -> Any:
+    import httpx
+
+    class RecordingTransport(httpx.AsyncBaseTransport):
+        def __init__(self) -> None:
+            self._inner = inner or httpx.AsyncHTTPTransport()
+
+        async def handle_async_request(self, request: "httpx.Request") -> "httpx.Response":
+            raw_request = await request.aread()
+            t0 = time.perf_counter()
+            response = await self._inner.handle_async_request(request)
+            ttfb = time.perf_counter() - t0
+            # poora body padh lo (streaming bhi) -> cassette; client ko same bytes
+            wrapped = httpx.Response(response.status_code, headers=response.headers, stream=response.stream)
+            body = await wrapped.aread()
+            latency = time.perf_counter() - t0
+
+            request_json = parse_body(raw_request)
+            writer.write(
+                {
+                    "kind": "model",
+                    "method": request.method,
+                    "path": request.url.path,
+                    "key": request_key(request_json),
+                    "request": request_json,
+                    "status": response.status_code,
+                    "content_type": response.headers.get("content-type", ""),
+                    "body": body.decode("utf-8", errors="replace"),
+                    "ttfb_ms": round(ttfb * 1000, 2),
+                    "latency_ms": round(latency * 1000, 2),
+                }
+            )
+            headers = [(k, v) for k, v in response.headers.items() if k.lower() not in _HOP_HEADERS]
+            return httpx.Response(
+                response.status_code,
+                headers=headers,
+                content=body,
+                request=request,
+                extensions=response.extensions,
+            )
+
+        async def aclose(self) -> None:
+            await self._inner.aclose()
+
+    return RecordingTransport()
+
+
+def recording_openai_client(writer: CassetteWriter) -> Any:
+    """AsyncOpenAI jiska har API call cassette me jata hai (agents set_default_openai_client ke liye)."""
+    import httpx
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(http_client=httpx.AsyncClient(transport=recording_transport(writer), timeout=120))
+
+
+def tool_calls_of(turns: List[Dict[str, Any]]) -> List[List[str]]:
+    """Per turn tool names (record vs replay comparison)."""
+    return [[c.get("name") for c in t.get("tool_calls") or []] for t in turns]
@@ -0,0 +1,167 @@
+# backend/benchmarks/replay_server.py
+"""
+Local stand-in for the OpenAI API: recorded cassette responses replay karta hai.
+
+Client (agents SDK / openai) ko OPENAI_BASE_URL se yahan point karo; DB, MCP transport,
+prompt building sab asli chalte hain, sirf model deterministic + offline hota hai:
+
+    python -m benchmarks.replay_server --cassette run.jsonl --latency zero --port 8765
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=replay uvicorn app.main:app
+
+Matching: pehle same request key (canonical body hash) wala unused entry, warna
+same path ka agla unused entry (mismatch count hota hai; --strict -> 409).
+--latency: original (recorded ttfb + streamed body spacing) | zero | <scale> e.g. 0.5
+GET /stats -> served / mismatches / remaining.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.cassette import load, parse_body, request_key
+
+
+class Replayer:
+    def __init__(self, entries: List[Dict[str, Any]], latency: str = "zero", strict: bool = False) -> None:
+        self.entries = entries
+        self.strict = strict
+        self.scale = self._scale(latency)
+        self._used = [False] * len(entries)
+        self._lock = threading.Lock()
+        self.stats = {"served": 0, "matched": 0, "mismatches": 0, "exhausted": 0}
+
+    @staticmethod
+    def _scale(latency: str) -> float:
+        if latency == "original":
+            return 1.0
+        if latency == "zero":
+            return 0.0
+        return max(0.0, float(latency))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._used = [False] * len(self.entries)
+
+    def take(self, path: str, body: Any) -> Optional[Dict[str, Any]]:
+        key = request_key(body)
+        with self._lock:
+            pending = [i for i, used in enumerate(self._used) if not used]
+            hit = next((i for i in pending if self.entries[i].get("key") == key), None)
+            if hit is None:
+                if self.strict:
+                    self.stats["mismatches"] += 1
+                    return None
+                hit = next((i for i in pending if self.entries[i].get("path") == path), None)
+                if hit is None:
+                    self.stats["exhausted"] += 1
+                    return None
+                self.stats["mismatches"] += 1
+            else:
+                self.stats["matched"] += 1
+            self._used[hit] = True
+            self.stats["served"] += 1
+            return self.entries[hit]
+
+    def remaining(self) -> int:
+        return self._used.count(False)
+
+
+def _sse_chunks(body: str) -> List[str]:
+    return [chunk + "\n\n" for chunk in body.split("\n\n") if chunk.strip()]
+
+
+def _handler(replayer: Replayer) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: Any) -> None:  # quiet
+            return
+
+        def _send_json(self, status: int, data: Dict[str, Any]) -> None:
+            raw = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_GET(self) -> None:
+            if self.path.rstrip("/") in ("/stats", "/v1/stats"):
+                self._send_json(200, {**replayer.stats, "remaining": replayer.remaining()})
+            else:
+                self._send_json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = parse_body(self.rfile.read(length) if length else b"")
+            entry = replayer.take(self.path, body)
+            if entry is None:
+                self._send_json(409, {"error": {"message": f"no cassette entry for {self.path}", "type": "replay"}})
+                return
+
+            scale = replayer.scale
+            ttfb = entry.get("ttfb_ms", 0) / 1000.0 * scale
+            rest = max(0.0, entry.get("latency_ms", 0) / 1000.0 * scale - ttfb)
+            content_type = entry.get("content_type") or "application/json"
+            payload = entry.get("body") or ""
+            if ttfb:
+                time.sleep(ttfb)
+
+            if "text/event-stream" in content_type:
+                # body close hone tak (no Content-Length); events recorded spacing ke saath
+                chunks = _sse_chunks(payload)
+                self.send_response(entry.get("status", 200))
+                self.send_header("Content-Type", content_type)
+                self.send_header("Connection", "close")
+                self.end_headers()
+                gap = rest / len(chunks) if chunks else 0.0
+                for chunk in chunks:
+                    if gap:
+                        time.sleep(gap)
+                    self.wfile.write(chunk.encode())
+                    self.wfile.flush()
+                return
+
+            if rest:
+                time.sleep(rest)
+            raw = payload.encode()
+            self.send_response(entry.get("status", 200))
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+    return Handler
+
+
+def start_replay_server(
+    cassette_path: str, latency: str = "zero", host: str = "127.0.0.1", port: int = 0, strict: bool = False
+) -> Tuple[ThreadingHTTPServer, Replayer, str]:
+    """Background thread me server; returns (server, replayer, base_url incl. /v1)."""
+    replayer = Replayer(load(cassette_path)["model"], latency=latency, strict=strict)
+    server = ThreadingHTTPServer((host, port), _handler(replayer))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="replay-server", daemon=True).start()
+    return server, replayer, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cassette", required=True)
+    parser.add_argument("--latency", default="zero", help="original | zero | scale factor (e.g. 0.5)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--strict", action="store_true", help="only exact request matches (else 409)")
+    args = parser.parse_args()
+
+    server, replayer, base_url = start_replay_server(args.cassette, args.latency, args.host, args.port, args.strict)
+    print(f"replaying {len(replayer.entries)} model responses at {base_url} (latency={args.latency})")
+    print(f"  OPENAI_BASE_URL={base_url} OPENAI_API_KEY=replay")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# backend/benchmarks/stub_model.py
+"""
+Deterministic stand-in for the OpenAI model (offline benchmarks).
+
+Rules (last USER line of the prompt):
+  "add <title>"      -> add_task
+  "list" / "show"    -> list_tasks
+  "complete <id>"    -> complete_task
+  "delete <id>"      -> delete_task
+  anything else      -> plain text reply
+After a tool output is in the input, it answers with a short confirmation.
+Optional fixed latency per model call via `latency_ms`.
+Streaming (/chat/stream): same output, as text deltas + one response.completed event.
+"""
+import asyncio
+import json
+import re
+import time
+import uuid
+from typing import Any, AsyncIterator, List, Optional
+
+from agents.models.interface import Model, ModelProvider
+from agents.usage import Usage
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+    ResponseUsage,
+)
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+
+try:  # agents >= 0.1
+    from agents.items import ModelResponse
+except ImportError:  # pragma: no cover
+    from agents import ModelResponse
+
+
+def _text_of(item: Any) -> str:
+    content = item.get("content") if isinstance(item, dict) else None
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(c.get("text", "") for c in content if isinstance(c, dict))
+    return ""
+
+
+def _plan(prompt: str):
+    user_id = ""
+    m = re.search(r"^USER_ID:\s*(\S+)", prompt, flags=re.MULTILINE)
+    if m:
+        user_id = m.group(1)
+
+    user_lines = re.findall(r"^USER:\s*(.*)$", prompt, flags=re.MULTILINE)
+    last = (user_lines[-1] if user_lines else prompt).strip()
+    lc = last.lower()
+
+    if lc.startswith("add "):
+        return "add_task", {"user_id": user_id, "title": last[4:].strip()}
+    if lc in ("list", "show", "list tasks", "show my tasks") or lc.startswith("list "):
+        return "list_tasks", {"user_id": user_id}
+    m = re.match(r"^(complete|done|finish)\s+#?(\d+)$", lc)
+    if m:
+        return "complete_task", {"user_id": user_id, "task_id": int(m.group(2))}
+    m = re.match(r"^(delete|remove)\s+#?(\d+)$", lc)
+    if m:
+        return "delete_task", {"user_id": user_id, "task_id": int(m.group(2))}
+    return None, {}
+
+
+def _message(text: str) -> ResponseOutputMessage:
+    return ResponseOutputMessage(
+        id=f"msg_{uuid.uuid4().hex[:12]}",
+        type="message",
+        role="assistant",
+        status="completed",
+        content=[ResponseOutputText(type="output_text", text=text, annotations=[])],
+    )
+
+
+class StubModel(Model):
+    def __init__(self, latency_ms: float = 0.0) -> None:
+        self.latency_ms = latency_ms
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs):
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000.0)
+
+        items: List[Any] = [{"role": "user", "content": input}] if isinstance(input, str) else list(input)
+        tool_outputs = [
+            it for it in items if isinstance(it, dict) and it.get("type") == "function_call_output"
+        ]
+
+        output: List[Any]
+        if tool_outputs:
+            output = [_message("Done.")]
+        else:
+            prompt = "\n".join(_text_of(it) for it in items if isinstance(it, dict) and it.get("role") == "user")
+            name, args = _plan(prompt)
+            tool_names = {getattr(t, "name", None) for t in tools or []}
+            if name and name in tool_names:
+                output = [
+                    ResponseFunctionToolCall(
+                        id=f"fc_{uuid.uuid4().hex[:12]}",
+                        call_id=f"call_{uuid.uuid4().hex[:12]}",
+                        type="function_call",
+                        name=name,
+                        arguments=json.dumps(args),
+                        status="completed",
+                    )
+                ]
+            else:
+                output = [_message("OK")]
+
+        usage = Usage(requests=1, input_tokens=len(str(input)) // 4, output_tokens=8)
+        usage.total_tokens = usage.input_tokens + usage.output_tokens
+        return ModelResponse(output=output, usage=usage, response_id=None)
+
+    async def stream_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+    ) -> AsyncIterator[Any]:
+        result = await self.get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+        )
+        seq = 0
+        for index, item in enumerate(result.output):
+            if isinstance(item, ResponseOutputMessage):
+                yield ResponseTextDeltaEvent(
+                    type="response.output_text.delta",
+                    item_id=item.id,
+                    output_index=index,
+                    content_index=0,
+                    delta=item.content[0].text,
+                    logprobs=[],
+                    sequence_number=seq,
+                )
+                seq += 1
+
+        usage = result.usage
+        yield ResponseCompletedEvent(
+            type="response.completed",
+            sequence_number=seq,
+            response=Response(
+                id=f"resp_{uuid.uuid4().hex[:12]}",
+                object="response",
+                created_at=time.time(),
+                model="stub",
+                output=result.output,
+                parallel_tool_calls=True,
+                tool_choice="auto",
+                tools=[],
+                # model_construct: required detail fields openai versions ke saath badalte hain
+                usage=ResponseUsage.model_construct(
+                    input_tokens=usage.input_tokens,
+                    input_tokens_details=InputTokensDetails.model_construct(cached_tokens=0),
+                    output_tokens=usage.output_tokens,
+                    output_tokens_details=OutputTokensDetails.model_construct(reasoning_tokens=0),
+                    total_tokens=usage.total_tokens,
+                ),
+            ),
+        )
+
+
+class StubModelProvider(ModelProvider):
+    def __init__(self, latency_ms: float = 0.0) -> None:
+        self._model = StubModel(latency_ms)
+
+    def get_model(self, model_name: Optional[str]) -> Model:
+        return self._model
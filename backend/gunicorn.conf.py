@@ -0,0 +1,37 @@
+# backend/gunicorn.conf.py
+# Production mode: gunicorn master + uvicorn workers (SERVER_MODE=production, see start.sh)
+import os
+
+from app.server_config import db_pool_sizing, worker_count
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = worker_count()
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+accesslog = "-"
+
+# per-worker DB pool (workers inherit this env; app.database reads it at import)
+if os.getenv("DB_POOL_AUTOSIZE", "1") == "1":
+    _pool = db_pool_sizing(workers)
+    os.environ["DB_POOL_SIZE"] = str(_pool["pool_size"])
+    os.environ["DB_MAX_OVERFLOW"] = str(_pool["max_overflow"])
+
+
+def on_starting(server):
+    server.log.info(
+        "workers=%s DB_POOL_SIZE=%s DB_MAX_OVERFLOW=%s (per engine)",
+        workers,
+        os.environ.get("DB_POOL_SIZE", "default"),
+        os.environ.get("DB_MAX_OVERFLOW", "default"),
+    )
+    # schema setup once in the master (not once per worker), then drop the engine
+    # before fork so workers never share pooled connections
+    if os.getenv("DB_INIT_ON_STARTUP", "1") == "1":
+        from app.database import get_engine, init_db
+
+        init_db()
+        get_engine().dispose()
+        os.environ["DB_INIT_ON_STARTUP"] = "0"
@@ -0,0 +1,10 @@
+#!/bin/sh
+# SERVER_MODE=production -> gunicorn + uvicorn workers (multi-core)
+# otherwise                -> single uvicorn process (dev / minikube default)
+set -e
+
+if [ "${SERVER_MODE:-dev}" = "production" ]; then
+  exec gunicorn -c gunicorn.conf.py app.main:app
+fi
+
+exec uvicorn app.main:app --host 0.0.0.0 --port "${PORT:-8000}"
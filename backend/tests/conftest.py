@@ -0,0 +1,36 @@
+# backend/tests/conftest.py
+"""
+Tests ek fresh SQLite file pe chalte hain (DATABASE_URL app import se PEHLE set hona chahiye).
+
+    cd backend && python -m pytest -q
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_fd, _path = tempfile.mkstemp(prefix="tests-", suffix=".db")
+os.close(_fd)
+os.environ["DATABASE_URL"] = f"sqlite:///{_path}"
+os.environ.setdefault("METRICS_ENABLED", "0")
+
+from sqlmodel import Session  # noqa: E402
+
+from app.database import get_engine, init_db  # noqa: E402
+
+init_db()
+
+
+@pytest.fixture
+def session():
+    with Session(get_engine()) as s:
+        yield s
+
+
+@pytest.fixture
+def user_id(request) -> str:
+    # har test ka apna user -> shared DB me bhi isolated
+    return f"user-{request.node.name}"
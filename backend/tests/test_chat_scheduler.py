@@ -0,0 +1,92 @@
+# backend/tests/test_chat_scheduler.py
+import asyncio
+from typing import Dict, List
+
+from app.chat_scheduler import ChatScheduler, _AdvisoryUserLocks
+
+
+class _FakePg:
+    """Advisory lock server state shared by the 'workers' (session-level, re-entrant)."""
+
+    def __init__(self) -> None:
+        self.held: Dict[str, List] = {}
+
+
+class _FakeLocks(_AdvisoryUserLocks):
+    def __init__(self, pg: _FakePg, session: str, broken: bool = False) -> None:
+        super().__init__()
+        self.pg, self.session, self.broken = pg, session, broken
+
+    async def _execute(self, fn: str, user_id: str) -> bool:
+        if self.broken:
+            raise ConnectionError("db down")
+        owner = self.pg.held.get(user_id)
+        if fn == "pg_try_advisory_lock":
+            if owner is None:
+                self.pg.held[user_id] = [self.session, 1]
+                return True
+            if owner[0] == self.session:
+                owner[1] += 1
+                return True
+            return False
+        if owner is None or owner[0] != self.session:
+            return False
+        owner[1] -= 1
+        if owner[1] == 0:
+            del self.pg.held[user_id]
+        return True
+
+
+def test_user_turns_serialize_across_workers():
+    async def scenario():
+        pg = _FakePg()
+        a = ChatScheduler(user_locks=_FakeLocks(pg, "worker-a"))
+        b = ChatScheduler(user_locks=_FakeLocks(pg, "worker-b"))
+
+        first = await a.acquire("u1")
+        assert first.cross_worker
+        second = asyncio.ensure_future(b.acquire("u1"))
+        other_user = await asyncio.wait_for(b.acquire("u2"), timeout=1)
+
+        await asyncio.sleep(0.2)
+        assert not second.done()  # same user, other worker -> waits
+
+        a.release(first)
+        ticket = await asyncio.wait_for(second, timeout=1)
+        assert ticket.cross_worker
+        b.release(ticket)
+        b.release(other_user)
+        await a.close()
+        await b.close()
+        return pg.held
+
+    assert asyncio.run(scenario()) == {}
+
+
+def test_lock_backend_failure_falls_back_to_local():
+    async def scenario():
+        s = ChatScheduler(user_locks=_FakeLocks(_FakePg(), "worker", broken=True))
+        ticket = await asyncio.wait_for(s.acquire("u1"), timeout=1)
+        s.release(ticket)
+        await s.close()
+        return ticket.cross_worker, s.snapshot()["user_lock_errors"]
+
+    assert asyncio.run(scenario()) == (False, 1)
+
+
+def test_queue_timeout_does_not_leak_cross_worker_lock():
+    async def scenario():
+        pg = _FakePg()
+        a = ChatScheduler(user_locks=_FakeLocks(pg, "worker-a"))
+        b = ChatScheduler(user_locks=_FakeLocks(pg, "worker-b"), queue_timeout=0.2)
+        first = await a.acquire("u1")
+        try:
+            await b.acquire("u1")
+        except Exception as e:
+            assert getattr(e, "status_code", None) == 503
+        a.release(first)
+        await a.close()
+        await b.close()
+        return pg.held
+
+    assert asyncio.run(scenario()) == {}
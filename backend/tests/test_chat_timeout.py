@@ -0,0 +1,84 @@
+# backend/tests/test_chat_timeout.py
+import asyncio
+
+from sqlmodel import select
+
+from app import agent_runner
+from app.database import dispose_engines
+from app.models import Message
+
+
+def test_timed_out_turn_keeps_user_message(session, user_id, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+
+    async def slow_attempt(plan, route):
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(agent_runner, "_run_attempt", slow_attempt)
+
+    async def turn():
+        try:
+            # timeout agent run ke beech me (first call SDK import bhi karta hai)
+            await asyncio.wait_for(agent_runner.run_chat(user_id, "plan my week please"), timeout=5)
+        except asyncio.TimeoutError:
+            return True
+        finally:
+            await dispose_engines()
+        return False
+
+    assert asyncio.run(turn())
+
+    rows = session.exec(select(Message).where(Message.user_id == user_id)).all()
+    assert [(m.role, m.content) for m in rows] == [("user", "plan my week please")]
+
+
+def _slow_stream(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+
+    async def slow_stream(plan, route, attempt, tool_names):
+        yield {"event": "delta", "data": {"text": "thinking"}}
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(agent_runner, "_stream_attempt", slow_stream)
+
+
+def _user_messages(session, user_id):
+    rows = session.exec(select(Message).where(Message.user_id == user_id)).all()
+    return [(m.role, m.content) for m in rows]
+
+
+def test_timed_out_stream_keeps_user_message(session, user_id, monkeypatch):
+    _slow_stream(monkeypatch)
+
+    async def turn():
+        events = agent_runner.run_chat_stream(user_id, "plan my week please")
+        try:
+            assert (await events.__anext__())["event"] == "start"
+            assert (await events.__anext__())["event"] == "delta"
+            # same as router/chat.py:_chat_events when CHAT_RUN_TIMEOUT expires
+            await asyncio.wait_for(events.__anext__(), timeout=0.2)
+        except asyncio.TimeoutError:
+            return True
+        finally:
+            await dispose_engines()
+        return False
+
+    assert asyncio.run(turn())
+    assert _user_messages(session, user_id) == [("user", "plan my week please")]
+
+
+def test_disconnected_stream_keeps_user_message(session, user_id, monkeypatch):
+    _slow_stream(monkeypatch)
+
+    async def turn():
+        events = agent_runner.run_chat_stream(user_id, "plan my week please")
+        try:
+            await events.__anext__()
+            await events.__anext__()
+            # client gaya: generator close hota hai
+            await events.aclose()
+        finally:
+            await dispose_engines()
+
+    asyncio.run(turn())
+    assert _user_messages(session, user_id) == [("user", "plan my week please")]
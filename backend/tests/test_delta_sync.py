@@ -0,0 +1,31 @@
+# backend/tests/test_delta_sync.py
+import asyncio
+
+from app.database import async_session, dispose_engines
+from app.delta_sync import task_changes
+from app.services import task_service
+
+
+def _changes(user_id: str, since: int):
+    async def read():
+        try:
+            async with async_session() as s:
+                return await task_changes(s, user_id, since)
+        finally:
+            await dispose_engines()
+
+    return asyncio.run(read())
+
+
+def test_bulk_added_tasks_show_up_in_changes(session, user_id):
+    first = task_service.add_tasks(session, user_id, [{"title": "seed"}])
+    cursor = _changes(user_id, 0)["cursor"]
+
+    added = task_service.add_tasks(session, user_id, [{"title": "milk"}, {"title": "eggs"}])
+    task_service.delete_tasks(session, user_id, [first[0]["task_id"]])
+
+    out = _changes(user_id, cursor)
+    assert out["reset"] is False
+    assert sorted(t["id"] for t in out["tasks"]) == sorted(r["task_id"] for r in added)
+    assert out["deleted"] == [first[0]["task_id"]]
+    assert _changes(user_id, out["cursor"])["tasks"] == []
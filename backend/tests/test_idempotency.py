@@ -0,0 +1,22 @@
+# backend/tests/test_idempotency.py
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.database import dispose_engines
+from app.main import app
+
+
+def test_replayed_response_keeps_content_type(user_id):
+    try:
+        with TestClient(app) as client:
+            headers = {"Idempotency-Key": f"key-{user_id}"}
+            first = client.post(f"/api/{user_id}/tasks", json={"title": "milk"}, headers=headers)
+            again = client.post(f"/api/{user_id}/tasks", json={"title": "milk"}, headers=headers)
+    finally:
+        asyncio.run(dispose_engines())
+
+    assert first.status_code == again.status_code == 200
+    assert again.headers["idempotent-replayed"] == "true"
+    assert again.headers["content-type"] == first.headers["content-type"] == "application/json"
+    assert again.json() == first.json()
@@ -0,0 +1,27 @@
+# backend/tests/test_response_cache.py
+import pytest
+
+from app.response_cache import is_read_only
+
+
+@pytest.mark.parametrize(
+    "message",
+    ["show my tasks", "What's pending?", "tasks", "how many tasks are completed", "list my todos"],
+)
+def test_task_list_questions_are_cacheable(message):
+    assert is_read_only(message)
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "which one did I just mention?",
+        "what is that task about",
+        "what's the weather",
+        "show it again",
+        "which tasks did you add earlier?",
+        "show tasks and delete the first",
+    ],
+)
+def test_context_dependent_or_write_messages_are_not(message):
+    assert not is_read_only(message)
@@ -0,0 +1,13 @@
+# backend/tests/test_task_search.py
+from app.services import task_service
+from app.task_search import search_tasks
+
+
+def test_like_wildcards_are_literal(session, user_id):
+    task_service.add_tasks(
+        session, user_id, [{"title": "buy milk"}, {"title": "100% done"}, {"title": "rename snake_case vars"}]
+    )
+
+    assert [t["title"] for t in search_tasks(session, user_id, "%")] == ["100% done"]
+    assert [t["title"] for t in search_tasks(session, user_id, "_")] == ["rename snake_case vars"]
+    assert [t["title"] for t in search_tasks(session, user_id, "milk")] == ["buy milk"]
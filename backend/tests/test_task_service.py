@@ -0,0 +1,47 @@
+# backend/tests/test_task_service.py
+from app.services import task_service
+
+
+def test_add_tasks_mixed_items(session, user_id):
+    results = task_service.add_tasks(
+        session,
+        user_id,
+        [{"title": "milk", "description": "2 litres"}, {"title": 42}, "oops", {"title": "  "}, {"title": "eggs"}],
+    )
+
+    assert [r["ok"] for r in results] == [True, False, False, False, True]
+    assert results[0]["task"]["description"] == "2 litres"
+    assert results[1]["error"] == "title must be a string"
+    assert results[2]["error"] == "item must be an object"
+    assert results[3]["error"] == "title is required"
+
+
+def test_update_tasks_mixed_items(session, user_id):
+    created = task_service.add_tasks(session, user_id, [{"title": "a"}, {"title": "b"}])
+    a, b = (r["task_id"] for r in created)
+
+    results = task_service.update_tasks(
+        session,
+        user_id,
+        [
+            {"task_id": a, "title": " renamed ", "description": "note"},
+            {"task_id": b, "title": 7},
+            {"task_id": b, "description": ["x"]},
+            {"task_id": 999999, "title": "x"},
+            {"task_id": b, "title": ""},
+            None,
+        ],
+    )
+
+    assert [r["ok"] for r in results] == [True, False, False, False, False, False]
+    assert results[0]["task"]["title"] == "renamed"
+    assert results[0]["task"]["description"] == "note"
+    assert results[1]["error"] == "title must be a string"
+    assert results[2]["error"] == "description must be a string"
+    assert results[3]["error"] == "Task id 999999 not found"
+    assert results[4]["error"] == "title cannot be empty"
+    assert results[5]["error"] == "item must be an object"
+
+    # invalid items ne task b ko touch nahi kiya
+    untouched = task_service.update_tasks(session, user_id, [{"task_id": b}])[0]["task"]
+    assert untouched["title"] == "b"
@@ -41,11 +41,22 @@ export default function DashboardPage() {
   const fetchTasks = async (id: string) => {
     setLoading(true);
     try {
-      const res = await fetch(`${API_BASE}/api/${encodeURIComponent(id)}/tasks/`, {
-        cache: "no-store",
-      });
-      const data = await res.json().catch(() => []);
-      setTasks(Array.isArray(data) ? data : []);
+      // GET /tasks is paginated (keyset): follow X-Next-After-Id until the last page
+      const all: Task[] = [];
+      let afterId: string | null = null;
+      do {
+        const params = new URLSearchParams({ limit: "1000" });
+        if (afterId) params.set("after_id", afterId);
+        const res = await fetch(`${API_BASE}/api/${encodeURIComponent(id)}/tasks/?${params}`, {
+          cache: "no-store",
+        });
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        const data = await res.json().catch(() => []);
+        if (Array.isArray(data)) all.push(...data);
+        const next = res.headers.get("X-Next-After-Id");
+        afterId = next && next !== afterId ? next : null;
+      } while (afterId);
+      setTasks(all);
     } catch {
       setTasks([]);
       toast.error("Failed to load tasks");